@@ -34,10 +34,34 @@ The functions available are:
                                filesize with a given unit. This also works for
                                non-ASCII files.
 
+- :py:func:`~.read_lines_in_chunks`: Reads a file in chunks of complete lines.
+
+- :py:func:`~.parse_data`: Converts the numbers in a chunk of a Cactus ASCII
+                           file to a NumPy array, all at once.
+
+- :py:func:`~.load_table`: Reads all the numbers in an ASCII file in a NumPy
+                           array, using :py:func:`~.read_lines_in_chunks`
+                           and :py:func:`~.parse_data`.
+
 """
 
 import os
 import re
+from io import BytesIO
+
+import numpy as np
+
+from kuibit.file_index import cached
+
+# Since version 1.23, np.loadtxt is implemented in C, so it is much faster
+# than the alternatives
+_HAS_FAST_LOADTXT = np.lib.NumpyVersion(np.__version__) >= "1.23.0"
+
+# Lines that start with # are comments (the headers)
+_rx_comment = re.compile(rb"^#.*$", re.MULTILINE)
+
+# Lines with data: they do not start with # and they are not blank
+_rx_data_line = re.compile(rb"^(?!#).*\S.*$", re.MULTILINE)
 
 
 def _scan_strings_for_columns(strings, pattern, path=None):
@@ -123,6 +147,7 @@ def scan_header(
     extended_format=True,
     opener=open,
     opener_mode="r",
+    index=None,
 ):
     """Use regular expressions to understand the content of a CarpetASCII file.
     In particular, we look for column format and data columns by reading the
@@ -150,12 +175,29 @@ def scan_header(
     :type opener: callable
     :param opener_mode: Mode to open the file with (e.g., ``r`` as in ``read``).
     :type opener_mode: str
+    :param index: If not None, use this index to avoid scanning again files
+                  that were already scanned.
+    :type index: :py:class:`~.FileIndex`
 
     :returns: time_column and either the data column (if it is one variable per
               group), or a dictionary with column: variable.
     :rtype: tuple with int, another int or a dictionary.
 
     """
+    return cached(
+        index,
+        path,
+        f"scan_header_{one_file_per_group}_{extended_format}",
+        lambda: _scan_header(
+            path, one_file_per_group, extended_format, opener, opener_mode
+        ),
+    )
+
+
+def _scan_header(
+    path, one_file_per_group, extended_format, opener, opener_mode
+):
+    """Implementation of :py:func:`~.scan_header` (without the index)."""
 
     # TODO (REFACTORING): This function really wants to be refactored!
     #
@@ -241,3 +283,131 @@ def total_filesize(allfiles, unit="MB"):
     if unit not in units.keys():
         raise ValueError(f"Invalid unit: expected one of {list(units.keys())}")
     return sum(os.path.getsize(path) for path in set(allfiles)) / units[unit]
+
+
+def read_lines_in_chunks(fil, chunk_size):
+    """Read the binary file object ``fil`` in chunks of complete lines.
+
+    Each chunk has approximately size ``chunk_size`` and ends with a
+    complete line, so that no line is split between two chunks.
+
+    :param fil: File object opened in binary mode.
+    :type fil: file object
+    :param chunk_size: Approximate size of each chunk in bytes.
+    :type chunk_size: int
+
+    :returns: Generator with the chunks.
+    :rtype: generator of bytes
+
+    """
+    # What is left from the previous chunk after the last newline
+    leftover = b""
+    while True:
+        chunk = fil.read(chunk_size)
+        if not chunk:
+            break
+        chunk = leftover + chunk
+        # We cut the chunk at the last newline, and keep the rest for the
+        # next iteration
+        last_newline = chunk.rfind(b"\n")
+        if last_newline == -1:
+            leftover = chunk
+            continue
+        leftover = chunk[last_newline + 1 :]
+        yield chunk[: last_newline + 1]
+
+    if leftover:
+        yield leftover
+
+
+def parse_data(chunk, num_columns, columns=None, path=None):
+    """Convert all the numbers in ``chunk`` at once and return the requested
+    columns.
+
+    Lines that start with ``#`` (comments) and blank lines are ignored.
+
+    :param chunk: Complete lines read from a Cactus ASCII file.
+    :type chunk: bytes
+    :param num_columns: Number of columns in each line with data.
+    :type num_columns: int
+    :param columns: Columns to return. If None, return all of them.
+    :type columns: list of int
+    :param path: Path of the file, used only for producing useful error
+                 messages.
+    :type path: str
+
+    :returns: Table with the requested columns (one row per line with data).
+    :rtype: 2D NumPy array
+
+    """
+    # Since version 1.23, np.loadtxt is implemented in C and it is the
+    # fastest way to parse text with NumPy. It also takes care of the
+    # comments and of the blank lines.
+    if _HAS_FAST_LOADTXT:
+        return np.loadtxt(
+            BytesIO(chunk), comments="#", usecols=columns, ndmin=2
+        )
+
+    # With older versions of NumPy, we remove the comments, then we convert
+    # all the numbers at once. When sep is a space, np.fromstring considers
+    # any whitespace as separator (including newlines and tabs), so the blank
+    # lines are not a problem.
+    numbers = np.fromstring(_rx_comment.sub(b"", chunk), sep=" ")
+    if numbers.size % num_columns != 0:
+        raise RuntimeError(f"Malformed data in file {path}")
+    table = numbers.reshape(-1, num_columns)
+    return table if columns is None else table[:, columns]
+
+
+def load_table(path, opener=open, chunk_size=64 * 1024 ** 2):
+    """Read all the numbers in the ASCII file ``path``.
+
+    Comments (lines that start with ``#``) and blank lines are ignored. This
+    is equivalent to ``np.loadtxt(path, ndmin=2)``, but much faster.
+
+    :param path: Path of the file.
+    :type path: str
+    :param opener: Function used to open the file (e.g., ``gzip.open``). It
+                   must support the mode ``rb``.
+    :type opener: callable
+    :param chunk_size: Approximate size (in bytes) of the chunks in which the
+                       file is read.
+    :type chunk_size: int
+
+    :returns: Table with one row per line with data (the table is empty if
+              there are no lines with data).
+    :rtype: 2D NumPy array
+
+    """
+    # When np.loadtxt is implemented in C and it is given a path, it reads the
+    # file in large blocks (with any other input, it reads line by line), so
+    # this is the fastest option. We only have to check that there is data
+    # (otherwise np.loadtxt emits a warning), which we do by looking at the
+    # beginning of the file. If the beginning of the file has no data, we
+    # read it in chunks.
+    if _HAS_FAST_LOADTXT and opener is open:
+        with open(path, "rb") as fil:
+            head = fil.read(64 * 1024)
+        if _rx_data_line.search(head) is not None:
+            return np.loadtxt(path, comments="#", ndmin=2)
+
+    chunks = []
+    num_columns = None
+    with opener(path, "rb") as fil:
+        for chunk in read_lines_in_chunks(fil, chunk_size):
+            if num_columns is None:
+                # The number of columns is only needed with old versions of
+                # NumPy, we find it from the first line with data
+                for line in chunk.splitlines():
+                    if line.strip() and not line.startswith(b"#"):
+                        num_columns = len(line.split())
+                        break
+                else:
+                    # Only comments in this chunk
+                    continue
+            chunks.append(parse_data(chunk, num_columns, path=path))
+
+    if not chunks:
+        return np.empty((0, 0))
+
+    return np.vstack(chunks)
@@ -34,6 +34,12 @@ There are multiple classes defined in this module:
   files associated to that grid function. Both the classes are derived from the
   same abstract base class :py:class`~.OneGridFunctionBase`, which implements
   the shared methods.
+- :py:class:`~.PrefetchingIterator` iterates over the iterations of a grid
+  function reading the next ones in the background (see
+  :py:meth:`~.BaseOneGridFunction.iter_iterations`).
+- :py:class:`~.H5FileCatalog` describes the content of one HDF5 file, and it
+  is shared by all the :py:class`~.OneGridFunctionH5` that read from that
+  file.
 
 These are hierarchical classes, one containing the others, so one typically ends
 up with a series of brackets to access the actual data. For example, if ``sim``
@@ -42,21 +48,314 @@ on the equatorial plane represented as :py:class:`~.HierarchicalGridData`.
 
 """
 
+import concurrent.futures
 import os
 import re
+import tempfile
+import threading
 import warnings
 from abc import ABC, abstractmethod
 from bz2 import open as bopen
+from collections import deque
 from contextlib import contextmanager
 from functools import lru_cache
 from gzip import open as gopen
+from time import perf_counter
 
 import h5py
 import numpy as np
 
-from kuibit import grid_data, simdir
+from kuibit import file_index, file_pool, grid_data, simdir
 from kuibit.attr_dict import pythonize_name_dict
-from kuibit.cactus_ascii_utils import scan_header, total_filesize
+from kuibit.cactus_ascii_utils import (
+    parse_data,
+    read_lines_in_chunks,
+    scan_header,
+    total_filesize,
+)
+from kuibit.data_cache import DataCache
+
+
+class H5FileCatalog:
+    """Content of one HDF5 file produced by CarpetHDF5.
+
+    A file can contain multiple variables (e.g., when the output is with
+    ``one_group_per_file``). :py:class:`~.H5FileCatalog` reads the names of
+    the groups in the file once and organizes them by variable, so that all
+    the :py:class:`~.OneGridFunctionH5` associated to the file can share this
+    work (instead of each of them opening the file and looking at all the
+    groups).
+
+    :ivar path: Path of the file.
+    :type path: str
+    :ivar variables: Dictionary with keys the variables in the file and values
+                     the list of ``(iteration, time_level, ref_level,
+                     component)`` available for that variable. ``ref_level``
+                     and ``component`` are -1 when they are not in the group
+                     name (e.g., for grid arrays).
+    :type variables: dict
+    :ivar thorn_names: Dictionary with keys the variables and values the names
+                       of the thorns that output them.
+    :type thorn_names: dict
+    :ivar maps: Dictionary with keys the variables and values the map string
+                in the group name (e.g., `` m=0``, or ``None``).
+    :type maps: dict
+
+    """
+
+    def __init__(self, path, index=None):
+        """Constructor.
+
+        :param path: Path of the file.
+        :type path: str
+        :param index: Index used to avoid reading again files that were
+                      already read.
+        :type index: :py:class:`~.FileIndex`
+
+        """
+        self.path = path
+        self._index = index
+        self.variables = {}
+        self.thorn_names = {}
+        self.maps = {}
+
+        rx_group_name = re.compile(
+            OneGridFunctionH5._pattern_group_name, re.VERBOSE
+        )
+
+        for group in file_index.h5_group_names(path, index=index):
+            matched = rx_group_name.match(group)
+            # If this is not an interesting group, just skip it
+            if not matched:
+                continue
+
+            (
+                thorn_name,
+                var_name,
+                iteration,
+                time_level,
+                map_,
+                _,
+                ref_level,
+                _,
+                component,
+            ) = matched.groups()
+
+            # This is important to support grid arrays, which do not have a
+            # refinement level
+            ref_level = -1 if ref_level is None else int(ref_level)
+            component = -1 if component is None else int(component)
+
+            self.variables.setdefault(var_name, []).append(
+                (int(iteration), int(time_level), ref_level, component)
+            )
+
+            # We only care about the current timelevel
+            if int(time_level) == 0:
+                self.thorn_names.setdefault(var_name, thorn_name)
+                self.maps.setdefault(var_name, map_)
+
+        self._are_ghostzones_in_file = None
+
+    def __getstate__(self):
+        # This is used when the catalog is sent to another process (together
+        # with a OneGridFunctionH5). The index has a connection to the
+        # database and a lock, so it stays here. The content of the file was
+        # already read, so the other process does not need the index.
+        state = self.__dict__.copy()
+        state["_index"] = None
+        return state
+
+    @property
+    def are_ghostzones_in_file(self):
+        """Return whether the ghostzones were output or not.
+
+        The file is read the first time this is requested.
+
+        :returns: Whether the file contains ghost zones.
+        :rtype: bool
+        """
+        if self._are_ghostzones_in_file is None:
+            self._are_ghostzones_in_file = (
+                OneGridFunctionH5._are_ghostzones_in_file(
+                    self.path, index=self._index
+                )
+            )
+        return self._are_ghostzones_in_file
+
+
+def _timed_read_iteration(grid_function, iteration):
+    """Read the given iteration from the files and measure how long it takes.
+
+    This is a function (and not a method) so that it can be used with process
+    pools.
+
+    :returns: Data at the given iteration and time spent reading it (in
+              seconds).
+    :rtype: tuple of :py:class:`~.HierarchicalGridData` and float
+    """
+    start = perf_counter()
+    data = grid_function._read_iteration_from_files(iteration)
+    return data, perf_counter() - start
+
+
+class PrefetchingIterator:
+    """Iterator over the iterations of a grid function that reads the next
+    iterations in the background while the current one is being used.
+
+    Use :py:meth:`~.BaseOneGridFunction.iter_iterations` to create this
+    object.
+
+    The data is read with an executor (by default, a thread pool that is
+    created for this purpose). The data that is returned is not saved in the
+    data cache, so it is removed from memory as soon as it is not used
+    anymore. Data that is already in the cache is not read again.
+
+    After (or during) the iteration, you can check how much of the reading
+    was done while the data was being used (``overlap_efficiency``).
+
+    :ivar read_time: Total time spent reading the data (in seconds).
+    :type read_time: float
+    :ivar wait_time: Total time spent waiting for the data to be read (in
+                     seconds).
+    :type wait_time: float
+
+    """
+
+    def __init__(self, grid_function, iterations, prefetch=1, executor=None):
+        """Constructor.
+
+        :param grid_function: Grid function to read.
+        :type grid_function: :py:class:`~.BaseOneGridFunction`
+        :param iterations: Iterations to read, in order.
+        :type iterations: list of int
+        :param prefetch: How many iterations to read in advance. If 0,
+                         iterations are read only when they are requested.
+        :type prefetch: int
+        :param executor: Executor used to read the data. If None, a thread
+                         pool is created (and shut down at the end).
+        :type executor: :py:class:`concurrent.futures.Executor`
+        """
+        if prefetch < 0:
+            raise ValueError("prefetch cannot be negative")
+
+        # The grid function uses its executor to read the various files of an
+        # iteration. If we also used it to read the iterations, all the
+        # workers could end up waiting for the files, with nobody left to
+        # read them.
+        if executor is not None and executor is grid_function.executor:
+            raise ValueError(
+                "The executor used to prefetch iterations has to be different"
+                " from the one used to read the files"
+            )
+
+        self._grid_function = grid_function
+        self._iterations = list(iterations)
+        self.prefetch = int(prefetch)
+
+        self._own_executor = executor is None and self.prefetch > 0
+        self._executor = (
+            concurrent.futures.ThreadPoolExecutor(self.prefetch)
+            if self._own_executor
+            else executor
+        )
+
+        # Position in self._iterations of the next iteration to submit
+        self._next_to_submit = 0
+        # Pending reads, as tuples (iteration, future)
+        self._pending = deque()
+
+        self.read_time = 0.0
+        self.wait_time = 0.0
+
+    def _submit(self, iteration):
+        """Start reading the given iteration and return a future."""
+        cached = self._grid_function._data_cache.get_if_present(
+            self._grid_function._cache_key(iteration)
+        )
+        if cached is not None:
+            future = concurrent.futures.Future()
+            future.set_result((cached, 0.0))
+            return future
+        return self._executor.submit(
+            _timed_read_iteration, self._grid_function, iteration
+        )
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.prefetch == 0:
+            if self._next_to_submit >= len(self._iterations):
+                raise StopIteration
+            iteration = self._iterations[self._next_to_submit]
+            self._next_to_submit += 1
+            data = self._grid_function._data_cache.get_if_present(
+                self._grid_function._cache_key(iteration)
+            )
+            if data is None:
+                data, read_time = _timed_read_iteration(
+                    self._grid_function, iteration
+                )
+                self.read_time += read_time
+                self.wait_time += read_time
+            return data
+
+        # We keep the current iteration and the following self.prefetch in
+        # flight
+        while (
+            self._next_to_submit < len(self._iterations)
+            and len(self._pending) <= self.prefetch
+        ):
+            iteration = self._iterations[self._next_to_submit]
+            self._pending.append((iteration, self._submit(iteration)))
+            self._next_to_submit += 1
+
+        if not self._pending:
+            self.close()
+            raise StopIteration
+
+        _, future = self._pending.popleft()
+
+        start = perf_counter()
+        data, read_time = future.result()
+        self.wait_time += perf_counter() - start
+        self.read_time += read_time
+
+        return data
+
+    @property
+    def overlap_efficiency(self):
+        """Return the fraction of the reading time that was overlapped with
+        the processing of the data.
+
+        1 means that data was always ready when it was requested, 0 means that
+        there was no overlap (as when reading serially).
+
+        :returns: Fraction of the reading time that was hidden.
+        :rtype: float
+        """
+        if self.read_time == 0:
+            return 1.0 if self.prefetch > 0 else 0.0
+        return max(0.0, 1 - self.wait_time / self.read_time)
+
+    def close(self):
+        """Stop reading and release the resources.
+
+        This is called automatically at the end of the iteration.
+        """
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+            self._own_executor = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
 
 class BaseOneGridFunction(ABC):
@@ -87,20 +386,44 @@ class BaseOneGridFunction(ABC):
     :type restarts_data: tuple of str
     :ivar var_name: Variable name.
     :type var_name: str
+    :ivar executor: Executor used to read the files in parallel (None to read
+                    them serially).
+    :type executor: :py:class:`concurrent.futures.Executor`
 
     """
 
-    def __init__(self, allfiles, var_name):
+    def __init__(
+        self, allfiles, var_name, index=None, executor=None, data_cache=None
+    ):
         """Constructor.
 
         :param allfiles: Paths of files associated to the variable.
         :type allfiles: list of str
         :param var_name: Variable name.
         :type var_name: str
+        :param index: Index used to avoid scanning again files that were
+                      already scanned.
+        :type index: :py:class:`~.FileIndex`
+        :param executor: If not None, when reading an iteration, the various
+                         files are read in parallel using this executor.
+                         Thread pools are the best choice in most cases. With
+                         process pools, this object is sent to the other
+                         processes (without the data that was already read).
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :param data_cache: Cache where to keep the iterations that were read.
+                           The same cache can be shared by multiple
+                           variables. If None, a new cache with default size
+                           is created.
+        :type data_cache: :py:class:`~.DataCache`
 
         """
 
         self.allfiles = list(allfiles)
+        self._index = index
+        self.executor = executor
+        self._data_cache = (
+            data_cache if data_cache is not None else DataCache()
+        )
 
         # self.alldata is a nested dictionary
         # 1. At the first level, we have the file
@@ -110,8 +433,9 @@ class BaseOneGridFunction(ABC):
         #    various refinement levels available in filename at the iteration
         #    and as values another dictionary
         # 4. This last dictionary has as keys the available components and as
-        #    values None if the data has not been read yet, or UniformGridData
-        #    for that component if the data has been read
+        #    values None. The data is read only when it is requested, and it
+        #    is kept in self._data_cache (not here), so that the memory used
+        #    is bounded.
         self.alldata = {}
 
         # We use this to extract only the information related to the specific
@@ -137,6 +461,17 @@ class BaseOneGridFunction(ABC):
         """Read file at path and populate ``self.alldata``."""
         raise NotImplementedError
 
+    def __getstate__(self):
+        # This is used when the object is sent to another process (e.g., when
+        # reading with a process pool). We only send what is needed to read
+        # the data: the index, the executor, and the data that we have
+        # already read stay here.
+        state = self.__dict__.copy()
+        state["_index"] = None
+        state["executor"] = None
+        state["_data_cache"] = None
+        return state
+
     @abstractmethod
     def _read_component_as_uniform_grid_data(
         self, path, iteration, ref_level, component
@@ -333,6 +668,50 @@ class BaseOneGridFunction(ABC):
         for iteration in self.available_iterations:
             yield self[iteration]
 
+    def iter_iterations(self, iterations=None, prefetch=1, executor=None):
+        """Return an iterator over the given iterations that reads the
+        following ``prefetch`` iterations in the background.
+
+        This is useful when the same operation has to be performed on all the
+        iterations (e.g., to make a movie). While the current iteration is
+        being processed, the next ones are read. The data that is read is not
+        saved in the data cache, so it is removed from memory as soon as it is
+        not used anymore.
+
+        Example:
+
+        .. code-block:: python
+
+            it = rho.iter_iterations(prefetch=2)
+            for data in it:
+                plot(data)
+            print(it.overlap_efficiency)
+
+        :param iterations: Iterations to read, in order. If None, all the
+                           available iterations.
+        :type iterations: list of int
+        :param prefetch: Number of iterations to read in advance.
+        :type prefetch: int
+        :param executor: Executor used to read the iterations. If None, a new
+                         thread pool is used. It has to be different from
+                         the executor of this object.
+        :type executor: :py:class:`concurrent.futures.Executor`
+
+        :returns: Iterator over the data at the given iterations.
+        :rtype: :py:class:`~.PrefetchingIterator`
+
+        """
+        if iterations is None:
+            iterations = self.available_iterations
+
+        for iteration in iterations:
+            if iteration not in self.available_iterations:
+                raise KeyError(f"Iteration {iteration} not present")
+
+        return PrefetchingIterator(
+            self, iterations, prefetch=prefetch, executor=executor
+        )
+
     def iteration_at_time(self, time):
         """Return the iteration that corresponds to the given time.
 
@@ -442,10 +821,32 @@ class BaseOneGridFunction(ABC):
         """
         return total_filesize(self.allfiles, unit=unit)
 
-    @lru_cache(128)
+    def _read_components_in_file(self, path, iteration):
+        """Read all the components in the given file at the given iteration.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+
+        :returns: All the components in the file at the given iteration.
+        :rtype: list of :py:class:`~.UniformGridData`
+
+        """
+        return [
+            self._read_component_as_uniform_grid_data(
+                path, iteration, ref_level, comp
+            )
+            for ref_level in self._ref_levels_in_file(path, iteration)
+            for comp in self._components_in_file(path, iteration, ref_level)
+        ]
+
     def _read_iteration_as_HierarchicalGridData(self, iteration):
         """Return the data at the given iteration as a :py:class:`~.HierarchicalGridData`.
 
+        The data is kept in the data cache, so it is read from the files only
+        if it is not there.
+
         :param iteration: Iteration.
         :type iteration: int
 
@@ -454,19 +855,60 @@ class BaseOneGridFunction(ABC):
         :rtype: :py:class:`~.HierarchicalGridData`
 
         """
+        return self._data_cache.get(
+            self._cache_key(iteration),
+            lambda: self._read_iteration_from_files(iteration),
+        )
+
+    def _cache_key(self, iteration):
+        """Return the key that identifies the given iteration in the cache.
+
+        :param iteration: Iteration.
+        :type iteration: int
+
+        :returns: Key for the data cache.
+        :rtype: tuple
+
+        """
+        # The key has to identify this variable among all the ones that share
+        # the same cache. We do not use self in the key, otherwise the cache
+        # would keep this object alive.
+        return (
+            type(self).__name__,
+            self.var_name,
+            tuple(self.allfiles),
+            iteration,
+        )
+
+    def _read_iteration_from_files(self, iteration):
+        """Read the given iteration as a :py:class:`~.HierarchicalGridData`.
+
+        :param iteration: Iteration.
+        :type iteration: int
+
+        :returns: Variable at the given iteration as a
+                  :py:class:`~.HierarchicalGridData`.
+        :rtype: :py:class:`~.HierarchicalGridData`
 
+        """
         uniform_grid_data_components = []
 
-        for path in self.allfiles:
-            for ref_level in self._ref_levels_in_file(path, iteration):
-                for comp in self._components_in_file(
-                    path, iteration, ref_level
-                ):
-                    uniform_grid_data_components.append(
-                        self._read_component_as_uniform_grid_data(
-                            path, iteration, ref_level, comp
-                        )
-                    )
+        paths = [
+            path
+            for path in self.allfiles
+            if self._ref_levels_in_file(path, iteration)
+        ]
+
+        # Different files can be read independently, so, if we have an
+        # executor, we read them in parallel (map returns the results in the
+        # same order as paths, so the result is the same)
+        map_function = map if self.executor is None else self.executor.map
+        components_in_paths = map_function(
+            self._read_components_in_file, paths, [iteration] * len(paths)
+        )
+
+        for components in components_in_paths:
+            uniform_grid_data_components.extend(components)
 
         return (
             grid_data.HierarchicalGridData(uniform_grid_data_components)
@@ -474,7 +916,6 @@ class BaseOneGridFunction(ABC):
             else None
         )
 
-    @lru_cache(128)
     def get_iteration(self, iteration, default=None):
         """Return the data at the given iteration as a :py:class:`~.HierarchicalGridData`.
         If the iteration is not available, return ``default``.
@@ -494,7 +935,6 @@ class BaseOneGridFunction(ABC):
             return default
         return self[iteration]
 
-    @lru_cache(128)
     def get_time(self, time, default=None):
         """Return the data at the given time as a :py:class:`~.HierarchicalGridData`.
         If the time is not available, return ``default``.
@@ -522,7 +962,10 @@ class BaseOneGridFunction(ABC):
     def read_on_grid(self, iteration, grid, resample=False):
         """Read an iteration and resample the output on the specified grid.
 
-        Warning: this can be computationally expensive!
+        Warning: this can be computationally expensive! The indices and the
+        weights used to resample are saved (see :py:class:`~.GridResampler`),
+        so reading other iterations with the same grid structure on the same
+        grid is faster.
 
         :param iteration: requested iteration
         :type iteration: time
@@ -594,6 +1037,12 @@ class OneGridFunctionASCII(BaseOneGridFunction):
     ASCII files do not contain information about the ghost zones, but this can be
     set "by hand".
 
+    Files are read in two phases. When the object is created, the files are
+    scanned to find where each block (iteration, refinement level, component)
+    is located. The data of a block is read only when it is requested. For
+    compressed files, the content is decompressed once in a temporary file,
+    so that the blocks can be read directly.
+
     """
 
     # TODO (REFACTORING): Avoid reading files twice.
@@ -612,7 +1061,22 @@ class OneGridFunctionASCII(BaseOneGridFunction):
         "bz2": (bopen, "rt"),
     }
 
-    def __init__(self, allfiles, var_name, num_ghost=None):
+    # Size (in bytes) of the chunks in which we read the files. Larger chunks
+    # are faster to process, but require more memory.
+    _chunk_size = 64 * 1024 ** 2
+
+    # Lines that are not comments and are not blank contain data
+    _rx_data_line = re.compile(rb"^[^#\s].*$", re.MULTILINE)
+
+    def __init__(
+        self,
+        allfiles,
+        var_name,
+        num_ghost=None,
+        index=None,
+        executor=None,
+        data_cache=None,
+    ):
         """Constructor.
 
         :param allfiles: Paths of files associated to the variable.
@@ -621,28 +1085,230 @@ class OneGridFunctionASCII(BaseOneGridFunction):
         :type var_name: str
         :param num_ghost: Number of ghost zones in each direction.
         :type num_ghost: 1d NumPy array
+        :param index: Index used to avoid scanning again files that were
+                      already scanned.
+        :type index: :py:class:`~.FileIndex`
+        :param executor: If not None, when reading an iteration, the various
+                         files are read in parallel using this executor.
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :param data_cache: Cache where to keep the iterations that were read.
+        :type data_cache: :py:class:`~.DataCache`
 
         """
 
         self._iterations_to_times = {}
         self.num_ghost = num_ghost
 
-        super().__init__(allfiles, var_name)
+        # self._blocks is a dictionary with keys the files and values
+        # dictionaries that map (iteration, ref_level, component) to the
+        # location of the data in the file (offset, length) and the grid
+        self._blocks = {}
+        # self._data_columns maps files to the total number of columns and
+        # the column with the variable
+        self._data_columns = {}
+        # For compressed files, we save here the compression method and the
+        # decompressed content (as temporary files). We read these files from
+        # multiple places, so we need a lock to make sure that seek and read
+        # are not interleaved.
+        self._compression_methods = {}
+        self._decompressed_files = {}
+        self._decompressed_files_lock = threading.Lock()
+
+        super().__init__(
+            allfiles,
+            var_name,
+            index=index,
+            executor=executor,
+            data_cache=data_cache,
+        )
 
-    def _parse_file(self, path):
-        """Read the content of the given file.
+    def __getstate__(self):
+        state = super().__getstate__()
+        # Temporary files and locks cannot be sent to other processes, the
+        # files will be decompressed again if needed
+        del state["_decompressed_files_lock"]
+        state["_decompressed_files"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._decompressed_files_lock = threading.Lock()
+
+    def _grid_from_block(
+        self, coordinates_1d, time, iteration, ref_level, component
+    ):
+        """Return the :py:class:`~.UniformGrid` of a block of the ASCII file.
+
+        A block is a set of contiguous lines with the same iteration,
+        refinement level, and component.
 
-        At the moment, we read the entire file line by line, which is very
-        inefficient.
+        :param coordinates_1d: Sorted unique coordinates x, y, z in the block.
+        :type coordinates_1d: list of three 1D NumPy arrays
+        :param time: Time.
+        :type time: float
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
+
+        :returns: Grid of the block.
+        :rtype: :py:class:`~.UniformGrid`
+
+        """
+        x0_3d = np.array([coord[0] for coord in coordinates_1d])
+        x1_3d = np.array([coord[-1] for coord in coordinates_1d])
+        shape_3d = np.array([len(coord) for coord in coordinates_1d])
+
+        # Now we find the interesting dimensions
+        dimensions_in_data = x0_3d != x1_3d
+
+        return grid_data.UniformGrid(
+            shape_3d[dimensions_in_data],
+            x0=x0_3d[dimensions_in_data],
+            x1=x1_3d[dimensions_in_data],
+            num_ghost=self.num_ghost,
+            component=component,
+            ref_level=ref_level,
+            time=time,
+            iteration=iteration,
+        )
+
+    def _index_file(self, path, compression_method):
+        """Find the blocks of data in the given file, without reading the data.
+
+        The file is read in large chunks and the numbers are converted with
+        NumPy in bulk. Then, the blocks with the same iteration, refinement
+        level, and component are identified with array operations.
+
+        Compressed files are decompressed in a temporary file as they are
+        read.
 
         :param path: Path of the file to read.
         :type path: str
+        :param compression_method: How the file is compressed (None, ``gz``,
+                                   or ``bz2``).
+        :type compression_method: str or None
+
+        :returns: Number of columns, and list of lists ``[key, time, start,
+                  end, coordinates_1d]`` for each block, where key is
+                  ``(iteration, ref_level, component)``, start and end are
+                  the byte offsets of the block in the (decompressed) file,
+                  and coordinates_1d are the unique coordinates along the
+                  three directions.
+        :rtype: tuple with int and list
 
         """
+        opener, _ = OneGridFunctionASCII._decompressor[compression_method]
+
+        # These are the columns we need to index the file: iteration,
+        # refinement level, component, time, x, y, z. We only keep these to
+        # save memory.
+        columns = [0, 2, 3, 8, 9, 10, 11]
+
+        blocks = []
+        num_columns = None
+        # Where the current chunk starts in the file
+        chunk_offset = 0
+
+        # For compressed files, we save the decompressed content, so that we
+        # can read the blocks directly from there
+        if compression_method is not None:
+            decompressed_file = tempfile.TemporaryFile()
+
+        # We read the file in binary mode, so that we can work with byte
+        # offsets
+        with opener(path, "rb") as fil:
+            for chunk in read_lines_in_chunks(fil, self._chunk_size):
+                if compression_method is not None:
+                    decompressed_file.write(chunk)
+
+                this_chunk_offset = chunk_offset
+                chunk_offset += len(chunk)
+
+                # We find the number of columns from the first line with data
+                if num_columns is None:
+                    first_line = self._rx_data_line.search(chunk)
+                    # This chunk only contains the header
+                    if first_line is None:
+                        continue
+                    num_columns = len(first_line.group().split())
+
+                # Here we find where the lines with data start and end. Lines
+                # with data are those that start with a digit.
+                buffer = np.frombuffer(chunk, dtype=np.uint8)
+                line_ends = np.flatnonzero(buffer == ord("\n"))
+                # The last chunk may not end with a newline
+                if chunk[-1:] != b"\n":
+                    line_ends = np.append(line_ends, len(chunk))
+                line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+                first_chars = buffer[np.minimum(line_starts, len(buffer) - 1)]
+                is_data = (
+                    (line_ends > line_starts)
+                    & (first_chars >= ord("0"))
+                    & (first_chars <= ord("9"))
+                )
+                data_starts = line_starts[is_data] + this_chunk_offset
+                data_ends = line_ends[is_data] + this_chunk_offset
+
+                table = parse_data(chunk, num_columns, columns, path)
+
+                if len(table) != len(data_starts):
+                    raise RuntimeError(f"Malformed data in file {path}")
+
+                # A new block starts every time the iteration, the refinement
+                # level, or the component change. So, we look for changes in
+                # the first three columns of table.
+                changes = (
+                    np.flatnonzero(
+                        np.any(np.diff(table[:, :3], axis=0) != 0, axis=1)
+                    )
+                    + 1
+                )
+                starts = np.concatenate(([0], changes))
+                ends = np.concatenate((changes, [len(table)]))
+
+                for start, end in zip(starts, ends):
+                    key = tuple(map(int, table[start, :3]))
+                    coordinates_1d = [
+                        np.unique(table[start:end, col]) for col in (4, 5, 6)
+                    ]
+                    # The block may have started in the previous chunk. In
+                    # this case, we extend it.
+                    if start == 0 and blocks and blocks[-1][0] == key:
+                        blocks[-1][3] = int(data_ends[end - 1]) + 1
+                        blocks[-1][4] = [
+                            np.union1d(old, new)
+                            for old, new in zip(blocks[-1][4], coordinates_1d)
+                        ]
+                        continue
+                    blocks.append(
+                        [
+                            key,
+                            float(table[start, 3]),
+                            int(data_starts[start]),
+                            int(data_ends[end - 1]) + 1,
+                            coordinates_1d,
+                        ]
+                    )
+
+        if compression_method is not None:
+            decompressed_file.flush()
+            with self._decompressed_files_lock:
+                self._decompressed_files[path] = decompressed_file
+
+        return num_columns, blocks
+
+    def _parse_file(self, path):
+        """Find the blocks of data in the given file, without reading the data.
+
+        For each block, we save where it is in the file and its grid.
+
+        :param path: Path of the file to read.
+        :type path: str
 
-        # First we parse the header to find the column description, then we read
-        # the ENTIRE file. This is very inefficient, but it is not too hard to
-        # implement.
+        """
 
         # This regex is meant to understand if we have one variable per file or
         # one group per file, and to understand if we have compression. To see a
@@ -664,6 +1330,7 @@ class OneGridFunctionASCII(BaseOneGridFunction):
         opener, opener_mode = OneGridFunctionASCII._decompressor[
             compression_method
         ]
+        self._compression_methods[path] = compression_method
 
         # These files always have the column format line, and have the data
         # format line only if they are "one file per group"
@@ -673,6 +1340,7 @@ class OneGridFunctionASCII(BaseOneGridFunction):
             extended_format=True,
             opener=opener,
             opener_mode=opener_mode,
+            index=self._index,
         )
         # We have two possibilities, one is that the file only contains one
         # variable, column_description will be the column number. If the
@@ -683,179 +1351,98 @@ class OneGridFunctionASCII(BaseOneGridFunction):
             # to be the number of column with the data we are interested in
             column_description = column_description[self.var_name]
 
-        # Now we read the entire file, line by line. This is the most
-        # inefficient way possible. But at least, it is reasonably
-        # straightforward to implement. If you are reading this comment and you
-        # want to improve this, feel free to do it.
-
-        def current_data_to_UniformGridData(
-            current_x,
-            current_y,
-            current_z,
-            current_data,
-            current_time,
-            current_iteration,
-            current_component,
-            current_ref_level,
-        ):
-            # First, we compute x0 and x1
-            x0_3d = np.asarray(
-                [
-                    np.amin(current_x),
-                    np.amin(current_y),
-                    np.amin(current_z),
-                ]
-            )
-            x1_3d = np.array(
-                [
-                    np.amax(current_x),
-                    np.amax(current_y),
-                    np.amax(current_z),
-                ]
-            )
+        # The blocks do not depend on the variable, so the same entry in the
+        # index is shared by all the variables in the file
+        num_columns, blocks = file_index.cached(
+            self._index,
+            path,
+            "ascii_blocks",
+            lambda: self._index_file(path, compression_method),
+        )
 
-            # Now we find the interesting dimensions
-            dimensions_in_data = x0_3d != x1_3d
+        # No data in the file
+        if num_columns is None:
+            return
 
-            # With unique we find the real data
-            shape_3d = [
-                len(np.unique(current_x)),
-                len(np.unique(current_y)),
-                len(np.unique(current_z)),
-            ]
+        self._data_columns[path] = (num_columns, column_description)
 
-            shape = np.asarray(shape_3d)[dimensions_in_data]
-            x0 = np.asarray(x0_3d)[dimensions_in_data]
-            x1 = np.asarray(x1_3d)[dimensions_in_data]
+        alldata_file = self.alldata.setdefault(path, {})
+        blocks_file = self._blocks.setdefault(path, {})
 
-            var_data = np.array(current_data).reshape(tuple(shape[::-1]))
+        for key, time, start, end, coordinates_1d in blocks:
+            iteration, ref_level, component = key
 
-            grid = grid_data.UniformGrid(
-                shape,
-                x0=x0,
-                x1=x1,
-                num_ghost=self.num_ghost,
-                component=current_component,
-                ref_level=current_ref_level,
-                time=current_time,
-                iteration=current_iteration,
+            alldata_ref_level = alldata_file.setdefault(
+                iteration, {}
+            ).setdefault(ref_level, {})
+
+            # If the same component appears twice, we keep the first one
+            if component in alldata_ref_level:
+                continue
+
+            # We set the actual data to None, and we will read it in
+            # _read_component_as_uniform_grid_data upon request
+            alldata_ref_level[component] = None
+            blocks_file[key] = (
+                start,
+                end - start,
+                self._grid_from_block(
+                    coordinates_1d, time, iteration, ref_level, component
+                ),
             )
 
-            return grid_data.UniformGridData(grid, np.transpose(var_data))
-
-        # We are going to assume that the iteration column is the first
-        with opener(path, opener_mode) as fil:
-            # We use these variables as local variables. We are going to aggregate
-            # the data read here, and reset it when we find a blank line
-            current_iteration = None
-            current_ref_level = None
-            current_component = None
-            current_x = []
-            current_y = []
-            current_z = []
-            current_data = []
-            # We scan the entire file line by line
-            for line in fil:
-                # Skip header
-                if not line[0].isdigit():
-                    # We don't care about lines that don't start with a number
-                    continue
-
-                # Here are can assume that this is a line with data
-                line_data = line.split()
-                line_data = list(map(float, line_data))
-                if current_iteration is None:
-                    current_iteration = line_data[0]
-
-                if current_ref_level is None:
-                    current_ref_level = line_data[2]
-
-                if current_component is None:
-                    current_component = line_data[3]
-
-                # If iteration, component, or refinement level changes, we
-                # write the data, else we continue reading
-                if (
-                    line_data[0] != current_iteration
-                    or line_data[2] != current_ref_level
-                    or line_data[3] != current_component
-                ):
-                    alldata_file = self.alldata.setdefault(path, {})
-                    alldata_iteration = alldata_file.setdefault(
-                        int(current_iteration), {}
-                    )
-                    alldata_ref_level = alldata_iteration.setdefault(
-                        int(current_ref_level), {}
-                    )
+            self._iterations_to_times.setdefault(iteration, time)
 
-                    current_time = line_data[8]
-
-                    uniform_grid_data = current_data_to_UniformGridData(
-                        current_x,
-                        current_y,
-                        current_z,
-                        current_data,
-                        current_time,
-                        current_iteration,
-                        current_component,
-                        current_ref_level,
-                    )
+    def _decompress(self, path):
+        """Decompress the given file in a temporary file.
 
-                    alldata_ref_level.setdefault(
-                        int(current_component), uniform_grid_data
-                    )
+        :param path: Path of the file.
+        :type path: str
 
-                    # Write iterations_to_time
-                    if current_iteration not in self._iterations_to_times:
-                        self._iterations_to_times[
-                            current_iteration
-                        ] = current_time
-
-                    # Reset everything
-                    current_iteration = line_data[0]
-                    current_ref_level = line_data[2]
-                    current_component = line_data[3]
-                    current_x = []
-                    current_y = []
-                    current_z = []
-                    current_data = []
-
-                # We still have to read the data on this line even if we
-                # "are done with a group"
-                current_x.append(line_data[9])
-                current_y.append(line_data[10])
-                current_z.append(line_data[11])
-
-                current_data.append(line_data[column_description])
-
-            # Here we take care of the last piece of data
-            if len(current_data) > 0:
-                if current_iteration not in self._iterations_to_times:
-                    current_time = line_data[8]
-                    self._iterations_to_times[current_iteration] = current_time
-
-                alldata_file = self.alldata.setdefault(path, {})
-                alldata_iteration = alldata_file.setdefault(
-                    int(current_iteration), {}
-                )
-                alldata_ref_level = alldata_iteration.setdefault(
-                    int(current_ref_level), {}
-                )
+        :returns: Temporary file with the decompressed content.
+        :rtype: file object
 
-                uniform_grid_data = current_data_to_UniformGridData(
-                    current_x,
-                    current_y,
-                    current_z,
-                    current_data,
-                    current_time,
-                    current_iteration,
-                    current_component,
-                    current_ref_level,
-                )
+        """
+        opener, _ = OneGridFunctionASCII._decompressor[
+            self._compression_methods[path]
+        ]
+        decompressed_file = tempfile.TemporaryFile()
+        with opener(path, "rb") as fil:
+            for chunk in read_lines_in_chunks(fil, self._chunk_size):
+                decompressed_file.write(chunk)
+        decompressed_file.flush()
+        return decompressed_file
 
-                alldata_ref_level.setdefault(
-                    int(current_component), uniform_grid_data
-                )
+    def _read_block(self, path, offset, length):
+        """Return the bytes of the given file between ``offset`` and ``offset +
+        length``.
+
+        For compressed files, the decompressed content is read.
+
+        :param path: Path of the file.
+        :type path: str
+        :param offset: Where to start reading (in bytes).
+        :type offset: int
+        :param length: How many bytes to read.
+        :type length: int
+
+        :returns: Content of the file.
+        :rtype: bytes
+
+        """
+        if self._compression_methods.get(path) is not None:
+            with self._decompressed_files_lock:
+                # When the blocks come from the index, we did not decompress
+                # the file yet
+                if path not in self._decompressed_files:
+                    self._decompressed_files[path] = self._decompress(path)
+                decompressed_file = self._decompressed_files[path]
+                decompressed_file.seek(offset)
+                return decompressed_file.read(length)
+
+        with open(path, "rb") as fil:
+            fil.seek(offset)
+            return fil.read(length)
 
     def _read_component_as_uniform_grid_data(
         self, path, iteration, ref_level, component
@@ -876,8 +1463,23 @@ class OneGridFunctionASCII(BaseOneGridFunction):
 
         """
 
-        # We have already read the files, so we just return it
-        return self.alldata[path][iteration][ref_level][component]
+        offset, length, grid = self._blocks[path][
+            (iteration, ref_level, component)
+        ]
+        num_columns, column = self._data_columns[path]
+
+        # We only decode the block we need
+        data = parse_data(
+            self._read_block(path, offset, length),
+            num_columns,
+            [column],
+            path,
+        )
+
+        # The x coordinate is the one that changes faster
+        data = np.transpose(data.reshape(tuple(grid.shape[::-1])))
+
+        return grid_data.UniformGridData(grid, data)
 
     def time_at_iteration(self, iteration):
         """Return the time at a given iteration.
@@ -938,13 +1540,40 @@ class OneGridFunctionH5(BaseOneGridFunction):
     ([ ]c=(\d+))?       # Component
     """
 
-    def __init__(self, allfiles, var_name):
+    def __init__(
+        self,
+        allfiles,
+        var_name,
+        index=None,
+        catalogs=None,
+        file_pool=None,
+        executor=None,
+        data_cache=None,
+    ):
         """Constructor.
 
         :param allfiles: Paths of files associated to the variable.
         :type allfiles: list of str
         :param var_name: Variable name.
         :type var_name: str
+        :param index: Index used to avoid scanning again files that were
+                      already scanned.
+        :type index: :py:class:`~.FileIndex`
+        :param catalogs: Dictionary with keys the paths of the files and
+                         values the corresponding :py:class:`~.H5FileCatalog`.
+                         Files that are not in the dictionary are read and
+                         added to it. The same dictionary can be shared by
+                         multiple variables, so that files are read only once.
+        :type catalogs: dict
+        :param file_pool: Pool of open HDF5 files, used to avoid opening the
+                          same file multiple times. If None, files are opened
+                          and closed every time they are read.
+        :type file_pool: :py:class:`~.H5FilePool`
+        :param executor: If not None, when reading an iteration, the various
+                         files are read in parallel using this executor.
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :param data_cache: Cache where to keep the iterations that were read.
+        :type data_cache: :py:class:`~.DataCache`
 
         """
 
@@ -953,9 +1582,16 @@ class OneGridFunctionH5(BaseOneGridFunction):
         self.thorn_name = None
         self.map = None
 
-        self.rx_group_name = re.compile(self._pattern_group_name, re.VERBOSE)
+        self._catalogs = {} if catalogs is None else catalogs
+        self._file_pool = file_pool
 
-        super().__init__(allfiles, var_name)
+        super().__init__(
+            allfiles,
+            var_name,
+            index=index,
+            executor=executor,
+            data_cache=data_cache,
+        )
 
         # super() will fill the other variables that we need for dataset_format
         if self.map is None:
@@ -976,7 +1612,8 @@ class OneGridFunctionH5(BaseOneGridFunction):
         # self._are_ghostzones_in_file(path) returns True or False, so this
         # is a set with True, False or a mix
         ghost_in_files = {
-            self._are_ghostzones_in_file(path) for path in self.allfiles
+            self._catalog(path).are_ghostzones_in_file
+            for path in self.allfiles
         }
 
         # Here we check that we only have True or False
@@ -989,6 +1626,34 @@ class OneGridFunctionH5(BaseOneGridFunction):
         # False), so we pick that (with tuple unpacking)
         (self.are_ghostzones_in_files,) = ghost_in_files
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        # Open files cannot be sent to other processes, so the other process
+        # uses its own pool (with the same size)
+        if self._file_pool is not None:
+            state["_file_pool"] = None
+            state["_max_open_files"] = self._file_pool.max_open_files
+        return state
+
+    def __setstate__(self, state):
+        max_open_files = state.pop("_max_open_files", None)
+        self.__dict__.update(state)
+        if max_open_files is not None:
+            self._file_pool = file_pool.H5FilePool(max_open_files)
+
+    def _catalog(self, path):
+        """Return the :py:class:`~.H5FileCatalog` of the given file.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: Catalog of the content of the file.
+        :rtype: :py:class:`~.H5FileCatalog`
+        """
+        if path not in self._catalogs:
+            self._catalogs[path] = H5FileCatalog(path, index=self._index)
+        return self._catalogs[path]
+
     def _parse_file(self, path):
         """Read the content of the given file (without reading the data).
 
@@ -998,53 +1663,32 @@ class OneGridFunctionH5(BaseOneGridFunction):
         """
         # This will give us an overview of what is available in the provided
         # file. We keep a collection of all these in the variable self.alldata
-        with h5py.File(path, "r") as f:
-            for group in f.keys():
-                matched = self.rx_group_name.match(group)
-                # If this is not an interesting group, just skip it
-                if not matched:
-                    continue
-
-                (
-                    thorn_name,
-                    var_name,
-                    iteration,
-                    time_level,
-                    map_,
-                    _,
-                    ref_level,
-                    _,
-                    component,
-                ) = matched.groups()
-
-                if var_name != self.var_name:
-                    continue
-
-                time_level = int(time_level)
-
-                # We only care about the current timelevel
-                if time_level != 0:
-                    continue
-
-                if self.thorn_name is None:
-                    self.thorn_name = thorn_name
-
-                if self.map is None:
-                    self.map = map_
-
-                component = -1 if matched.group(9) is None else int(component)
-                # This is important to support grid arrays, which do not have a
-                # refinement level
-                ref_level = -1 if matched.group(7) is None else int(ref_level)
-
-                # Here is where we prepare are nested alldata dictionary
-                alldata_file = self.alldata.setdefault(path, {})
-                alldata_iteration = alldata_file.setdefault(int(iteration), {})
-                alldata_ref_level = alldata_iteration.setdefault(ref_level, {})
-
-                # We set the actual data to None, and we will read it in
-                # _read_component_as_uniform_grid_data upon request
-                alldata_ref_level.setdefault(int(component), None)
+        catalog = self._catalog(path)
+
+        if self.var_name not in catalog.variables:
+            return
+
+        if self.thorn_name is None:
+            self.thorn_name = catalog.thorn_names.get(self.var_name)
+
+        if self.map is None:
+            self.map = catalog.maps.get(self.var_name)
+
+        for iteration, time_level, ref_level, component in catalog.variables[
+            self.var_name
+        ]:
+            # We only care about the current timelevel
+            if time_level != 0:
+                continue
+
+            # Here is where we prepare are nested alldata dictionary
+            alldata_file = self.alldata.setdefault(path, {})
+            alldata_iteration = alldata_file.setdefault(iteration, {})
+            alldata_ref_level = alldata_iteration.setdefault(ref_level, {})
+
+            # We set the actual data to None, and we will read it in
+            # _read_component_as_uniform_grid_data upon request
+            alldata_ref_level.setdefault(component, None)
 
     def _grid_from_dataset(self, dataset, iteration, ref_level, component):
         """Return a :py:class:`~.UniformGrid` from a given HDF5 dataset.
@@ -1110,7 +1754,13 @@ class OneGridFunctionH5(BaseOneGridFunction):
         """
         ref_level_str = f" rl={ref_level}" if (ref_level >= 0) else ""
         component_str = f" c={component}" if (component >= 0) else ""
-        with h5py.File(path, "r") as f:
+        # With a pool, the file is kept open for the following reads
+        opener = (
+            h5py.File(path, "r")
+            if self._file_pool is None
+            else self._file_pool.open(path)
+        )
+        with opener as f:
             try:
                 yield f[
                     self.dataset_format
@@ -1140,32 +1790,41 @@ class OneGridFunctionH5(BaseOneGridFunction):
 
         """
 
-        if self.alldata[path][iteration][ref_level][component] is None:
-            with self._get_dataset(
-                path, iteration, ref_level, component
-            ) as dataset:
-                grid = self._grid_from_dataset(
-                    dataset, iteration, ref_level, component
-                )
-                data = np.transpose(dataset[()])
-
-                self.alldata[path][iteration][ref_level][
-                    component
-                ] = grid_data.UniformGridData(grid, data)
+        with self._get_dataset(
+            path, iteration, ref_level, component
+        ) as dataset:
+            grid = self._grid_from_dataset(
+                dataset, iteration, ref_level, component
+            )
+            data = np.transpose(dataset[()])
 
-        return self.alldata[path][iteration][ref_level][component]
+        return grid_data.UniformGridData(grid, data)
 
     @staticmethod
-    def _are_ghostzones_in_file(path):
+    def _are_ghostzones_in_file(path, index=None):
         """Return whether the ghostzones were output or not.
 
         :param path: File to inspect.
         :type path: str
+        :param index: Index used to avoid reading again files that were
+                      already read.
+        :type index: :py:class:`~.FileIndex`
 
         :returns: Whether ``path`` contains ghost zones.
         :rtype: bool
 
         """
+        return file_index.cached(
+            index,
+            path,
+            "h5_ghostzones",
+            lambda: OneGridFunctionH5._read_are_ghostzones_in_file(path),
+        )
+
+    @staticmethod
+    def _read_are_ghostzones_in_file(path):
+        """Implementation of :py:meth:`~._are_ghostzones_in_file` (without
+        the index)."""
         # This is a tricky and important function to stitch together all the
         # different components. Carpet has an option (technically two) to output
         # the ghostzones in the files. These are: output_ghost_points and
@@ -1244,6 +1903,9 @@ class AllGridFunctions:
     :type dimension: tuple
     :ivar num_ghost: Number of ghost zones in each dimension.
     :type num_ghost: 1d NumPy array.
+    :ivar executor: Executor passed to the variables to read files in
+                    parallel.
+    :type executor: :py:class:`concurrent.futures.Executor`
 
     """
 
@@ -1272,7 +1934,16 @@ class AllGridFunctions:
         (0, 1, 2): "xyz",
     }
 
-    def __init__(self, allfiles, dimension, num_ghost=None):
+    def __init__(
+        self,
+        allfiles,
+        dimension,
+        num_ghost=None,
+        index=None,
+        file_pool=None,
+        executor=None,
+        data_cache=None,
+    ):
         """Constructor.
 
         :param allfiles: List of all the files.
@@ -1282,9 +1953,30 @@ class AllGridFunctions:
         :param num_ghost: Number of ghost zones in the data for each dimension.
                           This is used only for ASCII data.
         :type num_ghost: list or tuple of the same length as the number of dimension
+        :param index: Index used to avoid scanning again files that were
+                      already scanned.
+        :type index: :py:class:`~.FileIndex`
+        :param file_pool: Pool of open HDF5 files shared by all the
+                          variables. If None, files are opened and closed
+                          every time they are read.
+        :type file_pool: :py:class:`~.H5FilePool`
+        :param executor: If not None, the variables read the various files
+                         in parallel using this executor.
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :param data_cache: Cache shared by all the variables to keep the
+                           iterations that were read. If None, a new cache
+                           with default size is created.
+        :type data_cache: :py:class:`~.DataCache`
 
         """
 
+        self._index = index
+        self._file_pool = file_pool
+        self.executor = executor
+        self._data_cache = (
+            data_cache if data_cache is not None else DataCache()
+        )
+
         # Here we save what kind of file we are looking at
         # We assume that dimension is already sanitized (that is, is in tuple
         # form and not in string form)
@@ -1335,6 +2027,10 @@ class AllGridFunctions:
         self._vars_ascii = {}
         self._vars_h5 = {}
 
+        # Catalogs of the HDF5 files (path: H5FileCatalog), shared by all the
+        # variables, so that each file is read only once
+        self._h5_catalogs = {}
+
         rx_h5 = re.compile(h5_pattern)
         rx_ascii = re.compile(ascii_pattern)
 
@@ -1364,24 +2060,15 @@ class AllGridFunctions:
                     var_list.add(f)
                 else:
                     # We have to open the file to understand which variables
-                    # are available
-                    #
-                    # We use the pattern name in OneGridFunctionH5
-                    rx_group_name = re.compile(
-                        OneGridFunctionH5._pattern_group_name, re.VERBOSE
-                    )
-                    with h5py.File(f, "r") as h5f:
-                        # Here group is in the sense of HDF5 group
-                        for group in h5f.keys():
-                            group_matched = rx_group_name.match(group)
-                            # If this is not an interesting group, just skip it
-                            if not group_matched:
-                                continue
-                            variable_name = group_matched.group(2)
-                            var_list = self._vars_h5.setdefault(
-                                variable_name, set()
-                            )
-                            var_list.add(f)
+                    # are available. We save what we find, so that the
+                    # variables can use it without opening the file again.
+                    catalog = H5FileCatalog(f, index=index)
+                    self._h5_catalogs[f] = catalog
+                    for variable_name in catalog.variables:
+                        var_list = self._vars_h5.setdefault(
+                            variable_name, set()
+                        )
+                        var_list.add(f)
             elif matched_ascii is not None:
                 # As in the case of H5 files, we first need to understand if
                 # the output is with "one_group_per_file". If yes, we have to
@@ -1430,6 +2117,7 @@ class AllGridFunctions:
                         extended_format=True,
                         opener=opener,
                         opener_mode=opener_mode,
+                        index=index,
                     )
                     for variable_name in column_description.keys():
                         var_list = self._vars_ascii.setdefault(
@@ -1446,7 +2134,15 @@ class AllGridFunctions:
         var_name = str(key)
         # We prefer h5
         if var_name in self._vars_h5:
-            return OneGridFunctionH5(self._vars_h5[var_name], var_name)
+            return OneGridFunctionH5(
+                self._vars_h5[var_name],
+                var_name,
+                index=self._index,
+                catalogs=self._h5_catalogs,
+                file_pool=self._file_pool,
+                executor=self.executor,
+                data_cache=self._data_cache,
+            )
 
         if var_name in self._vars_ascii:
             if self.num_ghost is None:
@@ -1456,7 +2152,12 @@ class AllGridFunctions:
                     " of this object to properly account for the ghost zones. "
                 )
             return OneGridFunctionASCII(
-                self._vars_ascii[var_name], var_name, num_ghost=self.num_ghost
+                self._vars_ascii[var_name],
+                var_name,
+                num_ghost=self.num_ghost,
+                index=self._index,
+                executor=self.executor,
+                data_cache=self._data_cache,
             )
 
         raise KeyError(f"Variable {key} not present in simulation data")
@@ -1587,7 +2288,14 @@ class GridFunctionsDir:
         # AllGridFunctions, which contains all the variables for which that
         # dimension is available
         self._all_griddata = {
-            dim: AllGridFunctions(sd.allfiles, dim)
+            dim: AllGridFunctions(
+                sd.allfiles,
+                dim,
+                index=sd.index,
+                file_pool=sd.file_pool,
+                executor=sd.executor,
+                data_cache=sd.data_cache,
+            )
             for dim in self._dim_indices.values()
         }
 
@@ -47,11 +47,15 @@ The module contains also functions to work with horizons:
 import os
 import re
 import warnings
+from collections.abc import Mapping
 
 import numpy as np
 
 from kuibit.attr_dict import pythonize_name_dict
+from kuibit.cactus_ascii_utils import load_table, parse_data
 from kuibit.timeseries import (
+    TimeSeries,
+    _mask_duplicated_iters,
     remove_duplicated_iters,
     combine_ts,
 )
@@ -96,6 +100,234 @@ def compute_horizons_separation(horizon1, horizon2, resample=True):
     )
 
 
+def _read_ah_file(path, time_column):
+    """Read the content of the AHFinderDirect file ``path``, removing the
+    overlapping segments.
+
+    This is a function (and not a method of :py:class:`~.AHVars`) so that it
+    can be sent to a process pool without the executor.
+
+    :param path: Path of the file.
+    :type path: str
+    :param time_column: Column with the time (0-based).
+    :type time_column: int
+
+    :returns: Table with all the columns of the file.
+    :rtype: 2D NumPy array
+    """
+    data = load_table(path)
+    # Here we apply the same logic of remove_duplicated_iters, but only
+    # once for all the variables
+    return data[_mask_duplicated_iters(data[:, time_column])]
+
+
+class AHVars(Mapping):
+    """Dictionary-like object that maps the names of the variables output by
+    AHFinderDirect (for one horizon) to the associated :py:class:`~.TimeSeries`.
+
+    The files are read only when a variable is requested for the first time.
+    Then, the content of the files is kept in memory, so that the other
+    variables can be computed without reading the files again. Each
+    :py:class:`~.TimeSeries` is computed only once.
+
+    """
+
+    def __init__(self, files, columns, time_column, executor=None):
+        """Constructor.
+
+        :param files: Files with the data of the horizon (one per restart).
+        :type files: list of str
+        :param columns: Dictionary that maps the name of the variables to the
+                        column where they are stored (0-based).
+        :type columns: dict
+        :param time_column: Column with the time (0-based).
+        :type time_column: int
+        :param executor: If not None, the files are read in parallel using
+                         this executor.
+        :type executor: :py:class:`concurrent.futures.Executor`
+        """
+        self._files = list(files)
+        self._columns = columns
+        self._time_column = time_column
+        self._executor = executor
+        # List with the content of each file (without overlapping segments)
+        self._data = None
+        self._timeseries = {}
+
+    def __getitem__(self, key):
+        if key not in self._timeseries:
+            column = self._columns[key]
+            if self._data is None:
+                # Different files can be read independently, so, if we have
+                # an executor, we read them in parallel
+                map_function = (
+                    map if self._executor is None else self._executor.map
+                )
+                self._data = list(
+                    map_function(
+                        _read_ah_file,
+                        self._files,
+                        [self._time_column] * len(self._files),
+                    )
+                )
+            self._timeseries[key] = combine_ts(
+                [
+                    TimeSeries(data[:, self._time_column], data[:, column])
+                    for data in self._data
+                ]
+            )
+        return self._timeseries[key]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+
+class ShapeStore:
+    """Shapes of an horizon at multiple iterations, stored in NumPy arrays.
+
+    The shape of an horizon at a given iteration is described by a number of
+    patches (each covering a portion around an axis) and by the origin.
+    Shapes with the same patches and the same number of points (typically,
+    all of them) are stored together in a block. A block contains an array
+    with the coordinates, with shape (number of iterations, number of patches,
+    3, number of points along the first angular direction, number of points
+    along the second angular direction), and an array with the origins, with
+    shape (number of iterations, 3). The arrays can have more rows than
+    iterations, to make space for the next ones.
+
+    """
+
+    def __init__(self):
+        # _blocks maps the layout of the shapes (names of the patches and
+        # shape of the arrays) to a dictionary with keys iterations,
+        # coordinates, and origins
+        self._blocks = {}
+        # _rows maps the iterations to the layout and to the row in the
+        # associated block
+        self._rows = {}
+
+    @staticmethod
+    def _layout(patches):
+        """Return the layout of the shape described by patches (a tuple with
+        the names of the patches and the shape of their arrays).
+
+        If the patches have different shapes, they cannot be stored together
+        in an array, so the shape of each patch is part of the layout.
+        """
+        shapes = {patch.shape for patch in patches.values()}
+        return (
+            tuple(patches),
+            shapes.pop()
+            if len(shapes) == 1
+            else tuple(patch.shape for patch in patches.values()),
+        )
+
+    def add(self, iterations, shapes):
+        """Add the shapes at the given iterations.
+
+        Iterations that are already in the store are ignored.
+
+        :param iterations: Iterations.
+        :type iterations: list of int
+        :param shapes: Shape at each iteration, as a tuple with the patches
+                       (dictionary that maps the name of the patch to the
+                       array with the coordinates) and the origin.
+        :type shapes: list of tuples
+        """
+        new_shapes = {}
+        for iteration, (patches, origin) in zip(iterations, shapes):
+            if iteration in self._rows:
+                continue
+            new_shapes.setdefault(self._layout(patches), []).append(
+                (iteration, patches, origin)
+            )
+
+        for layout, new in new_shapes.items():
+            patch_names, patch_shape = layout
+            if isinstance(patch_shape[0], tuple):
+                # Patches with different shapes, we keep them as a list (in
+                # the coordinates array there is one element per iteration)
+                coordinates = np.empty(len(new), dtype=object)
+                coordinates[:] = [
+                    list(patches.values()) for _, patches, _ in new
+                ]
+            else:
+                coordinates = np.array(
+                    [
+                        [patches[name] for name in patch_names]
+                        for _, patches, _ in new
+                    ]
+                )
+            origins = np.array([origin for _, _, origin in new])
+
+            block = self._blocks.get(layout)
+            if block is None:
+                block = {
+                    "iterations": [],
+                    "coordinates": coordinates,
+                    "origins": origins,
+                }
+                self._blocks[layout] = block
+            else:
+                # Shapes are often added one at the time, so we allocate more
+                # rows than needed (doubling the size) to avoid copying all
+                # the arrays every time
+                size = len(block["iterations"])
+                needed = size + len(new)
+                if needed > len(block["origins"]):
+                    capacity = max(needed, 2 * len(block["origins"]))
+                    for key in ("coordinates", "origins"):
+                        grown = np.empty(
+                            (capacity,) + block[key].shape[1:],
+                            dtype=block[key].dtype,
+                        )
+                        grown[:size] = block[key][:size]
+                        block[key] = grown
+                block["coordinates"][size:needed] = coordinates
+                block["origins"][size:needed] = origins
+
+            for iteration, _, _ in new:
+                self._rows[iteration] = (layout, len(block["iterations"]))
+                block["iterations"].append(iteration)
+
+    def get(self, iteration):
+        """Return the shape at the given iteration.
+
+        :param iteration: Iteration.
+        :type iteration: int
+
+        :returns: Patches (dictionary that maps the name of the patch to the
+                  array with the coordinates) and origin.
+        :rtype: tuple with dictionary and 1D NumPy array
+        """
+        if iteration not in self._rows:
+            raise KeyError(f"Shape at iteration {iteration} not available")
+
+        layout, row = self._rows[iteration]
+        block = self._blocks[layout]
+        # We return views of the arrays, so nothing is copied
+        patches = dict(zip(layout[0], block["coordinates"][row]))
+        return patches, block["origins"][row]
+
+    @property
+    def iterations(self):
+        """Iterations in the store.
+
+        :returns: Iterations in the store, sorted.
+        :rtype: list of int
+        """
+        return sorted(self._rows)
+
+    def __contains__(self, iteration):
+        return iteration in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+
 class OneHorizon:
     r"""This class represents properties of an apparent horizon
     computed from the quasi-isolated horizon formalism.
@@ -121,21 +353,26 @@ class OneHorizon:
 
     """
 
-    def __init__(self, qlm_vars, ah_vars, shape_files):
+    def __init__(self, qlm_vars, ah_vars, shape_files, executor=None):
         """Constructor.
 
         :param qlm_vars: Dictionary that maps the name of the QLM variable with
                          the associated :py:class:`~.TimeSeries`.
         :type qlm_vars: dict
-        :param ah_vars: Dictionary that maps the name of the AH variable with
-                        the associated :py:class:`~.TimeSeries`.
+        :param ah_vars: Dictionary (or :py:class:`~.AHVars`) that maps the
+                        name of the AH variable with the associated
+                        :py:class:`~.TimeSeries`.
         :type ah_vars: dict
         :param shape_files: Dictionary that maps the iteration to the files where
                             to find the shape at that iteration.
         :type shape_files: dict
+        :param executor: Executor used by default to read multiple shape files
+                         in parallel (see :py:meth:`~.load_shapes`).
+        :type executor: :py:class:`concurrent.futures.Executor`
 
         """
         self._qlm_vars = qlm_vars
+        self._executor = executor
         self._ah_vars = ah_vars
 
         # We turn the var_dictionary into attributes
@@ -163,11 +400,12 @@ class OneHorizon:
         # Here we use the method get_ah_property that peeks into self._ah_vars.
         self.ah = pythonize_name_dict(ah_vars, self.get_ah_property)
 
-        # We read the formation time from a variable in AH
-        if self._ah_vars:
-            self.formation_time = self.ah.area.tmin
-        else:
-            self.formation_time = None
+        # The formation time and the times of the shapes come from the AH
+        # files, which are read only when these quantities are needed (see
+        # the properties formation_time and shape_times)
+        self._formation_time = None
+        self._shape_times = None
+        self._iterations_to_times_ts = None
 
         # Now we deal with the shape. Shape files is a dictionary that maps
         # iteration to the associated file
@@ -184,36 +422,96 @@ class OneHorizon:
             self.shape_iteration_min = self.shape_iterations[0]
             self.shape_iteration_max = self.shape_iterations[-1]
 
-            # To convert between time and iteration, we need the AH data If we
-            # don't have that, we will assume time = iteration.
-            #
-            if self._ah_vars:
-                # Now we find the associated times using ah.cctk_iteration
-                # self.ah.cctk_iteration is a function time vs iteration, we
-                # want the opposite. We define a new timeseries in which we swap
-                # t and y
-                self._iterations_to_times = remove_duplicated_iters(
-                    self.ah.cctk_iteration.y, self.ah.cctk_iteration.t
-                )
-                self.shape_times = self._iterations_to_times(
-                    self.shape_iterations
-                )
-                self.shape_time_min = self.shape_times[0]
-                self.shape_time_max = self.shape_times[-1]
-            else:
+            # To convert between time and iteration, we need the AH data
+            if not self._ah_vars:
                 warnings.warn(
                     "AH data not found, so it is impossible to convert"
                     " between iteration number to time.\nManually set"
                     " shape_times or methods involving shape and time"
                     " will not work"
                 )
-                self.shape_times = None
-                self.shape_time_min = None
-                self.shape_time_max = None
 
             # We will save all the shape patches and their origin that we read in
-            # this dictionary
-            self._patches = {}
+            # this store
+            self._shapes = ShapeStore()
+
+    @property
+    def formation_time(self):
+        """First time at which the horizon has been found (as from
+        AHFinderDirect), or None if there is no AH data.
+
+        :returns: Formation time.
+        :rtype: float or None
+        """
+        if self._formation_time is None and self._ah_vars:
+            self._formation_time = self.ah.area.tmin
+        return self._formation_time
+
+    @formation_time.setter
+    def formation_time(self, time):
+        self._formation_time = time
+
+    @property
+    def _iterations_to_times(self):
+        """Series with the times as a function of the iterations, from the AH
+        data.
+
+        :returns: Time as a function of the iteration.
+        :rtype: :py:class:`~.TimeSeries`
+        """
+        if self._iterations_to_times_ts is None:
+            if not self._ah_vars:
+                raise ValueError(
+                    "AH data not found, so it is impossible to convert"
+                    " between iteration number to time"
+                )
+            # self.ah.cctk_iteration is a function time vs iteration, we want
+            # the opposite. We define a new timeseries in which we swap t and
+            # y
+            self._iterations_to_times_ts = remove_duplicated_iters(
+                self.ah.cctk_iteration.y, self.ah.cctk_iteration.t
+            )
+        return self._iterations_to_times_ts
+
+    @property
+    def shape_times(self):
+        """Times at which the shape is available, or None if there is no AH
+        data to convert iterations to times (or no shape).
+
+        :returns: Times at which the shape is available.
+        :rtype: 1D NumPy array or None
+        """
+        if (
+            self._shape_times is None
+            and self.shape_available
+            and self._ah_vars
+        ):
+            self._shape_times = self._iterations_to_times(
+                self.shape_iterations
+            )
+        return self._shape_times
+
+    @shape_times.setter
+    def shape_times(self, times):
+        self._shape_times = times
+
+    @property
+    def shape_time_min(self):
+        """First time at which the shape is available.
+
+        :returns: First time at which the shape is available, or None.
+        :rtype: float or None
+        """
+        return None if self.shape_times is None else self.shape_times[0]
+
+    @property
+    def shape_time_max(self):
+        """Last time at which the shape is available.
+
+        :returns: Last time at which the shape is available, or None.
+        :rtype: float or None
+        """
+        return None if self.shape_times is None else self.shape_times[-1]
 
     def __getitem__(self, key):
         if key not in self._qlm_vars.keys():
@@ -266,12 +564,54 @@ class OneHorizon:
                 f"Shape information for iteration {iteration} not available"
             )
 
-        if iteration not in self._patches:
-            self._patches[iteration] = self._load_patches(
-                self._shape_files[iteration]
-            )
+        if iteration not in self._shapes:
+            self.load_shapes([iteration])
+
+        return self._shapes.get(iteration)
+
+    def load_shapes(self, iterations=None, executor=None):
+        """Read the shape of the horizon at the given iterations.
+
+        The shapes are kept in memory, so methods like
+        :py:meth:`~.shape_at_iteration` or :py:meth:`~.shape_outline_at_time`
+        do not have to read them again. This is useful when the shape is
+        needed at many iterations (e.g., to make a movie), because the
+        files can be read in parallel. Reading shape files is mostly
+        computation, so a :py:class:`concurrent.futures.ProcessPoolExecutor`
+        is typically faster than a thread pool.
+
+        :param iterations: Iterations to read. If None, read all the
+                           available ones.
+        :type iterations: list of int
+        :param executor: Executor used to read the files. If None, use the one
+                         of this object (the one of the :py:class:`~.SimDir`),
+                         if there is one, otherwise read the files serially.
+        :type executor: :py:class:`concurrent.futures.Executor`
+        """
+        if not self.shape_available:
+            raise ValueError("Shape information not available")
 
-        return self._patches[iteration]
+        if iterations is None:
+            iterations = self.shape_iterations
+
+        for iteration in iterations:
+            if iteration not in self._shape_files:
+                raise ValueError(
+                    f"Shape information for iteration {iteration} not available"
+                )
+
+        to_read = [it for it in iterations if it not in self._shapes]
+
+        if executor is None:
+            executor = self._executor
+        map_function = map if executor is None else executor.map
+
+        self._shapes.add(
+            to_read,
+            map_function(
+                self._load_patches, [self._shape_files[it] for it in to_read]
+            ),
+        )
 
     def shape_at_iteration(self, iteration):
         """Return the shape of the horizon as 3 arrays with the
@@ -309,19 +649,32 @@ class OneHorizon:
         :rtype: three lists of 2D NumPy arrays, one for each
                 coordinate. The list is over the different patches.
         """
-        # https://stackoverflow.com/a/41022847
-        try:
-            index_closest = next(
-                i
-                for i, _ in enumerate(self.shape_times)
-                if np.isclose(_, time, tolerance)
-            )
-        except StopIteration:
+        return self.shape_at_iteration(
+            self._shape_iteration_at_time(time, tolerance)
+        )
+
+    def _shape_iteration_at_time(self, time, tolerance):
+        """Return the first iteration with shape available at the given time.
+
+        :param time: Time.
+        :type time: float
+        :param tolerance: Tolerance in determining the time (relative).
+        :type tolerance: float
+        :returns: Iteration.
+        :rtype: int
+        """
+        if self.shape_times is None:
             raise ValueError(f"Time {time} not available")
 
-        iteration = self.shape_iterations[index_closest]
+        # Indices of all the times that are close to the given one
+        (indices_close,) = np.nonzero(
+            np.isclose(self.shape_times, time, tolerance)
+        )
+
+        if len(indices_close) == 0:
+            raise ValueError(f"Time {time} not available")
 
-        return self.shape_at_iteration(iteration)
+        return self.shape_iterations[indices_close[0]]
 
     def shape_time_at_iteration(self, iteration):
         """Return the time corresponding to the given iteration using the information
@@ -353,95 +706,125 @@ class OneHorizon:
         # * Each section has multiple groups with one angular coordinate
         #   fixed, the various groups are separated by a blank line
 
+        # Instead of parsing the file line by line in Python, we convert all
+        # the numbers at once with NumPy, then we use the structure of the
+        # file (where the patches start, where the blank lines are) to split
+        # the numbers in patches and groups.
+
         # Here we match the patch name. This matches
-        # 1. the entire string ^ #
+        # 1. the entire line ^ $
         # 2. the literals ### ..... patch
         # 3. and then we find what is inside +/- and one between xyz
-        rx_patch = re.compile(r"^### ([+-][xyz]) patch$")
+        rx_patch = re.compile(rb"^### ([+-][xyz]) patch[ \t\r]*$")
 
         # Here we find the origin of the system.
-        # 1. We match the entire string (^ $)
+        # 1. We match the entire line (^ $, with re.MULTILINE)
         # 2. The match the literal # origin =
         # 3. We match numbers with possibly +/- and dots, and spaces in between
-        #    ([\s])
+        #    ([ \t])
         rx_origin = re.compile(
-            r"^# origin = ([+-eE\d.]+)[\s]+([+-eE\d.]+)[\s]+([+-eE\d.]+)[\s]*$"
+            rb"^# origin = ([+-eE\d.]+)[ \t]+([+-eE\d.]+)[ \t]+([+-eE\d.]+)"
+            rb"[ \t]*$",
+            re.MULTILINE,
         )
-        origin = None
-        with open(path, "r") as fil:
-            # patches is a dictionary that maps the name of the patch to the
-            # coordiantes of that patch
-            patches = {}
-            # We use these variables as local variables
-            current_patch = None
-            current_patch_data = []
-            current_coordinates = []
-            # We scan the entire file line by line
-            for line in fil:
-                # We read the header, which starts with #
-                if line.startswith("#"):
-                    # If we haven't found the origin yet, let's look for it
-                    if origin is None:
-                        matched_origin = rx_origin.match(line)
-                        if matched_origin is not None:
-                            origin = np.array(
-                                [
-                                    float(matched_origin.group(coord))
-                                    for coord in (1, 2, 3)
-                                ]
-                            )
-                            # If we know that this the origin line, we can
-                            # skip the rest of the analysis
-                            continue
-
-                    matched_patch = rx_patch.match(line)
-                    if matched_patch is not None:
-                        # If current_patch is not None it means that we have
-                        # already read an header, so here we are moving to the
-                        # next patch. We save all the data to the dictionary
-                        # patches, and move reset current_patch_data to an empty
-                        # list.
-                        if current_patch is not None:
-                            patches[current_patch] = current_patch_data
-                            current_patch_data = []
-                        current_patch = matched_patch.group(1)
-                elif (line == "") or (line.isspace()):
-                    # Here we found the blank line, which means that we have
-                    # to flush the data and move on to a new group in the same
-                    # patch.
-                    # If current_coordinates is empty, the following will test
-                    # negative. If it is not empty, it means that we have read
-                    # the current group, so we can reset the current_coordiantes
-                    # variable
-                    if current_coordinates:
-                        current_patch_data.append(current_coordinates)
-                        current_coordinates = []
-                else:
-                    # Data line should have 6 columns, the last three are x, y,
-                    # and z.
-                    data = line.split()
-                    if len(data) != 6:
-                        raise RuntimeError(f"Corrupt AH shape file {path}")
-                    coordinates = list(map(float, data[3:]))
-                    # coordinates is a list like:
-                    # [5.198917752 -0.1549284014 0.1549284014],
-                    # so we append the list
-                    current_coordinates.append(coordinates)
-
-            # Here we take care of the last group
-            if current_coordinates:
-                current_patch_data.append(current_coordinates)
-            if current_patch is not None:
-                patches[current_patch] = current_patch_data
-
-        if origin is None:
+
+        with open(path, "rb") as fil:
+            content = fil.read()
+
+        matched_origin = rx_origin.search(content)
+        if matched_origin is None:
             raise RuntimeError("Corrupt AH files, missing origin.")
-        # Reorganize the data from the AHHorizonDirect format to a NumPy matrix
-        # Each patch is an array with three lists, one for each direction
-        patches = {
-            p: np.transpose(np.array(d), axes=(2, 0, 1))
-            for p, d in patches.items()
-        }
+        origin = np.array([float(matched_origin.group(c)) for c in (1, 2, 3)])
+
+        # Data line should have 6 columns, the last three are x, y, and z.
+        try:
+            data = parse_data(content, 6, path=path)
+        except (ValueError, RuntimeError):
+            raise RuntimeError(f"Corrupt AH shape file {path}")
+
+        if data.size > 0 and data.shape[1] != 6:
+            raise RuntimeError(f"Corrupt AH shape file {path}")
+
+        # Now we classify the lines: comments, blank lines, and data. We work
+        # on the bytes with NumPy, so that we do not have to loop over the
+        # lines in Python.
+        buffer = np.frombuffer(content, dtype=np.uint8)
+        newlines = np.flatnonzero(buffer == ord("\n"))
+        line_starts = np.concatenate(([0], newlines + 1))
+        line_ends = np.concatenate((newlines, [len(buffer)]))
+        # We append a newline so that we can always look at the first
+        # character (empty lines have a newline as first character)
+        first_chars = np.append(buffer, ord("\n"))[line_starts]
+
+        is_comment = first_chars == ord("#")
+        is_blank = line_starts == line_ends
+        # Lines that start with a space could be blank or could have data, we
+        # check them one by one (there are typically none)
+        whitespace = np.frombuffer(b" \t\r\f\v", dtype=np.uint8)
+        for line in np.flatnonzero(np.isin(first_chars, whitespace)):
+            is_blank[line] = not content[
+                line_starts[line] : line_ends[line]
+            ].strip()
+        is_data = ~(is_comment | is_blank)
+        num_lines = len(line_starts)
+
+        # The row in data of each line is the number of data lines before it
+        row_of_line = np.cumsum(is_data) - is_data
+
+        # Line where each patch starts (with the name of the patch). Patch
+        # headers are comments that start with ###
+        patch_headers = []
+        for line in np.flatnonzero(is_comment):
+            if content.startswith(b"###", line_starts[line]):
+                matched = rx_patch.match(
+                    content[line_starts[line] : line_ends[line]]
+                )
+                if matched is not None:
+                    patch_headers.append((line, matched.group(1)))
+
+        # patches is a dictionary that maps the name of the patch to the
+        # coordiantes of that patch
+        patches = {}
+
+        for index, (first_line, name) in enumerate(patch_headers):
+            last_line = (
+                patch_headers[index + 1][0]
+                if index + 1 < len(patch_headers)
+                else num_lines
+            )
+
+            # Each group has one angular coordinate fixed, the groups are
+            # separated by blank lines. Ignoring the comments, a group starts
+            # with each data line that is not preceded by another data line.
+            section_is_data = is_data[first_line:last_line][
+                ~is_comment[first_line:last_line]
+            ]
+            num_rows = np.count_nonzero(section_is_data)
+            if num_rows == 0:
+                continue
+
+            num_groups = np.count_nonzero(
+                section_is_data
+                & ~np.concatenate(([False], section_is_data[:-1]))
+            )
+
+            if num_rows % num_groups != 0:
+                raise RuntimeError(f"Corrupt AH shape file {path}")
+
+            # The header is not a data line, so this is the number of data
+            # lines before the patch
+            first_row = row_of_line[first_line]
+
+            # Reorganize the data from the AHHorizonDirect format to a NumPy
+            # matrix. Each patch is an array with three 2D arrays, one for
+            # each direction.
+            patches[name.decode()] = np.transpose(
+                data[first_row : first_row + num_rows, 3:].reshape(
+                    num_groups, -1, 3
+                ),
+                axes=(2, 0, 1),
+            )
+
         return patches, origin
 
     def shape_outline_at_iteration(self, iteration, cut):
@@ -598,25 +981,9 @@ class OneHorizon:
         :rtype:      tuple of two 1D NumPy arrays.
 
         """
-        # TODO: (REFACTOR) Code logic shared with shape_at_time
-        #
-        # This code is essentially the same as shape_at_time. We should refactor
-        # all the _at_time methods, maybe defining a function that transforms
-        # _at_iteration methods to _at_time_methods.
-
-        # https://stackoverflow.com/a/41022847
-        try:
-            index_closest = next(
-                i
-                for i, _ in enumerate(self.shape_times)
-                if np.isclose(_, time, tolerance)
-            )
-        except StopIteration:
-            raise ValueError(f"Time {time} not available")
-
-        iteration = self.shape_iterations[index_closest]
-
-        return self.shape_outline_at_iteration(iteration, cut=cut)
+        return self.shape_outline_at_iteration(
+            self._shape_iteration_at_time(time, tolerance), cut=cut
+        )
 
 
 class HorizonsDir:
@@ -648,6 +1015,8 @@ class HorizonsDir:
         # timeseries. We extract the number with a regular expression which
         # matches qlm_VARNAME[NUM]
 
+        self._executor = sd.executor
+
         self._qlm_vars = {}
         self._populate_qlm_vars(sd)
         self._num_qlm_horizons = len(self._qlm_vars.keys())
@@ -802,26 +1171,16 @@ class HorizonsDir:
                     name = name.replace("/", "-")
                     self._ah_vars_columns[name] = column_number
 
-            # Now we are ready to populate, we read all the data first. Then, we
-            # select all the columns
+            # Now we are ready to populate. Reading the files is expensive, so
+            # we do it only when a variable is requested for the first time
+            # (AHVars takes care of that).
             for ah_index, files in self._ah_files.items():
-                # We create an empty dictionary in self._ah_vars[ah_index]
-                self._ah_vars.setdefault(ah_index, {})
-
-                # We read all the data
-                alldata = [np.loadtxt(f, unpack=True, ndmin=2) for f in files]
-                for var_name, column_number in self._ah_vars_columns.items():
-                    # Here we select the time column and the data column for all
-                    # the data in each file and we convert them into TimeSeries
-                    data_ts = combine_ts(
-                        [
-                            remove_duplicated_iters(
-                                data[time_column], data[column_number]
-                            )
-                            for data in alldata
-                        ]
-                    )
-                    self._ah_vars[ah_index][var_name] = data_ts
+                self._ah_vars[ah_index] = AHVars(
+                    files,
+                    self._ah_vars_columns,
+                    time_column,
+                    executor=sd.executor,
+                )
 
     def _populate_shape_files(self, sd):
         # Here we match the files with a regular expression:
@@ -880,6 +1239,7 @@ class HorizonsDir:
             self._qlm_vars.get(qlm_index, {}),
             self._ah_vars.get(ah_index, {}),
             self._shape_files.get(ah_index, {}),
+            executor=self._executor,
         )
 
     def __str__(self):
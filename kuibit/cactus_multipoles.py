@@ -31,6 +31,9 @@ There are multiple classes defined in this module:
   variable. It is a dictionary-like object with keys the multipolar numbers and values
   the multipolar decomposition represented as represented as :py:class:`~.TimeSeries`
   objects.
+- :py:class`~.MultipoleStack` is an alternative representation of the multipoles of
+  one variable, with all the modes at all the radii in one NumPy array (on a common
+  time grid), so that operations over modes or radii are vectorized.
 
 These are hierarchical classes, one containing the others, so one typically ends
 up with a series of brackets or dots to access the actual data. For example, if
@@ -42,13 +45,118 @@ up with a series of brackets or dots to access the actual data. For example, if
 
 import os
 import re
-from functools import lru_cache
+from bz2 import open as bopen
+from collections.abc import Mapping
+from functools import lru_cache, partial
+from gzip import open as gopen
 
 import h5py
 import numpy as np
 
-from kuibit import timeseries
+from kuibit import file_index, timeseries
 from kuibit.attr_dict import pythonize_name_dict
+from kuibit.cactus_ascii_utils import load_table
+from kuibit.series import sample_common
+
+
+def _read_source(source):
+    """Return the :py:class:`~.TimeSeries` described by ``source``.
+
+    :param source: Timeseries, or function without arguments that returns it.
+    :type source: :py:class:`~.TimeSeries` or callable
+
+    :returns: Timeseries.
+    :rtype: :py:class:`~.TimeSeries`
+    """
+    # This is a module-level function so that it can be used with process
+    # pools
+    if isinstance(source, timeseries.TimeSeries):
+        return source
+    return source()
+
+
+class _LazyMultipoles(Mapping):
+    """Dictionary-like object that maps the multipolar numbers ``(l, m)`` to
+    the associated :py:class:`~.TimeSeries`.
+
+    Each value is built from a list of sources (e.g., one for each restart),
+    which can be :py:class:`~.TimeSeries` or functions without arguments that
+    return a :py:class:`~.TimeSeries` (to read the data from a file). The
+    functions are called, and the series combined, only when the value is
+    requested for the first time.
+
+    """
+
+    def __init__(self, sources):
+        """Constructor.
+
+        :param sources: Dictionary that maps ``(l, m)`` to the list of
+                        sources.
+        :type sources: dict
+        """
+        self._sources = sources
+        self._combined = {}
+
+    def __getitem__(self, key):
+        if key not in self._combined:
+            self.set_read(
+                key, [_read_source(source) for source in self._sources[key]]
+            )
+        return self._combined[key]
+
+    def set_read(self, key, series):
+        """Set the value for ``(l, m)`` from the series read from its
+        sources.
+
+        This is used to read the sources of multiple multipoles at once (e.g.,
+        in parallel).
+
+        :param key: Multipolar numbers ``(l, m)``.
+        :type key: tuple
+        :param series: Timeseries read from each of the sources (in the same
+                       order as the sources).
+        :type series: list of :py:class:`~.TimeSeries`
+        """
+        self._combined[key] = timeseries.combine_ts(series)
+
+    def is_read(self, key):
+        """Return whether the value for ``(l, m)`` was already read.
+
+        :param key: Multipolar numbers ``(l, m)``.
+        :type key: tuple
+
+        :returns: Whether the value was already read.
+        :rtype: bool
+        """
+        return key in self._combined
+
+    def sources(self, key):
+        """Return the sources for ``(l, m)``, without reading them.
+
+        If the value was already computed, this is a list with only the value.
+
+        :param key: Multipolar numbers ``(l, m)``.
+        :type key: tuple
+
+        :returns: Sources that form the value.
+        :rtype: list
+        """
+        if key in self._combined:
+            return [self._combined[key]]
+        return list(self._sources[key])
+
+    def __contains__(self, key):
+        # The default implementation would read the data
+        return key in self._sources
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def keys(self):
+        return self._sources.keys()
 
 
 class MultipoleOneDet:
@@ -92,7 +200,10 @@ class MultipoleOneDet:
         :param dist: Radius of the spherical surface.
         :type dist: float
         :param data: List of tuples with the two multipolar numbers and
-                     the data as :py:class:`~.TimeSeries`.
+                     the data as :py:class:`~.TimeSeries`. Instead of the
+                     :py:class:`~.TimeSeries`, there can be a function without
+                     arguments that returns it, in which case it is called
+                     only when the multipole is requested.
         :type data: list of tuple ``(l, m, timeseries)``
         :ivar l_min: l smaller than ``l_min`` are dropped.
         :type l_min: int
@@ -119,12 +230,12 @@ class MultipoleOneDet:
                 # At the end we have:
                 # multipoles[(mult_t, mult_m)] = [ts1, ts2, ...]
 
-        # Now self._multipoles is a dictionary in which all the timeseries are
-        # collapse in a single one. So it is a straightforward map (l, m) -> ts
-        self._multipoles = {
-            lm: timeseries.combine_ts(ts)
-            for lm, ts in multipoles_list_ts.items()
-        }
+        # Now self._multipoles is a dictionary-like object in which all the
+        # timeseries are collapse in a single one. So it is a straightforward
+        # map (l, m) -> ts. The data is read and combined only when it is
+        # needed, so that we do not read all the multipoles when only one is
+        # used.
+        self._multipoles = _LazyMultipoles(multipoles_list_ts)
         self.available_l = sorted(
             {mult_l for mult_l, _ in self._multipoles.keys()}
         )
@@ -143,8 +254,20 @@ class MultipoleOneDet:
         # set subtraction
         self.missing_lm = all_lm - self.available_lm
 
-        # Data is in the format expected by __init__
-        self.data = [(lm[0], lm[1], ts) for lm, ts in self._multipoles.items()]
+    @property
+    def data(self):
+        """Data in the format expected by the constructor.
+
+        Multipoles that were not read yet are not read.
+
+        :returns: List of tuples with the two multipolar numbers and the data.
+        :rtype: list of tuple ``(l, m, timeseries)``
+        """
+        return [
+            (lm[0], lm[1], ts)
+            for lm in self._multipoles
+            for ts in self._multipoles.sources(lm)
+        ]
 
     def copy(self):
         """Return a deep copy.
@@ -191,6 +314,24 @@ class MultipoleOneDet:
             ret += f" (missing: {list(self.missing_lm)})"
         return ret
 
+    def to_MultipoleStack(self, modes=None, resample=False):
+        """Return the multipoles as a :py:class:`~.MultipoleStack` (with only
+        one radius).
+
+        :param modes: Multipoles to include, as tuples ``(l, m)``. If None,
+                      include all the available ones.
+        :type modes: list of tuples
+        :param resample: If the multipoles are not defined on the same times,
+                         whether to resample them on a common time grid (see
+                         :py:func:`~.sample_common`) instead of only keeping
+                         the times that are common to all of them.
+        :type resample: bool
+
+        :returns: Multipoles on a common time grid in one array.
+        :rtype: :py:class:`~.MultipoleStack`
+        """
+        return MultipoleStack._from_detectors([self], modes, resample)
+
     def total_function_on_available_lm(
         self, function, *args, l_max=None, **kwargs
     ):
@@ -329,12 +470,21 @@ class MultipoleAllDets:
         # Alias
         self._dets = self._detectors
 
-        # Data is in the format expected by __init__
-        # (multipole_l, multipole_m, extraction_radius, [timeseries])
-        self.data = []
-        for radius, det in self._dets.items():
-            for mult_l, mult_m, ts in det:
-                self.data.append((mult_l, mult_m, radius, ts))
+    @property
+    def data(self):
+        """Data in the format expected by the constructor.
+
+        Multipoles that were not read yet are not read.
+
+        :returns: List of tuples with ``(multipole_l, multipole_m,
+                  extraction_radius, timeseries)``.
+        :rtype: list of tuples
+        """
+        return [
+            (mult_l, mult_m, radius, ts)
+            for radius, det in self._dets.items()
+            for mult_l, mult_m, ts in det.data
+        ]
 
     def copy(self):
         """Return a deep copy.
@@ -394,6 +544,308 @@ class MultipoleAllDets:
             ret += f"At radius {d}, {self._dets[d]}\n"
         return ret
 
+    def to_MultipoleStack(self, modes=None, radii=None, resample=False):
+        """Return the multipoles as a :py:class:`~.MultipoleStack`.
+
+        :param modes: Multipoles to include, as tuples ``(l, m)``. If None,
+                      include all the available ones.
+        :type modes: list of tuples
+        :param radii: Radii to include. If None, include all the available
+                      ones.
+        :type radii: list of float
+        :param resample: If the multipoles are not defined on the same times,
+                         whether to resample them on a common time grid (see
+                         :py:func:`~.sample_common`) instead of only keeping
+                         the times that are common to all of them.
+        :type resample: bool
+
+        :returns: Multipoles on a common time grid in one array.
+        :rtype: :py:class:`~.MultipoleStack`
+        """
+        if radii is None:
+            radii = self.radii
+        return MultipoleStack._from_detectors(
+            [self[radius] for radius in radii], modes, resample
+        )
+
+
+class MultipoleStack:
+    """This class represents the multipolar decomposition of one variable at
+    multiple radii as a single NumPy array.
+
+    All the multipoles are defined on the same times. The array ``data`` has
+    three dimensions: the first is time, the second is the mode ``(l, m)``
+    (as in the list ``modes``), and the third is the radius (as in the array
+    ``radii``). Multipoles that are not available at some radius are NaN.
+
+    With this representation, operations on all the modes or on all the radii
+    are operations on NumPy arrays. For example, ``data.sum(axis=1)`` is the
+    sum over all the modes at each radius. :py:class:`~.MultipoleStack` is
+    typically obtained with :py:meth:`~.MultipoleAllDets.to_MultipoleStack`.
+    The opposite conversion is :py:meth:`~.to_MultipoleAllDets`.
+
+    :ivar t: Times.
+    :type t: 1D NumPy array
+    :ivar modes: Multipolar numbers ``(l, m)`` along the second axis of
+                 ``data``.
+    :type modes: list of tuples
+    :ivar l: Value of l for each of the modes.
+    :type l: 1D NumPy array
+    :ivar m: Value of m for each of the modes.
+    :type m: 1D NumPy array
+    :ivar radii: Radii along the third axis of ``data``.
+    :type radii: 1D NumPy array
+    :ivar data: Multipoles, with shape (number of times, number of modes,
+                number of radii).
+    :type data: 3D NumPy array
+
+    """
+
+    def __init__(self, t, modes, radii, data):
+        """Constructor.
+
+        :param t: Times.
+        :type t: 1D NumPy array or list
+        :param modes: Multipolar numbers ``(l, m)`` along the second axis of
+                      ``data``.
+        :type modes: list of tuples
+        :param radii: Radii along the third axis of ``data``.
+        :type radii: 1D NumPy array or list
+        :param data: Multipoles, with shape (number of times, number of modes,
+                     number of radii).
+        :type data: 3D NumPy array
+        """
+        self.t = np.asarray(t)
+        self.modes = [(int(mode[0]), int(mode[1])) for mode in modes]
+        self.radii = np.asarray(radii, dtype=float)
+        self.data = np.asarray(data)
+
+        if self.data.shape != (len(self.t), len(self.modes), len(self.radii)):
+            raise ValueError(
+                "Shape of data does not match times, modes, and radii"
+            )
+
+        self.l = np.array([mode[0] for mode in self.modes], dtype=int)
+        self.m = np.array([mode[1] for mode in self.modes], dtype=int)
+
+        self._mode_index = {
+            mode: index for index, mode in enumerate(self.modes)
+        }
+
+    @staticmethod
+    def _from_detectors(detectors, modes, resample):
+        """Return a :py:class:`~.MultipoleStack` with the multipoles of the
+        given detectors.
+
+        :param detectors: Detectors, one for each radius.
+        :type detectors: list of :py:class:`~.MultipoleOneDet`
+        :param modes: Multipoles to include, as tuples ``(l, m)``. If None,
+                      include all the ones available in any of the detectors.
+        :type modes: list of tuples
+        :param resample: Whether to resample the multipoles on a common time
+                         grid if they are not defined on the same times.
+        :type resample: bool
+
+        :returns: Multipoles on a common time grid in one array.
+        :rtype: :py:class:`~.MultipoleStack`
+        """
+        if modes is None:
+            modes = sorted({mode for det in detectors for mode in det.keys()})
+
+        # (mode index, radius index) of the multipoles that are available
+        positions = [
+            (mode_index, radius_index)
+            for radius_index, det in enumerate(detectors)
+            for mode_index, mode in enumerate(modes)
+            if tuple(mode) in det
+        ]
+
+        if not positions:
+            raise ValueError("No multipole available")
+
+        series = sample_common(
+            [
+                detectors[radius_index][tuple(modes[mode_index])]
+                for mode_index, radius_index in positions
+            ],
+            resample=resample,
+        )
+
+        t = series[0].t
+        dtype = np.result_type(float, *(s.y.dtype for s in series))
+        data = np.full((len(t), len(modes), len(detectors)), np.nan, dtype)
+        for (mode_index, radius_index), s in zip(positions, series):
+            data[:, mode_index, radius_index] = s.y
+
+        return MultipoleStack(t, modes, [det.dist for det in detectors], data)
+
+    def mode_index(self, mult_l, mult_m):
+        """Return the position of the mode ``(l, m)`` along the second axis
+        of ``data``.
+
+        :param mult_l: Multipole component l.
+        :type mult_l: int
+        :param mult_m: Multipole component m.
+        :type mult_m: int
+
+        :returns: Index of the mode.
+        :rtype: int
+        """
+        if (mult_l, mult_m) not in self._mode_index:
+            raise KeyError(f"Mode {(mult_l, mult_m)} not available")
+        return self._mode_index[(mult_l, mult_m)]
+
+    def radius_index(self, radius):
+        """Return the position of the given radius along the third axis of
+        ``data``.
+
+        :param radius: Radius.
+        :type radius: float
+
+        :returns: Index of the radius.
+        :rtype: int
+        """
+        (indices,) = np.nonzero(self.radii == radius)
+        if len(indices) == 0:
+            raise KeyError(f"Radius {radius} not available")
+        return indices[0]
+
+    def __call__(self, mult_l, mult_m, radius):
+        """Return the multipole ``(l, m)`` at the given radius.
+
+        :param mult_l: Multipole component l.
+        :type mult_l: int
+        :param mult_m: Multipole component m.
+        :type mult_m: int
+        :param radius: Radius.
+        :type radius: float
+
+        :returns: Multipole as a function of time.
+        :rtype: :py:class:`~.TimeSeries`
+        """
+        return timeseries.TimeSeries(
+            self.t,
+            self.data[
+                :, self.mode_index(mult_l, mult_m), self.radius_index(radius)
+            ],
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, type(self)):
+            return False
+        return (
+            np.array_equal(self.t, other.t)
+            and self.modes == other.modes
+            and np.array_equal(self.radii, other.radii)
+            and self.data.shape == other.data.shape
+            # Missing multipoles are NaN, which are not equal to themselves
+            and np.all(
+                (self.data == other.data)
+                | (np.isnan(self.data) & np.isnan(other.data))
+            )
+        )
+
+    def select(self, modes=None, radii=None):
+        """Return a new :py:class:`~.MultipoleStack` with only the given
+        modes and radii.
+
+        :param modes: Multipoles to keep, as tuples ``(l, m)``. If None, keep
+                      all of them.
+        :type modes: list of tuples
+        :param radii: Radii to keep. If None, keep all of them.
+        :type radii: list of float
+
+        :returns: Multipoles with only the given modes and radii.
+        :rtype: :py:class:`~.MultipoleStack`
+        """
+        if modes is None:
+            modes = self.modes
+        if radii is None:
+            radii = self.radii
+
+        mode_indices = [self.mode_index(*mode) for mode in modes]
+        radius_indices = [self.radius_index(radius) for radius in radii]
+
+        return MultipoleStack(
+            self.t,
+            modes,
+            radii,
+            self.data[:, mode_indices][:, :, radius_indices],
+        )
+
+    def _data_available(self):
+        """Return the data with zeros in place of the multipoles that are not
+        available (NaN at all times), so that they can be skipped in sums.
+
+        :returns: Data, with shape (number of times, number of modes, number
+                  of radii).
+        :rtype: 3D NumPy array
+        """
+        available = ~np.isnan(self.data).all(axis=0)
+        return np.where(available, self.data, 0)
+
+    def sum_over_modes(self, l_max=None):
+        """Return the sum of all the modes with l up to ``l_max``.
+
+        For example, if the multipoles are the power radiated in each mode,
+        this is the total power at each radius. Multipoles that are not
+        available are skipped (as in
+        :py:meth:`~.MultipoleOneDet.total_function_on_available_lm`).
+
+        :param l_max: Ignore multipoles with l > ``l_max``. If None, include
+                      all of them.
+        :type l_max: int
+
+        :returns: Sum of the modes, with shape (number of times, number of
+                  radii).
+        :rtype: 2D NumPy array
+        """
+        data = self._data_available()
+        if l_max is None:
+            return data.sum(axis=1)
+        return data[:, self.l <= l_max].sum(axis=1)
+
+    def sum_over_radii(self):
+        """Return the sum over the radii of each mode.
+
+        Radii where the mode is not available are skipped.
+
+        :returns: Sum over the radii, with shape (number of times, number of
+                  modes).
+        :rtype: 2D NumPy array
+        """
+        return self._data_available().sum(axis=2)
+
+    def to_MultipoleAllDets(self, l_min=0):
+        """Return the multipoles as a :py:class:`~.MultipoleAllDets`.
+
+        Multipoles that are not available (NaN at all times) are not
+        included.
+
+        :param l_min: l smaller than ``l_min`` are dropped.
+        :type l_min: int
+
+        :returns: Multipoles as :py:class:`~.TimeSeries` organized by radius.
+        :rtype: :py:class:`~.MultipoleAllDets`
+        """
+        available = ~np.isnan(self.data).all(axis=0)
+        return MultipoleAllDets(
+            [
+                (
+                    mult_l,
+                    mult_m,
+                    radius,
+                    timeseries.TimeSeries(
+                        self.t, self.data[:, mode_index, radius_index]
+                    ),
+                )
+                for mode_index, (mult_l, mult_m) in enumerate(self.modes)
+                for radius_index, radius in enumerate(self.radii)
+                if available[mode_index, radius_index]
+            ],
+            l_min,
+        )
+
 
 class MultipolesDir:
     """This class provides acces to various types of multipole data in a given
@@ -402,7 +854,10 @@ class MultipolesDir:
     This class is like a dictionary, you can access its values using the
     brackets operator, with values that are :py:mod:`~.MultipoleAllDets`. These
     contain the full multipolar description for all the available radii. Files
-    are lazily loaded. If both HDF5 and ASCII are present, HDF5 are preferred.
+    are lazily loaded: each multipole (at each radius) is read only when it is
+    requested for the first time. To read many multipoles at once (possibly in
+    parallel), use :py:meth:`~.load`. If both HDF5 and ASCII are present, HDF5
+    are preferred.
     There's no attempt to combine the two. Alternatively, you can access
     variables with ``get`` or with ``fields.var_name``.
 
@@ -414,6 +869,13 @@ class MultipolesDir:
         :param sd: Simulation directory.
         :type sd: :py:class:`~.SimDir`
         """
+        # We use the index to find the content of the HDF5 files, and the
+        # pool to keep the files open while we read them
+        self._index = sd.index
+        self._file_pool = sd.file_pool
+        # Executor used by load to read multiple files in parallel
+        self._executor = sd.executor
+
         # self._vars is a dictionary. For _vars_ascii, the keys are the
         # variables  and the items are sets of tuples of the form
         # (multipole_l,  multipole_m, radius, filename) for text files.
@@ -491,58 +953,63 @@ class MultipolesDir:
         :returns: Multipole data.
         :rtype: :py:class:`~.TimeSeries`
         """
-        a = np.loadtxt(path, unpack=True, ndmin=2)
+        if path.endswith(".gz"):
+            opener = gopen
+        elif path.endswith(".bz2"):
+            opener = bopen
+        else:
+            opener = open
+
+        a = load_table(path, opener=opener).T
         if len(a) != 3:
             raise RuntimeError(f"Wrong format in {path}")
         complex_mp = a[1] + 1j * a[2]
         return timeseries.remove_duplicated_iters(a[0], complex_mp)
 
     @staticmethod
-    def _multipoles_from_h5file(path):
-        """Read multipole data from a HDF5 file.
+    def _multipole_from_h5dataset(path, dataset, file_pool=None):
+        """Read multipole data from a dataset in a HDF5 file.
 
         :param path: File to read.
         :type path: str
+        :param dataset: Name of the dataset (e.g., ``l2_m2_r100.00``).
+        :type dataset: str
+        :param file_pool: Pool of open HDF5 files. If None, the file is opened
+                          and closed.
+        :type file_pool: :py:class:`~.H5FilePool`
+
         :returns: Multipole data.
         :rtype: :py:class:`~.TimeSeries`
         """
-        alldets = []
-        # This regex matches : l(number)_m(-number)_r(number)
-        fieldname_pattern = re.compile(r"l(\d+)_m([-]?\d+)_r([0-9.]+)")
-
-        with h5py.File(path, "r") as data:
-
-            # Loop over the groups in the hdf5
-            for entry in data.keys():
-                matched = fieldname_pattern.match(entry)
-                if matched:
-                    mult_l = int(matched.group(1))
-                    mult_m = int(matched.group(2))
-                    radius = float(matched.group(3))
-                    # Read the actual data
-                    a = data[entry][()].T
-                    complex_mp = a[1] + 1j * a[2]
-                    ts = timeseries.remove_duplicated_iters(a[0], complex_mp)
-                    alldets.append((mult_l, mult_m, radius, ts))
-
-        return alldets
+        # With a pool, the file is kept open for the following reads
+        opener = (
+            h5py.File(path, "r") if file_pool is None else file_pool.open(path)
+        )
+        with opener as data:
+            # Read the actual data
+            a = data[dataset][()].T
+        complex_mp = a[1] + 1j * a[2]
+        return timeseries.remove_duplicated_iters(a[0], complex_mp)
 
     def _multipoles_from_textfiles(self, mpfiles):
         """Read all the multipole data in several text files.
 
-        :param mpfiles: Files to read.
-        :type mpfiles: list of str
+        :param mpfiles: Files to read, as tuples ``(multipole_l,
+                        multipole_m, radius, filename)``.
+        :type mpfiles: list of tuples
 
-        :returns: :py:class:`~.MultipoleAllDets` with all the data read.
+        :returns: :py:class:`~.MultipoleAllDets` with all the data (which is
+                  read when it is requested for the first time).
         :rtype: :py:class:`~.MultipoleAllDets`
         """
-        # We prepare the data for MultipoleAllDets checking for errors
+        # We prepare the data for MultipoleAllDets, the files are read only
+        # when needed
         alldets = [
             (
                 mult_l,
                 mult_m,
                 radius,
-                self._multipole_from_textfile(filename),
+                partial(self._multipole_from_textfile, filename),
             )
             for mult_l, mult_m, radius, filename in mpfiles
         ]
@@ -554,15 +1021,42 @@ class MultipolesDir:
         :param mpfiles: Files to read.
         :type mpfiles: list of str
 
-        :returns: :py:class:`~.MultipoleAllDets` with all the data read.
+        :returns: :py:class:`~.MultipoleAllDets` with all the data (which is
+                  read when it is requested for the first time).
         :rtype: :py:class:`~.MultipoleAllDets`
         """
-        mult_l = []
+        # This regex matches : l(number)_m(-number)_r(number)
+        fieldname_pattern = re.compile(r"l(\d+)_m([-]?\d+)_r([0-9.]+)")
+
+        # Here we only look at the names of the datasets, which are saved in
+        # the index, so typically we do not have to open the files. For each
+        # dataset, we prepare a function that reads it. The datasets for the
+        # same multipole in different files (restarts) are read together and
+        # combined when the multipole is requested.
+        alldets = []
 
         for filename in mpfiles:
-            mult_l.extend(self._multipoles_from_h5file(filename))
+            for entry in file_index.h5_group_names(filename, self._index):
+                matched = fieldname_pattern.match(entry)
+                if matched:
+                    mult_l = int(matched.group(1))
+                    mult_m = int(matched.group(2))
+                    radius = float(matched.group(3))
+                    alldets.append(
+                        (
+                            mult_l,
+                            mult_m,
+                            radius,
+                            partial(
+                                self._multipole_from_h5dataset,
+                                filename,
+                                entry,
+                                self._file_pool,
+                            ),
+                        )
+                    )
 
-        return MultipoleAllDets(mult_l)
+        return MultipoleAllDets(alldets)
 
     @lru_cache(128)
     def __getitem__(self, key):
@@ -582,6 +1076,88 @@ class MultipolesDir:
 
         raise KeyError
 
+    def load(self, key, radii=None, modes=None, executor=None):
+        """Read the multipolar data for the given variable at the given radii
+        and for the given multipoles.
+
+        All the files needed (e.g., one for each restart, radius, and
+        multipole) are read at once, in parallel if an executor is available.
+        The data is kept in memory, so it is not read again when it is
+        accessed through this object (e.g., with ``multipoles[key]``).
+
+        :param key: Variable.
+        :type key: str
+        :param radii: Radii to read. If None, read all the available ones.
+        :type radii: list of float
+        :param modes: Multipoles to read, as tuples ``(l, m)``. If None, read
+                      all the available ones.
+        :type modes: list of tuples
+        :param executor: Executor used to read the files. If None, use the
+                         one of the :py:class:`~.SimDir`, if there is one,
+                         otherwise read the files serially. Parsing text is
+                         mostly computation, so a
+                         :py:class:`concurrent.futures.ProcessPoolExecutor` is
+                         typically faster than a thread pool for ASCII files.
+        :type executor: :py:class:`concurrent.futures.Executor`
+
+        :returns: Multipolar data at the given radii and for the given
+                  multipoles (only the ones that are available).
+        :rtype: :py:class:`~.MultipoleAllDets`
+
+        """
+        alldets = self[key]
+
+        if radii is None:
+            radii = alldets.radii
+
+        for radius in radii:
+            if radius not in alldets:
+                raise KeyError(f"Radius {radius} not available")
+
+        # First, we collect all the files that have to be read, so that we
+        # can read them all together.
+        #
+        # to_read is a list of tuples (multipoles, (l, m), sources), where
+        # multipoles is the _LazyMultipoles of the detector
+        to_read = []
+        # selected is a list of (l, m, radius)
+        selected = []
+        for radius in radii:
+            det_multipoles = alldets[radius]._multipoles
+            det_modes = det_multipoles.keys() if modes is None else modes
+            for mode in det_modes:
+                if mode not in det_multipoles:
+                    continue
+                selected.append((mode[0], mode[1], radius))
+                if not det_multipoles.is_read(mode):
+                    to_read.append(
+                        (det_multipoles, mode, det_multipoles.sources(mode))
+                    )
+
+        if executor is None:
+            executor = self._executor
+        map_function = map if executor is None else executor.map
+
+        series = list(
+            map_function(
+                _read_source,
+                [source for _, _, sources in to_read for source in sources],
+            )
+        )
+
+        # Now we split the list of series and we combine the restarts
+        start = 0
+        for det_multipoles, mode, sources in to_read:
+            det_multipoles.set_read(mode, series[start : start + len(sources)])
+            start += len(sources)
+
+        return MultipoleAllDets(
+            [
+                (mult_l, mult_m, radius, alldets[radius][(mult_l, mult_m)])
+                for mult_l, mult_m, radius in selected
+            ]
+        )
+
     def get(self, key, default=None):
         """Return a the multipolar data for the given variable if available, else return
         the default value.
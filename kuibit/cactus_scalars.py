@@ -42,15 +42,21 @@ up with a series of brackets or dots to access the actual data. For example, if
 import os
 import re
 from bz2 import open as bopen
-from functools import lru_cache
 from gzip import open as gopen
+from operator import methodcaller
 
 import numpy as np
 
 from kuibit import simdir
 from kuibit import timeseries as ts
 from kuibit.attr_dict import pythonize_name_dict
-from kuibit.cactus_ascii_utils import scan_header
+from kuibit.cactus_ascii_utils import (
+    parse_data,
+    read_lines_in_chunks,
+    scan_header,
+)
+from kuibit.column_cache import ColumnCache
+from kuibit.data_cache import DataCache
 
 
 class OneScalar:
@@ -121,18 +127,43 @@ class OneScalar:
         "bz2": (bopen, "rt"),
     }
 
-    def __init__(self, path):
+    # Files are parsed in chunks of this size (in bytes), so that we never
+    # need to keep in memory both the entire text and the parsed numbers
+    _chunk_size = 64 * 1024 ** 2
+
+    def __init__(self, path, index=None, column_cache=None):
         """Constructor.
 
         Here we understand what the file contains.
 
         :param path: Path of the file.
         :type path: str
+        :param index: Index used to avoid scanning the header again, if the
+                      file was already scanned.
+        :type index: :py:class:`~.FileIndex`
+        :param column_cache: Cache used to avoid parsing the file again, if
+                             the file was already parsed.
+        :type column_cache: :py:class:`~.ColumnCache`
         """
         self.path = str(path)
+        self._index = index
+        self._column_cache = column_cache
         # The _vars dictionary contains a mapping between the various variables
         # and the column numbers in which they are stored.
         self._vars = {}
+        # _data is the matrix with all the columns of the file (with the
+        # duplicated iterations already removed), it is read the first time a
+        # variable is requested
+        self._data = None
+        # To read only the lines added to the file (refresh), we keep track
+        # of the state of the file when we read it, of where we stopped
+        # reading, and of whether the last line was incomplete. _offset is
+        # None when we do not know where we stopped (e.g., when the data
+        # comes from the column cache).
+        self._stat = None
+        self._offset = None
+        self._has_incomplete_line = False
+        self._num_columns = None
         self.folder, filename = os.path.split(self.path)
 
         filename_match = self._rx_filename.match(filename)
@@ -174,6 +205,25 @@ class OneScalar:
                 variable_name += index_in_brackets
             self._vars = {variable_name: None}
 
+    def __getstate__(self):
+        # This is used when the object is sent to another process (e.g., when
+        # reading with a process pool). The index has a connection to the
+        # database and a lock, so it stays here. The column cache is sent as
+        # the path of its directory, and is created again in the other
+        # process (it can be used by multiple processes).
+        state = self.__dict__.copy()
+        state["_index"] = None
+        if self._column_cache is not None:
+            state["_column_cache"] = None
+            state["_column_cache_dir"] = self._column_cache.directory
+        return state
+
+    def __setstate__(self, state):
+        column_cache_dir = state.pop("_column_cache_dir", None)
+        self.__dict__.update(state)
+        if column_cache_dir is not None:
+            self._column_cache = ColumnCache(column_cache_dir)
+
     def _scan_header(self):
         # Call scan_header with the right argument
 
@@ -190,6 +240,7 @@ class OneScalar:
             extended_format,
             opener=opener,
             opener_mode=opener_mode,
+            index=self._index,
         )
 
         if self._is_one_file_per_group:
@@ -200,7 +251,188 @@ class OneScalar:
 
         self._was_header_scanned = True
 
-    @lru_cache(128)
+    def _load_all_columns(self):
+        """Parse the entire file and return the matrix with all the columns.
+
+        The file is parsed only once, regardless of how many variables are in
+        it. Overlapping segments (from restarts) are removed here, so that all
+        the variables share the same times.
+
+        If there is a column cache, the table is read from the cache (and
+        saved there the first time).
+
+        :returns: Table with one row per unique time and one column per column
+                  in the file.
+        :rtype: 2D NumPy array
+
+        """
+        if self._data is None:
+            if not self._was_header_scanned:
+                self._scan_header()
+            # This is needed by refresh to know if the file has changed (we
+            # take it before reading, so that if the file changes in the
+            # meantime, we will read it again)
+            self._stat = self._current_stat()
+            if self._column_cache is None:
+                self._data = self._parse_all_columns()
+            else:
+                self._data = self._column_cache.get(
+                    self.path, self._parse_all_columns
+                )
+        return self._data
+
+    def _parse_all_columns(self):
+        """Parse the entire file and return the matrix with all the columns,
+        without the overlapping segments.
+
+        :returns: Table with one row per unique time and one column per column
+                  in the file.
+        :rtype: 2D NumPy array
+
+        """
+        data, self._offset, self._has_incomplete_line = self._parse_from(0)
+
+        if data is None:
+            raise RuntimeError(f"No data found in {self.path}")
+
+        return self._remove_duplicated_iters(data)
+
+    def _current_stat(self):
+        """Return the modification time and the size of the file.
+
+        :returns: Modification time (in nanoseconds) and size of the file.
+        :rtype: tuple of int
+        """
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _remove_duplicated_iters(self, data):
+        """Remove the overlapping segments from the table ``data``.
+
+        :param data: Table with all the columns.
+        :type data: 2D NumPy array
+
+        :returns: Table without the rows removed by
+                  :py:func:`~.remove_duplicated_iters`.
+        :rtype: 2D NumPy array
+        """
+        # Here we apply the same logic of ts.remove_duplicated_iters, but only
+        # once for all the variables
+        return data[ts._mask_duplicated_iters(data[:, self._time_column])]
+
+    def _parse_from(self, offset):
+        """Parse the file starting from the byte ``offset``.
+
+        ``offset`` has to be at the beginning of a line (of the uncompressed
+        file).
+
+        :param offset: Position in the file where to start to read.
+        :type offset: int
+
+        :returns: Table with all the columns (or None if there are no data
+                  lines), position in the file after the last complete
+                  line, and whether the last line was incomplete (and parsed
+                  anyway).
+        :rtype: tuple (2D NumPy array or None, int, bool)
+
+        """
+        opener = self._decompressor[self._compression_method][0]
+
+        chunks = []
+        has_incomplete_line = False
+        with opener(self.path, "rb") as fil:
+            fil.seek(offset)
+            for chunk in read_lines_in_chunks(fil, self._chunk_size):
+                if self._num_columns is None:
+                    # The number of columns is only needed with old versions
+                    # of NumPy, we find it from the first line with data
+                    for line in chunk.splitlines():
+                        if line.strip() and not line.startswith(b"#"):
+                            self._num_columns = len(line.split())
+                            break
+                    else:
+                        # Only comments in this chunk
+                        if chunk.endswith(b"\n"):
+                            offset += len(chunk)
+                        continue
+
+                if chunk.endswith(b"\n"):
+                    chunks.append(
+                        parse_data(chunk, self._num_columns, path=self.path)
+                    )
+                    offset += len(chunk)
+                    continue
+
+                # Only the last chunk can end without a newline, and it
+                # contains only the last line. If the file is being written,
+                # this line could be incomplete. We keep it only if it looks
+                # like a complete line, otherwise we will read it again the
+                # next time (offset stops before it).
+                try:
+                    last_line = parse_data(
+                        chunk, self._num_columns, path=self.path
+                    )
+                except (ValueError, RuntimeError):
+                    continue
+                if last_line.shape[1] != self._num_columns:
+                    continue
+                chunks.append(last_line)
+                has_incomplete_line = True
+
+        data = np.vstack(chunks) if chunks else None
+        return data, offset, has_incomplete_line
+
+    def refresh(self):
+        """Read the data that was added to the file since it was last read.
+
+        This is useful for simulations that are still running. Only the new
+        lines are parsed. If the file was not read yet, there is nothing to
+        do (it will be read completely when needed).
+
+        :returns: Whether there is new data.
+        :rtype: bool
+
+        """
+        if self._data is None:
+            return False
+
+        stat = self._current_stat()
+        if stat == self._stat:
+            return False
+
+        # We can read only the new lines if we know where we stopped reading
+        # (we do not know it if the data came from the column cache), if the
+        # file is not compressed (the size of the compressed file says
+        # nothing about the uncompressed one), if the last line that we read
+        # was complete, and if the file did not shrink (which would mean that
+        # it was rewritten). Otherwise, we read the entire file again.
+        if (
+            self._offset is None
+            or self._compression_method is not None
+            or self._has_incomplete_line
+            or stat[1] < self._offset
+        ):
+            self._data = None
+            self._offset = None
+            self._load_all_columns()
+            return True
+
+        self._stat = stat
+        new_data, self._offset, self._has_incomplete_line = self._parse_from(
+            self._offset
+        )
+
+        if new_data is None:
+            return False
+
+        # The new lines could overlap with the old ones (e.g., if the
+        # simulation was restarted from a checkpoint in the same folder), so
+        # we have to remove the duplicated iterations again
+        self._data = self._remove_duplicated_iters(
+            np.vstack((self._data, new_data))
+        )
+        return True
+
     def load(self, variable):
         """Read file and return a TimeSeries with the requested variable.
 
@@ -218,15 +450,11 @@ class OneScalar:
         if variable not in self:
             raise ValueError(f"{variable} not available")
 
-        column_number = self._vars[variable]
-        t, y = np.loadtxt(
-            self.path,
-            unpack=True,
-            ndmin=2,
-            usecols=(self._time_column, column_number),
-        )
+        data = self._load_all_columns()
 
-        return ts.remove_duplicated_iters(t, y)
+        return ts.TimeSeries(
+            data[:, self._time_column], data[:, self._vars[variable]]
+        )
 
     def __getitem__(self, key):
         return self.load(key)
@@ -256,19 +484,49 @@ class AllScalars:
 
     :ivar reduction_type: Type of reduction.
     :type reduction_type: str
+    :ivar executor: Executor used to read the files in parallel (None to read
+                    them serially).
+    :type executor: :py:class:`concurrent.futures.Executor`
 
     """
 
-    def __init__(self, allfiles, reduction_type):
+    def __init__(
+        self,
+        allfiles,
+        reduction_type,
+        index=None,
+        column_cache=None,
+        executor=None,
+        data_cache=None,
+    ):
         """Constructor.
 
         :param allfiles: List of all the files
         :type allfiles: list of str
         :param reduction_type: Type of reduction.
         :type reduction_type: str
+        :param index: Index used to avoid scanning again files that were
+                      already scanned.
+        :type index: :py:class:`~.FileIndex`
+        :param column_cache: Cache used to avoid parsing again files that
+                             were already parsed.
+        :type column_cache: :py:class:`~.ColumnCache`
+        :param executor: If not None, the files of the various restarts are
+                         read in parallel using this executor. With a
+                         :py:class:`concurrent.futures.ProcessPoolExecutor`,
+                         the files are parsed in other processes, so they are
+                         parsed again every time they are needed (unless
+                         there is a column cache).
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :param data_cache: Cache where to keep the timeseries that were
+                           already combined. If None, a new one is created.
+        :type data_cache: :py:class:`~.DataCache`
 
         """
         self.reduction_type = str(reduction_type)
+        self.executor = executor
+        self._index = index
+        self._column_cache = column_cache
 
         # TODO: Is it necessary to have the folder level?
         # Probably not, so remove it
@@ -278,11 +536,35 @@ class AllScalars:
         # to find the files associated to the variable and the reduction
         # reduction_type
         self._vars = {}
+        # Files that were already recognized as scalar files (with any
+        # reduction), so that we do not inspect them again in refresh
+        self._known_files = set()
+        # Timeseries already combined are kept in the data cache (which is
+        # shared with the other readers of the SimDir), so that the memory
+        # they use is bounded
+        self._data_cache = (
+            data_cache if data_cache is not None else DataCache()
+        )
+        self._add_files(allfiles)
+
+    def _add_files(self, allfiles):
+        """Add to _vars the files in allfiles that contain scalar data with
+        the reduction of this object (files that are already known are
+        skipped).
+
+        :param allfiles: List of files.
+        :type allfiles: list of str
+        """
         for file_ in allfiles:
+            if file_ in self._known_files:
+                continue
             # We only save those that variables are well-behaved
             try:
-                cactusascii_file = OneScalar(file_)
-                if cactusascii_file.reduction_type == reduction_type:
+                cactusascii_file = OneScalar(
+                    file_, index=self._index, column_cache=self._column_cache
+                )
+                self._known_files.add(file_)
+                if cactusascii_file.reduction_type == self.reduction_type:
                     for var in list(cactusascii_file.keys()):
                         # We add to the _vars dictionary the mapping:
                         # [var][folder] to OneScalar(f)
@@ -297,11 +579,68 @@ class AllScalars:
         # accessible as attributes, e.g. self.fields.rho
         self.fields = pythonize_name_dict(list(self.keys()), self.__getitem__)
 
-    @lru_cache(128)
+    def refresh(self, allfiles):
+        """Read the data that was added since the files were last read, and
+        add the new files in ``allfiles``.
+
+        This is useful for simulations that are still running. Only the new
+        lines of the files that were already read are parsed.
+
+        :param allfiles: List of all the files (including the new ones).
+        :type allfiles: list of str
+        """
+        self._add_files(allfiles)
+
+        one_scalars = {
+            one_scalar.path: one_scalar
+            for folders in self._vars.values()
+            for one_scalar in folders.values()
+        }
+        for one_scalar in one_scalars.values():
+            one_scalar.refresh()
+
+        # The timeseries have to be combined again
+        for var in self._vars:
+            self._data_cache.discard(self._cache_key(var))
+
+    def _cache_key(self, key):
+        """Return the key that identifies the given variable in the data
+        cache.
+
+        :param key: Variable.
+        :type key: str
+
+        :returns: Key for the data cache.
+        :rtype: tuple
+
+        """
+        return (type(self).__name__, self.reduction_type, key)
+
     def __getitem__(self, key):
+        return self._data_cache.get(
+            self._cache_key(key), lambda: self._combine_restarts(key)
+        )
+
+    def _combine_restarts(self, key):
+        """Read the files of all the restarts with the given variable and
+        combine them in one :py:class:`~.TimeSeries`.
+
+        :param key: Variable.
+        :type key: str
+
+        :returns: Variable across all the restarts.
+        :rtype: :py:class:`~.TimeSeries`
+
+        """
         # We read all the files associated to variable key
         folders = self._vars[key]
-        series = [f.load(key) for f in folders.values()]
+        # The files of different restarts are independent, so, if we have an
+        # executor, we read them in parallel. We use methodcaller because it
+        # can be pickled (so that it can be used with process pools too).
+        map_function = map if self.executor is None else self.executor.map
+        series = list(
+            map_function(methodcaller("load", key), folders.values())
+        )
         return ts.combine_ts(series)
 
     def __contains__(self, key):
@@ -373,14 +712,28 @@ class ScalarsDir:
             raise TypeError("Input is not SimDir")
 
         self.path = sd.path
-        self.point = AllScalars(sd.allfiles, "scalar")
-        self.scalar = AllScalars(sd.allfiles, "scalar")
-        self.minimum = AllScalars(sd.allfiles, "minimum")
-        self.maximum = AllScalars(sd.allfiles, "maximum")
-        self.norm1 = AllScalars(sd.allfiles, "norm1")
-        self.norm2 = AllScalars(sd.allfiles, "norm2")
-        self.average = AllScalars(sd.allfiles, "average")
-        self.infnorm = AllScalars(sd.allfiles, "infnorm")
+        self._allfiles = sd.allfiles
+        self._index = sd.index
+        self._column_cache = sd.column_cache
+
+        def all_scalars(reduction_type):
+            return AllScalars(
+                sd.allfiles,
+                reduction_type,
+                index=sd.index,
+                column_cache=sd.column_cache,
+                executor=sd.executor,
+                data_cache=sd.data_cache,
+            )
+
+        self.point = all_scalars("scalar")
+        self.scalar = all_scalars("scalar")
+        self.minimum = all_scalars("minimum")
+        self.maximum = all_scalars("maximum")
+        self.norm1 = all_scalars("norm1")
+        self.norm2 = all_scalars("norm2")
+        self.average = all_scalars("average")
+        self.infnorm = all_scalars("infnorm")
 
         # Aliases
         self.max = self.maximum
@@ -389,6 +742,63 @@ class ScalarsDir:
     def __getitem__(self, reduction):
         return getattr(self, reduction)
 
+    def refresh(self, sd):
+        """Read the scalar data that was produced since it was last read.
+
+        Only the lines added to the files are parsed, new files (e.g., from
+        new restarts) are added. Typically used from
+        :py:meth:`~.SimDir.refresh`.
+
+        :param sd: Simulation directory (already updated).
+        :type sd:  :py:class:`~.SimDir` instance.
+        """
+        self._allfiles = sd.allfiles
+        for reduction in (
+            self.point,
+            self.scalar,
+            self.minimum,
+            self.maximum,
+            self.norm1,
+            self.norm2,
+            self.average,
+            self.infnorm,
+        ):
+            reduction.refresh(sd.allfiles)
+
+    def build_cache(self):
+        """Parse all the scalar files and save their content in the column
+        cache of the :py:class:`~.SimDir`.
+
+        This is useful to prepare the cache ahead of time (e.g., right after
+        the simulation has finished), so that later all the scalar data can
+        be read quickly. Files that are already in the cache and that have not
+        changed are not parsed again.
+
+        :returns: Number of files in the cache.
+        :rtype: int
+
+        """
+        if self._column_cache is None:
+            raise RuntimeError(
+                "SimDir was created without column_cache_dir, "
+                "there is no cache to build"
+            )
+
+        num_files = 0
+        for file_ in self._allfiles:
+            # As in AllScalars, we skip the files that are not scalar data
+            try:
+                one_scalar = OneScalar(
+                    file_, index=self._index, column_cache=self._column_cache
+                )
+                # This is what populates the cache
+                one_scalar._load_all_columns()
+                num_files += 1
+            except RuntimeError:
+                pass
+
+        return num_files
+
     def get(self, key, default=None):
         """Return a reduction if available, else return the default value.
 
@@ -36,8 +36,10 @@ There classes defined in this module are:
 """
 
 import warnings
+from collections import OrderedDict
 
 import numpy as np
+import scipy.fft
 
 from kuibit import cactus_multipoles as mp
 from kuibit import gw_utils, simdir
@@ -58,8 +60,18 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
 
     This class is not intended to be initialized directly.
 
+    :ivar max_ffi_cached: Maximum number of sets of integration parameters
+                          (pcut, order, window) for which the integrated
+                          multipoles are kept in memory. The methods that use
+                          them (e.g., :py:meth:`~.get_strain_lm`) always
+                          return new timeseries, so the results can be
+                          modified without affecting the following calls.
+    :type max_ffi_cached: int
+
     """
 
+    max_ffi_cached = 8
+
     def __init__(self, dist, data):
         """Constructor.
 
@@ -73,6 +85,20 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
 
         super().__init__(dist, data, 2)
 
+        # Multipoles integrated with the fixed-frequency integration. The keys
+        # are the parameters of the integration (pcut, order, and window), the
+        # values are dictionaries with keys (l, m). Most of the quantities we
+        # compute need the same integrals, so we compute them only once, for
+        # all the modes at the same time (see _ffi_modes). The parameters are
+        # ordered from the least to the most recently used, and we keep at
+        # most max_ffi_cached of them.
+        self._ffi_cache = OrderedDict()
+
+    def clear_ffi_cache(self):
+        """Remove from memory the multipoles integrated with the
+        fixed-frequency integration."""
+        self._ffi_cache.clear()
+
     # staticmethod means that this function will be allocated by python only
     # once, since it doesn't depend on the detail of the instance
     @staticmethod
@@ -124,36 +150,216 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
 
         """
 
-        if not timeseries.is_regularly_sampled():
-            warnings.warn(
-                "Timeseries not regularly sampled. Resampling.",
-                RuntimeWarning,
+        return GravitationalWavesOneDet._fixed_frequency_integrated_many(
+            [timeseries], pcut, order
+        )[0]
+
+    @staticmethod
+    def _fixed_frequency_integrated_many(series, pcut, order=1, workers=None):
+        """Return the fixed-frequency integration of each of the ``series``.
+
+        This is the same as calling :py:meth:`~._fixed_frequency_integrated`
+        on each of the series, but series with the same number of points and
+        the same timestep are transformed together, with one 2D Fourier
+        transform. Since the integration factor only depends on the
+        frequencies, it is computed only once for all of them.
+
+        :param series: Timeseries that have to be integrated.
+        :type series: list of :py:class:`~TimeSeries`
+        :param pcut: Period associated with the threshold frequency
+                     ``omega_0 = 2 * pi / pcut``
+        :type pcut: float
+        :param order: Number of integrations.
+        :type order: int
+        :param workers: Number of threads used to compute the Fourier
+                        transforms (as in :py:mod:`scipy.fft`).
+        :type workers: int or None
+
+        :returns: Integrated timeseries, in the same order as ``series``.
+        :rtype: list of :py:class:`~TimeSeries`
+        """
+        integrands = []
+        for timeseries in series:
+            if not timeseries.is_regularly_sampled():
+                warnings.warn(
+                    "Timeseries not regularly sampled. Resampling.",
+                    RuntimeWarning,
+                )
+                integrands.append(timeseries.regular_resampled())
+            else:
+                integrands.append(timeseries)
+
+        # The frequencies only depend on the number of points and on the
+        # timestep, so we group the series that share them
+        groups = {}
+        for index, integrand in enumerate(integrands):
+            groups.setdefault((len(integrand), integrand.dt), []).append(index)
+
+        integrated = [None] * len(integrands)
+
+        for (num_points, dt), indices in groups.items():
+            omega = np.fft.fftfreq(num_points, d=dt) * (2 * np.pi)
+
+            omega_abs = np.abs(omega)
+            omega_threshold = 2 * np.pi / pcut
+
+            # np.where(omega_abs > omega_threshold, omega_abs, omega_threshold)
+            # means: return omega_abs when omega_abs > omega_threshold,
+            # otherwise return omega_threshold
+            ffi_omega = np.where(
+                omega_abs > omega_threshold, omega_abs, omega_threshold
+            )
+
+            # np.sign(omega) / (ffi_omega) is omega when omega_abs >
+            # omega_thres, this is a convient way to group together positive
+            # and negative omega
+            integration_factor = np.sign(omega) / (1j * ffi_omega)
+            integration_factor **= int(order)
+
+            # One row for each series. The factor is broadcast over the rows.
+            fft = scipy.fft.fft(
+                np.array([integrands[index].y for index in indices]),
+                axis=-1,
+                workers=workers,
             )
-            integrand = timeseries.regular_resampled()
-        else:
-            integrand = timeseries
 
-        fft = np.fft.fft(integrand.y)
-        omega = np.fft.fftfreq(len(integrand), d=integrand.dt) * (2 * np.pi)
+            # Now, inverse fft
+            integrated_y = scipy.fft.ifft(
+                fft * integration_factor, axis=-1, workers=workers
+            )
+
+            for index, y in zip(indices, integrated_y):
+                integrated[index] = ts.TimeSeries(integrands[index].t, y)
+
+        return integrated
+
+    @staticmethod
+    def _windowed(timeseries, window_function, *args, **kwargs):
+        """Return ``timeseries`` with the ``window_function`` applied.
 
-        omega_abs = np.abs(omega)
-        omega_threshold = 2 * np.pi / pcut
+        See :py:meth:`~.get_strain_lm` for the meaning of ``window_function``.
 
-        # np.where(omega_abs > omega_threshold, omega_abs, omega_threshold)
-        # means: return omega_abs when omega_abs > omega_threshold, otherwise
-        # return omega_threshold
-        ffi_omega = np.where(
-            omega_abs > omega_threshold, omega_abs, omega_threshold
+        :param timeseries: Timeseries to window.
+        :type timeseries: :py:class:`~TimeSeries`
+        :param window_function: Window to apply. If None, ``timeseries`` is
+                                returned as it is.
+        :type window_function: callable, str, or None
+
+        :returns: Windowed timeseries.
+        :rtype: :py:class:`~TimeSeries`
+        """
+        if callable(window_function):
+            return timeseries.windowed(window_function, *args, **kwargs)
+        if isinstance(window_function, str):
+            window_function_method = f"{window_function}_windowed"
+            if not hasattr(timeseries, window_function_method):
+                raise ValueError(f"Window {window_function} not implemented")
+            window_function_callable = getattr(
+                timeseries, window_function_method
+            )
+
+            # This returns a new TimeSeries
+            return window_function_callable(*args, **kwargs)
+        if window_function is None:
+            return timeseries
+        raise ValueError("Unknown window function")
+
+    def _ffi_modes(
+        self,
+        modes,
+        pcut,
+        order=1,
+        window_function=None,
+        window_args=(),
+        window_kwargs=None,
+        workers=None,
+    ):
+        """Return the fixed-frequency integration of the given modes.
+
+        The modes that were not integrated before with the same parameters
+        are integrated together (see
+        :py:meth:`~._fixed_frequency_integrated_many`) and the results are
+        saved, so that all the quantities derived from the same integrals
+        (strain, power, torque, ...) share them. Results are saved for at
+        most ``max_ffi_cached`` sets of parameters (the ones used least
+        recently are removed first). The returned timeseries are the saved
+        ones, so they must not be modified in place, nor returned to the user
+        as they are: public methods have to return new timeseries (e.g., the
+        result of an arithmetic operation, or a copy).
+
+        :param modes: Multipoles to integrate, as tuples ``(l, m)``.
+        :type modes: list of tuples
+        :param pcut: Period that enters the fixed-frequency integration.
+        :type pcut: float
+        :param order: Number of integrations.
+        :type order: int
+        :param window_function: If not None, apply window_function to the
+                                multipoles before integrating them (see
+                                :py:meth:`~.get_strain_lm`).
+        :type window_function: callable, str, or None
+        :param window_args: Positional arguments for the window function.
+        :type window_args: tuple
+        :param window_kwargs: Keyword arguments for the window function.
+        :type window_kwargs: dict
+        :param workers: Number of threads used to compute the Fourier
+                        transforms (see ``scipy.fft.fft``).
+        :type workers: int or None
+
+        :returns: Integrated multipoles.
+        :rtype: dict with keys ``(l, m)`` and values :py:class:`~TimeSeries`
+        """
+        if window_kwargs is None:
+            window_kwargs = {}
+
+        key = (
+            pcut,
+            int(order),
+            window_function,
+            tuple(window_args),
+            tuple(sorted(window_kwargs.items())),
         )
+        try:
+            cache = self._ffi_cache.get(key, {})
+            if key in self._ffi_cache:
+                self._ffi_cache.move_to_end(key)
+        except TypeError:
+            # Some of the arguments cannot be hashed (e.g., arrays), so we
+            # cannot save the result
+            key, cache = None, {}
+
+        missing = [mode for mode in modes if mode not in cache]
+
+        if missing:
+            integrands = [
+                self._windowed(
+                    self[mode], window_function, *window_args, **window_kwargs
+                )
+                for mode in missing
+            ]
+            integrated = self._fixed_frequency_integrated_many(
+                integrands, pcut, order, workers=workers
+            )
+            cache.update(zip(missing, integrated))
+            if key is not None:
+                self._ffi_cache[key] = cache
+                while len(self._ffi_cache) > self.max_ffi_cached:
+                    self._ffi_cache.popitem(last=False)
 
-        # np.sign(omega) / (ffi_omega) is omega when omega_abs > omega_thres
-        # this is a convient way to group together positive and negative omega
-        integration_factor = (np.sign(omega) / (1j * ffi_omega)) ** int(order)
+        return {mode: cache[mode] for mode in modes}
 
-        # Now, inverse fft
-        integrated_y = np.fft.ifft(fft * integration_factor)
+    def _modes_up_to(self, l_max):
+        """Return the available modes with l up to ``l_max``.
 
-        return ts.TimeSeries(integrand.t, integrated_y)
+        :param l_max: Ignore multipoles with l > l_max. If None, include all
+                      of them.
+        :type l_max: int
+
+        :returns: Modes as tuples ``(l, m)``.
+        :rtype: list of tuples
+        """
+        return [
+            mode for mode in self.keys() if l_max is None or mode[0] <= l_max
+        ]
 
     # This function is only for convenience
     def get_psi4_lm(self, mult_l, mult_m):
@@ -242,25 +448,18 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
         if psi4lm.time_length < 2 * pcut:
             raise ValueError("pcut too large for timeseries")
 
-        if callable(window_function):
-            integrand = psi4lm.windowed(window_function, *args, **kwargs)
-        elif isinstance(window_function, str):
-            window_function_method = f"{window_function}_windowed"
-            if not hasattr(psi4lm, window_function_method):
-                raise ValueError(f"Window {window_function} not implemented")
-            window_function_callable = getattr(psi4lm, window_function_method)
-
-            # This returns a new TimeSeries
-            integrand = window_function_callable(*args, **kwargs)
-        elif window_function is None:
-            integrand = psi4lm
-        else:
-            raise ValueError("Unknown window function")
-
-        strain = self._fixed_frequency_integrated(integrand, pcut, order=2)
+        strain = self._ffi_modes(
+            [(mult_l, mult_m)],
+            pcut,
+            order=2,
+            window_function=window_function,
+            window_args=args,
+            window_kwargs=kwargs,
+        )[(mult_l, mult_m)]
 
+        # strain is shared with the other methods, so we cannot modify it
         if trim_ends:
-            strain.crop(strain.tmin + pcut, strain.tmax - pcut)
+            strain = strain.cropped(strain.tmin + pcut, strain.tmax - pcut)
 
         # The return value is rh not just h (the strain)
         # h_plus - i h_cross
@@ -315,6 +514,17 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
         # of the multipole component, l, m, r, and potentially others.
         # Then, it accumulates all the results, and return the sum.
 
+        # We integrate all the modes at once, get_strain_lm will use the
+        # results
+        self._ffi_modes(
+            self._modes_up_to(l_max),
+            pcut,
+            order=2,
+            window_function=window_function,
+            window_args=args,
+            window_kwargs=kwargs,
+        )
+
         # This is a closure with theta, phi, pcut, and window_function and
         # trim_ends
         def compute_strain(_1, mult_l, mult_m, _2):
@@ -446,9 +656,9 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
                   time.
         :rtype: :py:class:`~TimeSeries`
         """
-        psi4_int = self._fixed_frequency_integrated(
-            self[(mult_l, mult_m)], pcut, order=1
-        )
+        psi4_int = self._ffi_modes([(mult_l, mult_m)], pcut, order=1)[
+            (mult_l, mult_m)
+        ]
         return self.dist ** 2 / (16 * np.pi) * np.abs(psi4_int) ** 2
 
     def get_energy_lm(self, mult_l, mult_m, pcut):
@@ -483,6 +693,10 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
 
         """
 
+        # We integrate all the modes at once, get_power_lm will use the
+        # results
+        self._ffi_modes(self._modes_up_to(l_max), pcut, order=1)
+
         def powlm(_1, mult_l, mult_m, _2):
             return self.get_power_lm(mult_l, mult_m, pcut)
 
@@ -534,13 +748,13 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
         # and take the imaginary part. So,
         # torque = - Im(conj(\int\int psi4) * \int psi4)
 
-        psi4_int1 = self._fixed_frequency_integrated(
-            self[(mult_l, mult_m)], pcut
-        )
+        psi4_int1 = self._ffi_modes([(mult_l, mult_m)], pcut, order=1)[
+            (mult_l, mult_m)
+        ]
         # We need to integrate twice
-        psi4_int2 = self._fixed_frequency_integrated(
-            self[(mult_l, mult_m)], pcut, order=2
-        )
+        psi4_int2 = self._ffi_modes([(mult_l, mult_m)], pcut, order=2)[
+            (mult_l, mult_m)
+        ]
         return (
             self.dist ** 2
             / (16 * np.pi)
@@ -580,6 +794,12 @@ class GravitationalWavesOneDet(mp.MultipoleOneDet):
         :rtype: :py:class:`~TimeSeries`
         """
 
+        # We integrate all the modes at once, get_torque_z_lm will use the
+        # results
+        modes = self._modes_up_to(l_max)
+        self._ffi_modes(modes, pcut, order=1)
+        self._ffi_modes(modes, pcut, order=2)
+
         def torqzlm(_1, mult_l, mult_m, _2):
             return self.get_torque_z_lm(mult_l, mult_m, pcut)
 
@@ -724,8 +944,9 @@ class WavesDir(mp.MultipoleAllDets):
             # Now we have to prepare the data for the constructor of the base class
             # The data has format:
             # (multipole_l, multipole_m, extraction_radius, timeseries)
+            # We use det.data so that the multipoles are not read here
             for radius, det in psi4_mpalldets._dets.items():
-                for mult_l, mult_m, tts in det:
+                for mult_l, mult_m, tts in det.data:
                     if mult_l >= l_min:
                         data.append((mult_l, mult_m, radius, tts))
 
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+"""The :py:mod:`~.column_cache` module provides a persistent cache in binary
+format for the numbers read from ASCII files.
+
+Parsing text is slow: for simulations with many restarts and many reductions,
+most of the time needed to read the scalar data is spent converting text to
+floating point numbers. With a :py:class:`~.ColumnCache`, the table with the
+numbers of each file is saved in NumPy's binary format (``.npy``) the first
+time the file is read. The next times, the table is memory-mapped, so that
+only the columns that are actually used are read from disk. This is typically
+used through the ``column_cache_dir`` argument of :py:class:`~.SimDir`.
+
+The module provides:
+
+- :py:class:`~.ColumnCache`: the cache, saved as a directory of ``.npy``
+  files.
+
+"""
+
+import glob
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+
+class ColumnCache:
+    """Persistent cache for tables of numbers read from files.
+
+    Each table is saved in a ``.npy`` file in the cache directory. The name of
+    the file is computed from the absolute path, the modification time, and
+    the size of the source file, so if the source file changes, the table is
+    computed again (and the outdated one is removed).
+
+    :ivar directory: Path of the directory where the tables are saved.
+    :type directory: str
+
+    """
+
+    def __init__(self, directory):
+        """Constructor.
+
+        :param directory: Path of the directory where the tables are saved.
+                          It is created if it does not exist.
+        :type directory: str
+
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _prefix(self, path):
+        """Return the part of the name of the cache files that identifies the
+        source file ``path``.
+
+        :param path: Path of the source file.
+        :type path: str
+
+        :returns: Prefix of the names of the cache files.
+        :rtype: str
+
+        """
+        # We use a hash of the path so that we do not have to deal with
+        # directories and special characters
+        digest = hashlib.sha1(
+            os.path.abspath(path).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def _cache_file(self, path):
+        """Return the path of the cache file associated to the current
+        version of the source file ``path``.
+
+        :param path: Path of the source file.
+        :type path: str
+
+        :returns: Path of the cache file.
+        :rtype: str
+
+        """
+        stat = os.stat(path)
+        return f"{self._prefix(path)}-{stat.st_mtime_ns}-{stat.st_size}.npy"
+
+    def __contains__(self, path):
+        """Whether there is an up-to-date table for the source file ``path``."""
+        return os.path.exists(self._cache_file(path))
+
+    def get(self, path, compute):
+        """Return the table associated to the source file ``path``.
+
+        If the table is not in the cache, or if the source file was modified
+        since the table was saved, call ``compute()`` and save the result.
+
+        :param path: Path of the source file.
+        :type path: str
+        :param compute: Function with no arguments that returns the table
+                        when it has to be computed.
+        :type compute: callable
+
+        :returns: Table (memory-mapped, read-only) associated to ``path``.
+        :rtype: NumPy array
+
+        """
+        # We take the stat before computing the value, so that if the file
+        # changes in the meantime, the table is invalidated next time.
+        cache_file = self._cache_file(path)
+
+        if not os.path.exists(cache_file):
+            data = np.ascontiguousarray(compute())
+
+            # Tables for older versions of the file are no longer useful. We
+            # do not remove cache_file: another process could have just
+            # written it (and could be reading it).
+            for outdated in glob.glob(f"{glob.escape(self._prefix(path))}-*"):
+                if outdated != cache_file:
+                    try:
+                        os.remove(outdated)
+                    except FileNotFoundError:
+                        # Removed by another process
+                        pass
+
+            # We write to a temporary file and then move it, so that other
+            # processes never see a partially written table
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    np.save(tmp_file, data)
+                os.replace(tmp_path, cache_file)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+        return np.load(cache_file, mmap_mode="r")
+
+    def clear(self):
+        """Remove all the tables from the cache."""
+        for cache_file in glob.glob(
+            os.path.join(glob.escape(self.directory), "*.npy")
+        ):
+            os.remove(cache_file)
+
+    def __len__(self):
+        return len(
+            glob.glob(os.path.join(glob.escape(self.directory), "*.npy"))
+        )
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+"""The :py:mod:`~.data_cache` module provides a cache for data that was read
+from files, with a bound on the memory used.
+
+Grid data can be very large (a single 3D iteration can take several GB), so
+keeping in memory everything that was read is not an option. A
+:py:class:`~.DataCache` keeps the data that was used most recently, up to a
+given number of bytes. Typically, there is one :py:class:`~.DataCache` for each
+:py:class:`~.SimDir`.
+
+The module provides:
+
+- :py:class:`~.DataCache`: the cache.
+- :py:class:`~.CacheInfo`: statistics of the cache, as returned by
+  :py:meth:`~.DataCache.cache_info`.
+
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    ["hits", "misses", "evictions", "num_items", "nbytes", "max_bytes"],
+)
+CacheInfo.__doc__ = """Statistics of a :py:class:`~.DataCache`.
+
+:ivar hits: Number of requests that were found in the cache.
+:ivar misses: Number of requests that had to be computed.
+:ivar evictions: Number of items removed to make space for new ones.
+:ivar num_items: Number of items currently in the cache.
+:ivar nbytes: Number of bytes currently in the cache.
+:ivar max_bytes: Maximum number of bytes in the cache.
+"""
+
+
+def nbytes(value):
+    """Return the number of bytes used by the data in ``value``.
+
+    ``value`` can be a :py:class:`~.HierarchicalGridData` (or anything with a
+    ``all_components`` attribute), a :py:class:`~.UniformGridData` (or anything
+    with a ``data`` attribute), a :py:class:`~.TimeSeries` (or anything with
+    ``x`` and ``y`` attributes), or a NumPy array. Only the data is counted.
+
+    :param value: Object to measure.
+    :type value: :py:class:`~.HierarchicalGridData`,
+                 :py:class:`~.UniformGridData`, :py:class:`~.TimeSeries`, or
+                 NumPy array
+
+    :returns: Number of bytes.
+    :rtype: int
+
+    """
+    if value is None:
+        return 0
+    if hasattr(value, "all_components"):
+        return sum(nbytes(comp) for comp in value.all_components)
+    if hasattr(value, "data"):
+        return nbytes(value.data)
+    if hasattr(value, "x") and hasattr(value, "y"):
+        return nbytes(value.x) + nbytes(value.y)
+    return getattr(value, "nbytes", 0)
+
+
+class DataCache:
+    """Least-recently-used cache with a maximum size in bytes.
+
+    When a new item does not fit in the cache, the items that were used least
+    recently are removed until there is enough space. Items larger than the
+    cache are not saved.
+
+    :py:class:`~.DataCache` can be used by multiple threads.
+
+    :ivar max_bytes: Maximum number of bytes in the cache.
+    :type max_bytes: int
+
+    """
+
+    def __init__(self, max_bytes=2 * 1024 ** 3):
+        """Constructor.
+
+        :param max_bytes: Maximum number of bytes in the cache. If 0, nothing
+                          is saved.
+        :type max_bytes: int
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes cannot be negative")
+
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        # key: (value, nbytes), ordered from least to most recently used
+        self._items = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, compute):
+        """Return the value associated to ``key``.
+
+        If ``key`` is not in the cache, call ``compute()`` and save the
+        result.
+
+        :param key: Key of the item (has to be hashable).
+        :type key: any
+        :param compute: Function with no arguments that returns the value
+                        when it is not in the cache.
+        :type compute: callable
+
+        :returns: Value associated to ``key``.
+        :rtype: any
+
+        """
+        with self._lock:
+            if key in self._items:
+                self._hits += 1
+                self._items.move_to_end(key)
+                return self._items[key][0]
+            self._misses += 1
+
+        # We do not hold the lock while computing, so that other items can be
+        # read in the meantime
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def get_if_present(self, key, default=None):
+        """Return the value associated to ``key`` if it is in the cache,
+        otherwise return ``default``.
+
+        Values that are not in the cache are not counted as misses.
+
+        :param key: Key of the item.
+        :type key: any
+        :param default: Value to return if ``key`` is not in the cache.
+        :type default: any
+
+        :returns: Value associated to ``key``, or ``default``.
+        :rtype: any
+
+        """
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._hits += 1
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        """Save ``value`` in the cache with the given ``key``.
+
+        :param key: Key of the item (has to be hashable).
+        :type key: any
+        :param value: Value to save.
+        :type value: any
+
+        """
+        size = nbytes(value)
+
+        with self._lock:
+            if key in self._items:
+                self._nbytes -= self._items.pop(key)[1]
+
+            if size > self.max_bytes:
+                return
+
+            while self._nbytes + size > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._nbytes -= evicted_size
+                self._evictions += 1
+
+            self._items[key] = (value, size)
+            self._nbytes += size
+
+    def discard(self, key):
+        """Remove the item with the given ``key`` from the cache, if it is
+        there.
+
+        :param key: Key of the item.
+        :type key: any
+
+        """
+        with self._lock:
+            if key in self._items:
+                self._nbytes -= self._items.pop(key)[1]
+
+    def clear(self):
+        """Remove all the items from the cache (statistics are not reset)."""
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
+
+    def cache_info(self):
+        """Return statistics on the cache.
+
+        :returns: Statistics on the usage of the cache.
+        :rtype: :py:class:`~.CacheInfo`
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._items),
+                self._nbytes,
+                self.max_bytes,
+            )
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
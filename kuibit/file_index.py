@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+"""The :py:mod:`~.file_index` module provides a persistent cache for the
+information that ``kuibit`` extracts from the files of a simulation (e.g., the
+content of directories, the headers of ASCII files, the groups in HDF5 files).
+
+Opening a simulation requires inspecting a large number of files. On parallel
+filesystems this can take a long time. With a :py:class:`~.FileIndex`, this
+work is done only once: the results are saved to disk and they are reused
+the next time, as long as the files are not modified. This is typically used
+through the ``index_file`` argument of :py:class:`~.SimDir`.
+
+The module provides:
+
+- :py:class:`~.FileIndex`: the persistent cache, saved in a SQLite database.
+- :py:func:`~.cached`: helper function to use a :py:class:`~.FileIndex` that
+  might be ``None``.
+- :py:func:`~.h5_group_names`: names of the groups in a HDF5 file, read
+  through a :py:class:`~.FileIndex`.
+
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+
+import h5py
+
+
+class FileIndex:
+    """Persistent cache for information extracted from files.
+
+    Entries are identified by the path of the file and by a key that describes
+    the type of information stored (e.g., ``scan_header``). Each entry is
+    associated to the modification time and size of the file when the entry
+    was computed. If any of these changes, the entry is computed again.
+
+    The values are saved with ``pickle``, so only use index files that you
+    created.
+
+    :ivar path: Path of the database.
+    :type path: str
+
+    """
+
+    # Increase this number when the format of the stored values changes, so
+    # that old indices are discarded
+    _version = 1
+
+    def __init__(self, path):
+        """Constructor.
+
+        :param path: Path of the database. It is created if it does not exist.
+        :type path: str
+
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+
+        # The index is used by multiple threads, so we have to serialize the
+        # access to the connection
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            (version,) = self._connection.execute(
+                "PRAGMA user_version"
+            ).fetchone()
+            if version != self._version:
+                self._connection.execute("DROP TABLE IF EXISTS entries")
+                self._connection.execute(
+                    f"PRAGMA user_version = {self._version}"
+                )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "path TEXT, key TEXT, mtime INTEGER, size INTEGER, value BLOB,"
+                " PRIMARY KEY (path, key))"
+            )
+            # The index can always be regenerated, so we do not need to wait
+            # for the data to be physically written on the disk
+            self._connection.execute("PRAGMA synchronous = OFF")
+
+    def get(self, path, key, compute):
+        """Return the value associated to ``path`` and ``key``.
+
+        If the value is not in the index, or if the file was modified since
+        the value was saved, call ``compute()`` and save the result.
+
+        :param path: Path of the file (or directory).
+        :type path: str
+        :param key: Identifier of the information requested.
+        :type key: str
+        :param compute: Function with no arguments that returns the value
+                        when it has to be computed.
+        :type compute: callable
+
+        :returns: Value associated to ``path`` and ``key``.
+        :rtype: any
+
+        """
+        # We take the stat before computing the value, so that if the file
+        # changes in the meantime, the entry is invalidated next time.
+        stat = os.stat(path)
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT mtime, size, value FROM entries"
+                " WHERE path = ? AND key = ?",
+                (path, key),
+            ).fetchone()
+
+        if row is not None and row[:2] == (stat.st_mtime_ns, stat.st_size):
+            return pickle.loads(row[2])
+
+        value = compute()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (
+                    path,
+                    key,
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    pickle.dumps(value),
+                ),
+            )
+
+        return value
+
+    def clear(self):
+        """Remove all the entries from the index."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()[0]
+
+
+def cached(index, path, key, compute):
+    """Return ``compute()``, using ``index`` to avoid repeating the work if
+    ``index`` is not ``None``.
+
+    :param index: Index to use, or ``None`` to always call ``compute``.
+    :type index: :py:class:`~.FileIndex` or None
+    :param path: Path of the file (or directory).
+    :type path: str
+    :param key: Identifier of the information requested.
+    :type key: str
+    :param compute: Function with no arguments that returns the value
+                    when it has to be computed.
+    :type compute: callable
+
+    :returns: Value associated to ``path`` and ``key``.
+    :rtype: any
+
+    """
+    if index is None:
+        return compute()
+    return index.get(path, key, compute)
+
+
+def h5_group_names(path, index=None):
+    """Return the names of the groups (or datasets) at the top level of the
+    given HDF5 file, using ``index`` to avoid opening the file again if
+    ``index`` is not ``None``.
+
+    :param path: Path of the file.
+    :type path: str
+    :param index: Index used to avoid reading again files that were already
+                  read.
+    :type index: :py:class:`~.FileIndex` or None
+
+    :returns: Names of the groups in the file.
+    :rtype: list of str
+
+    """
+
+    def read_group_names():
+        with h5py.File(path, "r") as h5f:
+            return list(h5f.keys())
+
+    return cached(index, path, "h5_group_names", read_group_names)
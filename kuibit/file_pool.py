@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+"""The :py:mod:`~.file_pool` module provides a way to keep HDF5 files open
+across multiple reads.
+
+Opening a HDF5 file is expensive (the metadata has to be read every time), and
+simulations can have many files (e.g., one per MPI process). Reading one
+iteration of a grid function can require reading hundreds of datasets from
+tens of files. With a :py:class:`~.H5FilePool`, each file is opened only once
+and it is kept open for the next reads. The number of files that are open at
+the same time is bounded, when the limit is reached the file that was used
+least recently is closed.
+
+Typically, there is one :py:class:`~.H5FilePool` for each
+:py:class:`~.SimDir` (when it is created with ``max_open_files``), and the
+files are closed with :py:meth:`~.SimDir.close`.
+
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import h5py
+
+
+class H5FilePool:
+    """Bounded pool of HDF5 files open in read-only mode.
+
+    Files are opened upon request and kept open until they are closed with
+    :py:meth:`~.close` or until there are more than ``max_open_files`` files
+    open. In that case, the files used least recently are closed. Files that
+    are being used are never closed, so the limit can be exceeded temporarily.
+
+    :py:class:`~.H5FilePool` can be used by multiple threads. HDF5 files
+    cannot be shared across processes, so, if the process is forked, the
+    new process does not use the files opened by the parent. For the same
+    reason, when a :py:class:`~.H5FilePool` is pickled (e.g., to be sent to a
+    process pool), only ``max_open_files`` is saved.
+
+    :py:class:`~.H5FilePool` can be used as a context manager, in which case
+    all the files are closed when exiting the context.
+
+    :ivar max_open_files: Maximum number of files to keep open.
+    :type max_open_files: int
+
+    """
+
+    def __init__(self, max_open_files=64):
+        """Constructor.
+
+        :param max_open_files: Maximum number of files to keep open.
+        :type max_open_files: int
+        """
+        if max_open_files < 1:
+            raise ValueError("max_open_files has to be at least 1")
+
+        self.max_open_files = int(max_open_files)
+        self._reset()
+
+    def _reset(self):
+        """Forget all the open files (without closing them)."""
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        # path: h5py.File, ordered from the least to the most recently used
+        self._files = OrderedDict()
+        # path: number of users of the file
+        self._in_use = {}
+
+    def _check_fork(self):
+        """If we are in a forked process, forget the files of the parent."""
+        # We cannot close the files, as this could interfere with the parent
+        # process (and the lock could have been acquired by a thread of the
+        # parent), so we simply forget them.
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def _close_unused(self):
+        """Close the least recently used files until we are within
+        max_open_files (or all the remaining files are being used).
+
+        Must be called with the lock acquired.
+        """
+        to_close = len(self._files) - self.max_open_files
+        for path in list(self._files):
+            if to_close <= 0:
+                break
+            if self._in_use.get(path, 0) == 0:
+                self._files.pop(path).close()
+                to_close -= 1
+
+    @contextmanager
+    def open(self, path):
+        """Context manager that returns the open HDF5 file ``path``.
+
+        The file remains open after the context, unless too many files are
+        open.
+
+        :param path: Path of the file.
+        :type path: str
+
+        """
+        self._check_fork()
+        with self._lock:
+            if path in self._files:
+                self._files.move_to_end(path)
+            else:
+                self._files[path] = h5py.File(path, "r")
+            self._in_use[path] = self._in_use.get(path, 0) + 1
+            h5f = self._files[path]
+            self._close_unused()
+
+        try:
+            yield h5f
+        finally:
+            with self._lock:
+                self._in_use[path] -= 1
+                if self._in_use[path] == 0:
+                    del self._in_use[path]
+                self._close_unused()
+
+    def close(self):
+        """Close all the files."""
+        self._check_fork()
+        with self._lock:
+            for h5f in self._files.values():
+                h5f.close()
+            self._files.clear()
+
+    def __len__(self):
+        """Number of files that are currently open."""
+        self._check_fork()
+        return len(self._files)
+
+    def __contains__(self, path):
+        """Whether the file is currently open."""
+        self._check_fork()
+        return path in self._files
+
+    def __getstate__(self):
+        # Open files and locks cannot be pickled
+        return {"max_open_files": self.max_open_files}
+
+    def __setstate__(self, state):
+        self.max_open_files = state["max_open_files"]
+        self._reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -29,6 +29,8 @@ cell-centered grid.
 - :py:class:`~.UniformGridData` represents data on a uniform grid.
 - :py:class:`~.HierarchicalGridData` represents data on a refined grid
 hierarchy (AMR).
+- :py:class:`~.GridResampler` resamples data onto a uniform grid reusing the
+interpolation weights.
 
 A :py:class:`~.UniformGridData` object contains a :py:class:`~.UniformGrid` one.
 Similarly, a :py:class:`~.HierarchicalGridData` contains multiple
@@ -36,12 +38,89 @@ Similarly, a :py:class:`~.HierarchicalGridData` contains multiple
 
 """
 
+import threading
+from collections import OrderedDict
+
 import numpy as np
-from scipy import interpolate, linalg
+from scipy import linalg, ndimage
 
 from kuibit import grid_data_utils as gdu
 from kuibit.numerical import BaseNumerical
 
+# numba is optional. When it is available, the multilinear interpolation on
+# large numbers of points is compiled to native code and runs in parallel
+# (see UniformGridData._multilinear_interpolation).
+try:
+    from numba import njit, prange
+
+    _HAS_NUMBA = True
+except ImportError:  # pragma: no cover
+    prange = range
+    _HAS_NUMBA = False
+
+# Minimum number of points for which we use numba (below this, the overhead of
+# calling the compiled function is not worth it)
+_NUMBA_MIN_POINTS = 100000
+# Compiled version of _multilinear_interpolation_core, created the first time
+# it is needed
+_multilinear_interpolation_numba = None
+
+
+def _multilinear_interpolation_core(data, shape, x0, dx, points, out):
+    """Evaluate the multilinear interpolation of ``data`` on ``points`` and
+    save the result in ``out``.
+
+    This is the kernel of
+    :py:meth:`~.UniformGridData._multilinear_interpolation` written with
+    explicit loops so that it can be compiled with numba (with
+    ``parallel=True``). It works in pure Python too, but it is very slow.
+
+    The points must be inside the grid (including the half cells at the
+    boundaries, where the data is constant). No temporary array is allocated:
+    the indices and the weights of the corners of the cell that contains the
+    point are computed on the fly.
+
+    :param data: Flattened data (in C order).
+    :type data: 1D NumPy array
+    :param shape: Number of points along each dimension.
+    :type shape: 1D NumPy array of int
+    :param x0: Coordinates of the first point of the grid.
+    :type x0: 1D NumPy array of float
+    :param dx: Spacing of the grid.
+    :type dx: 1D NumPy array of float
+    :param points: Points where to evaluate the data, with shape
+                   ``(num_points, num_dimensions)``.
+    :type points: 2D NumPy array of float
+    :param out: Array where to save the result, with length ``num_points``.
+    :type out: 1D NumPy array
+
+    """
+    num_dimensions = shape.shape[0]
+    num_corners = 2 ** num_dimensions
+
+    for point_index in prange(points.shape[0]):
+        out[point_index] = 0
+        # We loop over the 2^N corners of the cell, the bits of corner tell
+        # us whether we are taking the left (0) or the right (1) point along
+        # each dimension
+        for corner in range(num_corners):
+            weight = 1.0
+            flat_index = 0
+            for dim in range(num_dimensions):
+                position = (points[point_index, dim] - x0[dim]) / dx[dim]
+                # In the half cells at the boundaries, left is clamped and the
+                # weight is 0 or 1, so the data is constant there
+                left = min(max(int(np.floor(position)), 0), shape[dim] - 2)
+                right_weight = min(max(position - left, 0.0), 1.0)
+                index = left
+                if (corner >> dim) & 1:
+                    weight *= right_weight
+                    index += 1
+                else:
+                    weight *= 1.0 - right_weight
+                flat_index = flat_index * shape[dim] + index
+            out[point_index] += weight * data[flat_index]
+
 
 class UniformGrid:
     """Describes the geometry of a regular rectangular dataset, as well as
@@ -730,14 +809,10 @@ class UniformGridData(BaseNumerical):
     :ivar data: The actual data.
     :type data: NumPy array.
 
-    :ivar invalid_spline: Whether the spline stored is valid.
-    :type invalid_spline: bool
-
-    :ivar spline_real: Spline representation of the real part of the data.
-    :type spline_real: SciPy's RegularGridInterpolator, or None
-
-    :ivar spline_imag: Spline representation of the imaginary part of the data.
-    :type spline_imag: SciPy's RegularGridInterpolator, or None
+    The cubic interpolation (``k=3``) uses the coefficients of the B-spline
+    representation of the data, which are computed the first time
+    they are needed and are kept until the data changes. If you modify the
+    elements of ``data`` in place, the coefficients are not updated.
 
     """
 
@@ -763,15 +838,9 @@ class UniformGridData(BaseNumerical):
         self.grid = grid.copy()
         self.data = data.copy()
 
-        # We keep this flag around to know when we have to recompute the
-        # splines
-        self.invalid_spline = True
-        # Here we also define the splines as empty objects so that we know that
-        # they are attributes of the class and they are not uninitialized.
-        # These attributes will store data relevant for evaluating the spline.
-        # This will be an object of type SciPy's RegularGridInterpolator.
-        self.spline_real = None
-        self.spline_imag = None
+        # Coefficients of the cubic B-spline, with the data they were computed
+        # from (see _cubic_spline_coefficients)
+        self._cubic_coefficients = None
 
     # This is a class method. It doesn't depend on the specific instance, and
     # it is used as an alternative constructor.
@@ -1036,73 +1105,6 @@ class UniformGridData(BaseNumerical):
     def __getitem__(self, key):
         return self.data[key]
 
-    def _make_spline(self, k=1):
-        """Private function to make spline representation of the data using
-        ``scipy.interpolate.RegularGridInterpolator``.
-
-        Only nearest neighbor or multilinear interpolations are available.
-
-        Computing spline is memory intenstive: 150 MB/million points.
-
-        This function is not meant to be called directly.
-
-        :param k: Order of the interpolation (k = 0 or 1).
-        :type k:  int
-
-        """
-
-        coords = self.grid.coordinates()
-
-        if k not in (0, 1):
-            raise ValueError(
-                "Order for splines for dimensions > 2 must be 0 or 1"
-            )
-
-        # Here k is 0 or 1
-        method = "nearest" if k == 0 else "linear"
-
-        # Our grid is cell-centered, so it is perfecly valid to evaluate a point
-        # that it is outside coords, as long as it is within 0.5 * dx. For
-        # example, if the grid is linear from 0 to 10 with dx = 1, the pint
-        # -0.25 is in the grid. To account for this in splines (to avoid that
-        # they throw an error), we add another point at the two boundaries. This
-        # point as the same value as the last point (which is equivalent to a
-        # 0th order interpolation at the very last half cell).
-
-        # With this, the grid has uneven spacing.
-        # Add an element at the beginning and end
-        for index, coord in enumerate(coords):
-            coords[index] = np.concatenate(
-                (
-                    [coord[0] - 0.5 * self.dx[index]],
-                    coord,
-                    [coord[-1] + 0.5 * self.dx[index]],
-                )
-            )
-
-        # Add the border
-        data_real = np.pad(self.data.real, pad_width=1, mode="edge")
-
-        self.spline_real = interpolate.RegularGridInterpolator(
-            coords,
-            data_real,
-            method=method,
-            fill_value=0,
-            bounds_error=True,
-        )
-
-        if self.is_complex():
-            data_imag = np.pad(self.data.imag, pad_width=1, mode="edge")
-            self.spline_imag = interpolate.RegularGridInterpolator(
-                coords,
-                data_imag,
-                method=method,
-                fill_value=0,
-                bounds_error=True,
-            )
-
-        self.invalid_spline = False
-
     def _nearest_neighbor_interpolation(self, points, ext=2):
         """Return data of nearest neighbors of given points x.
 
@@ -1168,12 +1170,191 @@ class UniformGridData(BaseNumerical):
 
         return ret
 
-    def evaluate_with_spline(self, x, ext=2, piecewise_constant=False):
+    def _points_outside(self, points, ext=2):
+        """Return which points are outside the grid.
+
+        The points on the outer boundary are inside (as in
+        ``RegularGridInterpolator``).
+
+        :param points: Points, with shape ``(num_points, num_dimensions)``.
+        :type points: 2D NumPy array of float
+
+        :param ext: If ``ext=2``, raise an error if any point is outside.
+        :type ext:  int
+
+        :returns: Whether each point is outside the grid.
+        :rtype:   1D NumPy array of bool
+
+        """
+        outside = np.any(
+            (points < self.grid.lowest_vertex)
+            | (points > self.grid.highest_vertex),
+            axis=1,
+        )
+        if ext == 2 and np.any(outside):
+            raise ValueError("Point outside the grid")
+        return outside
+
+    def _multilinear_interpolation(self, points, ext=2):
+        """Return the multilinear interpolation of the data on the given
+        points.
+
+        In the half cells at the boundaries, the data is constant (equal to
+        the value of the last point). This is done by clamping the indices and
+        the weights, so the data is not copied. Complex data is interpolated
+        in one pass. If numba is available and there are many
+        points, the interpolation is compiled and runs in parallel.
+
+        :param points: Points where to evaluate the data, with shape
+                       ``(num_points, num_dimensions)``.
+        :type points: 2D NumPy array of float
+
+        :param ext: How to deal values outside the boundaries. Values outside
+                    the interval are set to 0 if ``ext=1``,
+                    or an error is raised if ``ext=2``.
+        :type ext:  int
+
+        :returns: Values of the data evaluated on ``points``.
+        :rtype:   1D NumPy array
+
+        """
+        points = np.asarray(points, dtype=float)
+        outside = self._points_outside(points, ext=ext)
+
+        # The output is always floating point, even if the data is int
+        ret = np.zeros(len(points), dtype=np.result_type(self.data, float))
+
+        inside_points = points[~outside] if np.any(outside) else points
+
+        if len(inside_points) >= _NUMBA_MIN_POINTS and _HAS_NUMBA:
+            global _multilinear_interpolation_numba
+            if _multilinear_interpolation_numba is None:
+                _multilinear_interpolation_numba = njit(parallel=True)(
+                    _multilinear_interpolation_core
+                )
+            values = np.empty(len(inside_points), dtype=ret.dtype)
+            _multilinear_interpolation_numba(
+                np.ascontiguousarray(self.data).ravel(),
+                np.asarray(self.shape, dtype=np.int64),
+                np.asarray(self.x0, dtype=float),
+                np.asarray(self.dx, dtype=float),
+                np.ascontiguousarray(inside_points),
+                values,
+            )
+            ret[~outside] = values
+            return ret
+
+        # Vectorized version with NumPy. We work with the position of the
+        # points in units of grid spacing. left is the index of the first point
+        # of the cell that contains the point, and right_weight the weight of
+        # the second point. In the half cells at the boundaries, left is
+        # clamped and the weights are 0 or 1, so that the data is constant
+        # there.
+        positions = (inside_points - self.x0) / self.dx
+        lefts = np.clip(np.floor(positions), 0, self.shape - 2).astype(np.intp)
+        right_weights = np.clip(positions - lefts, 0, 1)
+        left_weights = 1 - right_weights
+
+        values = np.zeros(len(inside_points), dtype=ret.dtype)
+        # We sum the contributions of the 2^N corners of the cells
+        for corner in range(2 ** self.num_dimensions):
+            weights = np.ones(len(inside_points))
+            indices = []
+            for dim in range(self.num_dimensions):
+                if (corner >> dim) & 1:
+                    weights *= right_weights[:, dim]
+                    indices.append(lefts[:, dim] + 1)
+                else:
+                    weights *= left_weights[:, dim]
+                    indices.append(lefts[:, dim])
+            values += weights * self.data[tuple(indices)]
+
+        ret[~outside] = values
+        return ret
+
+    def _cubic_spline_coefficients(self):
+        """Return the coefficients of the cubic B-spline representation of the
+        real and imaginary part of the data.
+
+        The coefficients are computed with ``scipy.ndimage.spline_filter``
+        (with mirror boundary conditions) the first time they are needed, and
+        they are reused until the data changes.
+
+        :returns: Coefficients for the real and the imaginary part (None if the
+                  data is real).
+        :rtype: tuple of NumPy arrays
+        """
+        # We compare the data by identity: methods that modify the object
+        # replace the data with a new array
+        if (
+            self._cubic_coefficients is None
+            or self._cubic_coefficients[0] is not self.data
+        ):
+            coeffs_real = ndimage.spline_filter(self.data.real, order=3)
+            coeffs_imag = (
+                ndimage.spline_filter(self.data.imag, order=3)
+                if self.is_complex()
+                else None
+            )
+            self._cubic_coefficients = (self.data, coeffs_real, coeffs_imag)
+        return self._cubic_coefficients[1:]
+
+    def _cubic_interpolation(self, points, ext=2):
+        """Return the cubic B-spline interpolation of the data on the given
+        points.
+
+        The coefficients of the spline are computed once (see
+        :py:meth:`~._cubic_spline_coefficients`), so evaluating the data again
+        only costs the evaluation with ``scipy.ndimage.map_coordinates``. In
+        the half cells at the boundaries, the spline is extended with mirror
+        symmetry.
+
+        :param points: Points where to evaluate the data, with shape
+                       ``(num_points, num_dimensions)``.
+        :type points: 2D NumPy array of float
+
+        :param ext: How to deal values outside the boundaries. Values outside
+                    the interval are set to 0 if ``ext=1``,
+                    or an error is raised if ``ext=2``.
+        :type ext:  int
+
+        :returns: Values of the data evaluated on ``points``.
+        :rtype:   1D NumPy array
+
+        """
+        points = np.asarray(points, dtype=float)
+        outside = self._points_outside(points, ext=ext)
+
+        coeffs_real, coeffs_imag = self._cubic_spline_coefficients()
+
+        # map_coordinates wants the positions in units of grid spacing, with
+        # one row for each dimension
+        positions = ((points - self.x0) / self.dx).T
+
+        def apply_spline(coeffs):
+            # The coefficients are already computed, so we do not prefilter
+            return ndimage.map_coordinates(
+                coeffs, positions, order=3, mode="mirror", prefilter=False
+            )
+
+        ret = apply_spline(coeffs_real)
+        if coeffs_imag is not None:
+            ret = ret + 1j * apply_spline(coeffs_imag)
+
+        ret[outside] = 0
+        return ret
+
+    def evaluate_with_spline(self, x, ext=2, piecewise_constant=False, k=1):
         """Evaluate the spline on the points ``x``.
 
         Values outside the interval are set to 0 if ``ext=1``, or a
         ``ValueError`` is raised if ``ext=2``.
 
+        By default, the data is interpolated with multilinear interpolation.
+        With ``k=3``, a cubic B-spline is used instead. If there are flat
+        dimensions, or ``piecewise_constant`` is True, the nearest neighbors
+        are used.
+
         This method is meant to be used only if you want to use a different ext
         for a specific call, otherwise, just use __call__.
 
@@ -1185,6 +1366,12 @@ class UniformGridData(BaseNumerical):
                     or an error is raised if ``ext=2``.
         :type ext:  int
 
+        :param piecewise_constant: Use the nearest neighbors.
+        :type piecewise_constant: bool
+
+        :param k: Order of the interpolation (1 for multilinear, 3 for cubic).
+        :type k: int
+
         :returns: Values of the data evaluated on the input ``x``.
         :rtype:   1D NumPy array or float
 
@@ -1199,6 +1386,9 @@ class UniformGridData(BaseNumerical):
         if ext not in (1, 2):
             raise ValueError("Only ext=1 or ext=2 are available")
 
+        if k not in (1, 3):
+            raise ValueError("Only k=1 or k=3 are available")
+
         if isinstance(x, UniformGrid):
             if x.num_dimensions != self.num_dimensions:
                 raise ValueError(
@@ -1228,36 +1418,11 @@ class UniformGridData(BaseNumerical):
 
             ret = self._nearest_neighbor_interpolation(x_arr, ext=ext)
 
+        elif k == 3:
+            ret = self._cubic_interpolation(x_arr, ext=ext)
         else:
             # We are here only with method = linear
-
-            if self.invalid_spline:
-                self._make_spline()
-
-            # ext = 1 is setting to 0. We set fill_value to 0, so this is the
-            # default behavior. We change the bounds_error attribute in
-            # RegularGridInterpolator that controls this. By default, we set it
-            # to raise an error. We reset it to True when we are done.
-            if ext == 1:
-                self.spline_real.bounds_error = False
-                if self.is_complex():
-                    self.spline_imag.bounds_error = False
-
-            def apply_spline(points):
-                y_real = self.spline_real(points)
-                if self.is_complex():
-                    y_imag = self.spline_imag(points)
-                    ret = y_real + 1j * y_imag
-                else:
-                    ret = y_real
-                return ret
-
-            ret = apply_spline(x_arr)
-
-            if ext == 1:
-                self.spline_real.bounds_error = True
-                if self.is_complex():
-                    self.spline_imag.bounds_error = True
+            ret = self._multilinear_interpolation(x_arr, ext=ext)
 
         # Now we have to reconstruct the correct return shape.
         # First, we determine what is the dimensionality of the output
@@ -1439,7 +1604,7 @@ class UniformGridData(BaseNumerical):
         """
         self._apply_to_self(self.sliced, cut=cut, resample=resample)
 
-    def resampled(self, new_grid, ext=2, piecewise_constant=False):
+    def resampled(self, new_grid, ext=2, piecewise_constant=False, k=1):
         """Return a new :py:class:`~.UniformGridData` resampled to ``new_grid``.
 
         If you want to resample without using the spline, and you want a nearest
@@ -1447,12 +1612,17 @@ class UniformGridData(BaseNumerical):
         may be a good choice for data with large discontinuities, where the
         splines are ineffective.
 
+        By default, the data is resampled with multilinear interpolation. For a
+        smooth result, use a cubic spline with ``k=3``.
+
         :param new_grid: New independent variable.
         :type new_grid:  1D NumPy array or list of float
         :param ext: How to handle points outside the data interval.
         :type ext: 1 for returning zero, 2 for ``ValueError``,
         :param piecewise_constant: Do not use splines, use the nearest neighbors.
         :type piecewise_constant: bool
+        :param k: Order of the interpolation (1 for multilinear, 3 for cubic).
+        :type k: int
         :returns: Resampled data.
         :rtype:   :py:class:`~.UniformGridData`
 
@@ -1460,17 +1630,29 @@ class UniformGridData(BaseNumerical):
         if not isinstance(new_grid, UniformGrid):
             raise TypeError("Resample takes another UniformGrid")
 
+        if k not in (1, 3):
+            raise ValueError("Only k=1 or k=3 are available")
+
         # If grid is the same, there's no need to resample
         if self.grid == new_grid:
             return self.copy()
 
-        return type(self)(
-            new_grid,
-            self.evaluate_with_spline(
-                new_grid, ext=ext, piecewise_constant=piecewise_constant
-            ),
+        # The cubic spline is not local, so we cannot paint the data with
+        # precomputed weights as GridResampler does. The coefficients of the
+        # spline are cached, so resampling again is still fast.
+        if k == 3 and not piecewise_constant:
+            return type(self)(
+                new_grid, self.evaluate_with_spline(new_grid, ext=ext, k=3)
+            )
+
+        # The indices and the weights are reused when data with the same
+        # grid structure is resampled again onto new_grid
+        resampler = GridResampler.cached(
+            [self.grid], new_grid, resample=not piecewise_constant, ext=ext
         )
 
+        return type(self)(new_grid, resampler([self.data]))
+
     def is_complex(self):
         """Return whether the data is complex.
 
@@ -1498,7 +1680,7 @@ class UniformGridData(BaseNumerical):
         ret = f(*args, **kwargs)
         self.grid, self.data = ret.grid, ret.data
         # We have to recompute the splines
-        self.invalid_spline = True
+        self._cubic_coefficients = None
 
     def flat_dimensions_removed(self):
         """Return a new :py:class:`~.UniformGridData` with dimensions of one grid point
@@ -2012,6 +2194,272 @@ class UniformGridData(BaseNumerical):
         return type(self)(grid, fft_data)
 
 
+class GridResampler:
+    """Precomputed resampling of data defined on one or more uniform grids
+    onto a target :py:class:`~.UniformGrid`.
+
+    Resampling requires finding where the points of the target grid are with
+    respect to the source grids, and this does not depend on the data. So,
+    when data with the same structure has to be resampled onto the same grid
+    many times (e.g., to make a movie), the indices and the interpolation
+    weights can be computed only once. :py:class:`~.GridResampler` does
+    exactly that: the constructor computes them, and calling the object
+    applies them to new data.
+
+    The source grids are painted on the target grid in the given order, so
+    where they overlap, the last one has the precedence. The points of the
+    target grid are the tensor product of the 1D coordinates, so the points
+    contained in each source grid form a box of indices, and the indices (and
+    the weights) can be computed separately along each dimension. Each box is
+    then written at once, with no per-point work.
+
+    Use :py:meth:`~.cached` to reuse resamplers across calls.
+
+    :ivar grid: Target grid.
+    :type grid: :py:class:`~.UniformGrid`
+    :ivar resample: Whether the data is resampled with multilinear
+                    interpolation (otherwise the nearest neighbors are used).
+    :type resample: bool
+    :ivar ext: How to deal with points outside all the source grids: they
+               are set to 0 if ``ext=1``, or a ``ValueError`` is raised
+               (when the resampler is created) if ``ext=2``.
+    :type ext: int
+
+    """
+
+    # Resamplers saved by cached, from the least to the most recently used
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+    # Maximum number of resamplers in _cache
+    max_cached = 32
+
+    def __init__(self, source_grids, grid, resample=False, ext=2):
+        """Constructor.
+
+        :param source_grids: Grids where the data is defined, in the order
+                             in which they have to be painted.
+        :type source_grids: list of :py:class:`~.UniformGrid`
+        :param grid: Target grid.
+        :type grid: :py:class:`~.UniformGrid`
+        :param resample: If True, resample the data with multilinear
+                         interpolation, otherwise, use nearest neighbors.
+        :type resample: bool
+        :param ext: How to deal with points outside all the source grids:
+                    they are set to 0 if ``ext=1``, or an error is raised if
+                    ``ext=2``.
+        :type ext: int
+        """
+        if ext not in (1, 2):
+            raise ValueError("Only ext=1 or ext=2 are available")
+
+        if any(
+            source.num_dimensions != grid.num_dimensions
+            for source in source_grids
+        ):
+            raise ValueError("Incompatible dimensions between input and self")
+
+        self.grid = grid
+        self.resample = resample
+        self.ext = ext
+
+        # Same coordinates as grid.coordinates(as_same_shape=True)
+        coords = [
+            np.arange(num_points) * dx + x0
+            for num_points, dx, x0 in zip(grid.shape, grid.dx, grid.x0)
+        ]
+
+        self._plans = [self._plan(source, coords) for source in source_grids]
+
+        if ext == 2:
+            # Points that were painted, to find the ones outside all the
+            # source grids
+            painted = np.zeros(grid.shape, dtype=bool)
+            for plan in self._plans:
+                if plan is not None:
+                    painted[plan[0]] = True
+
+            if not painted.all():
+                index = np.argwhere(~painted)[0]
+                point = np.array([coord[i] for coord, i in zip(coords, index)])
+                raise ValueError(f"{point} outside the grid")
+
+    def _plan(self, source, coords):
+        """Compute how to paint the data on ``source`` on the target grid.
+
+        :param source: Grid where the data is defined.
+        :type source: :py:class:`~.UniformGrid`
+        :param coords: Coordinates of the target grid along each dimension.
+        :type coords: list of 1D NumPy arrays
+
+        :returns: None if ``source`` does not contain any point, otherwise the
+                  box of points contained in ``source`` (as tuple of slices),
+                  whether to interpolate, and the indices (for nearest
+                  neighbors) or the indices and the weights (for multilinear
+                  interpolation) along each dimension.
+        :rtype: tuple or None
+        """
+        lowest, highest = source.lowest_vertex, source.highest_vertex
+
+        box = []
+        for dim, coord in enumerate(coords):
+            # Same condition as in UniformGrid.__contains__, the coordinates
+            # are sorted so the points that satisfy it are contiguous
+            start = np.searchsorted(coord, lowest[dim], side="left")
+            end = np.searchsorted(coord, highest[dim], side="left")
+            if start >= end:
+                return None
+            box.append(slice(start, end))
+        box = tuple(box)
+
+        # Position of the points in units of grid points of source
+        positions = [
+            (coord[box_dim] - x0) / dx
+            for coord, box_dim, x0, dx in zip(
+                coords, box, source.x0, source.dx
+            )
+        ]
+
+        # Same logic as in UniformGridData.evaluate_with_spline: we use the
+        # nearest neighbors for flat grids too
+        if (
+            not self.resample
+            or source.num_dimensions != source.num_extended_dimensions
+        ):
+            # Same as UniformGrid.coordinates_to_indices
+            indices = [
+                (position + 0.5).astype(np.int32) for position in positions
+            ]
+            if any(
+                np.any(index < 0) or np.any(index >= num_points)
+                for index, num_points in zip(indices, source.shape)
+            ):
+                raise ValueError("Point outside the grid")
+            return box, False, np.ix_(*indices)
+
+        # Multilinear interpolation, one dimension at the time. The values in
+        # the half cell beyond the first and the last points are constant, as
+        # in UniformGridData.evaluate_with_spline.
+        lefts_weights = []
+        for dim, (position, num_points) in enumerate(
+            zip(positions, source.shape)
+        ):
+            left = np.clip(np.floor(position), 0, num_points - 2).astype(int)
+            weight = np.clip(position - left, 0, 1)
+            # Weights have to be broadcast along dimension dim
+            weight_shape = [1] * len(positions)
+            weight_shape[dim] = len(weight)
+            lefts_weights.append((left, weight.reshape(weight_shape)))
+        return box, True, lefts_weights
+
+    def __call__(self, data, dtype=None):
+        """Resample the data onto the target grid.
+
+        :param data: Data on each of the source grids (in the same order as
+                     they were given to the constructor).
+        :type data: list of NumPy arrays
+        :param dtype: Type of the output. If None, it is inferred from the
+                      data.
+        :type dtype: NumPy dtype
+
+        :returns: Data on the target grid.
+        :rtype: NumPy array
+        """
+        if len(data) != len(self._plans):
+            raise ValueError(
+                f"Expected data for {len(self._plans)} grids, got {len(data)}"
+            )
+
+        if dtype is None:
+            dtype = np.result_type(*data)
+            if self.resample:
+                dtype = np.result_type(dtype, float)
+
+        ret = np.zeros(self.grid.shape, dtype=dtype)
+
+        for plan, values in zip(self._plans, data):
+            if plan is None:
+                continue
+            box, interpolate_values, indices = plan
+            if not interpolate_values:
+                ret[box] = values[indices]
+                continue
+            for dim, (left, weight) in enumerate(indices):
+                values = (1 - weight) * np.take(values, left, axis=dim) + (
+                    weight * np.take(values, left + 1, axis=dim)
+                )
+            ret[box] = values
+
+        return ret
+
+    @staticmethod
+    def _structure(grid):
+        """Return the parameters of ``grid`` that matter for resampling.
+
+        Different grids with the same structure (e.g., at different times)
+        can share the same :py:class:`~.GridResampler`.
+
+        :param grid: Grid.
+        :type grid: :py:class:`~.UniformGrid`
+
+        :returns: Shape, origin, and spacing of the grid.
+        :rtype: tuple of tuples
+        """
+        return (tuple(grid.shape), tuple(grid.x0), tuple(grid.dx))
+
+    @classmethod
+    def cached(cls, source_grids, grid, resample=False, ext=2):
+        """Return a :py:class:`~.GridResampler`, reusing the one created in a
+        previous call with grids with the same structure (shape, origin, and
+        spacing), if available.
+
+        The last ``max_cached`` resamplers are kept.
+
+        :param source_grids: Grids where the data is defined, in the order
+                             in which they have to be painted.
+        :type source_grids: list of :py:class:`~.UniformGrid`
+        :param grid: Target grid.
+        :type grid: :py:class:`~.UniformGrid`
+        :param resample: If True, resample the data with multilinear
+                         interpolation, otherwise, use nearest neighbors.
+        :type resample: bool
+        :param ext: How to deal with points outside all the source grids:
+                    they are set to 0 if ``ext=1``, or an error is raised if
+                    ``ext=2``.
+        :type ext: int
+
+        :returns: Resampler from ``source_grids`` to ``grid``.
+        :rtype: :py:class:`~.GridResampler`
+        """
+        key = (
+            tuple(cls._structure(source) for source in source_grids),
+            cls._structure(grid),
+            bool(resample),
+            ext,
+        )
+
+        with cls._cache_lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                return cls._cache[key]
+
+        # We do not hold the lock while computing, so that other resamplers
+        # can be used in the meantime
+        resampler = cls(source_grids, grid, resample=resample, ext=ext)
+
+        with cls._cache_lock:
+            cls._cache[key] = resampler
+            while len(cls._cache) > cls.max_cached:
+                cls._cache.popitem(last=False)
+
+        return resampler
+
+    @classmethod
+    def clear_cache(cls):
+        """Remove all the resamplers saved by :py:meth:`~.cached`."""
+        with cls._cache_lock:
+            cls._cache.clear()
+
+
 class HierarchicalGridData(BaseNumerical):
     """Represents data defined on mesh-refined grids, consisting of one or more
     regular datasets with different grid spacings.
@@ -2031,6 +2479,10 @@ class HierarchicalGridData(BaseNumerical):
 
     """
 
+    # Number of cells added around each component when interpolating with
+    # cubic splines (see _cubic_component)
+    _cubic_halo = 3
+
     def __init__(self, uniform_grid_data):
         """Constructor.
 
@@ -2071,6 +2523,13 @@ class HierarchicalGridData(BaseNumerical):
             for ref_level, comps in components.items()
         }
 
+        # Bounding boxes of the components, used to find which component
+        # contains a given point (see _component_boxes)
+        self._component_boxes_cache = None
+        # Components extended with the halo needed by the cubic splines (see
+        # _cubic_component)
+        self._cubic_components = None
+
     @staticmethod
     def _fill_grid_with_components(grid, components):
         """Given a grid, try to fill it with the components, returning a
@@ -2463,6 +2922,197 @@ class HierarchicalGridData(BaseNumerical):
 
         raise ValueError(f"{coordinate} outside the grid")
 
+    def _component_boxes(self):
+        """Return the bounding boxes of all the components, sorted from the
+        finest refinement level to the coarsest.
+
+        The boxes are computed only once and they are computed again only if
+        the grids change.
+
+        :returns: Refinement level and component index of each box, lowest
+                  vertices, and highest vertices (with shape (number of
+                  components, number of dimensions)).
+        :rtype: tuple of list of tuples of ints, 2D NumPy array, and 2D NumPy
+                array
+        """
+        grids = [
+            (ref_level, comp, grid_data.grid)
+            for ref_level, comp, grid_data in self.iter_from_finest()
+        ]
+
+        # We compare the grids by identity: components that are modified
+        # in place get a new grid
+        if self._component_boxes_cache is not None:
+            cached_grids, *boxes = self._component_boxes_cache
+            if len(cached_grids) == len(grids) and all(
+                cached is grid[2] for cached, grid in zip(cached_grids, grids)
+            ):
+                return tuple(boxes)
+
+        level_comps = [(ref_level, comp) for ref_level, comp, _ in grids]
+        lowest = np.array([grid.lowest_vertex for _, _, grid in grids])
+        highest = np.array([grid.highest_vertex for _, _, grid in grids])
+
+        self._component_boxes_cache = (
+            [grid for _, _, grid in grids],
+            level_comps,
+            lowest,
+            highest,
+        )
+        return level_comps, lowest, highest
+
+    def _finest_level_component_at_points(self, points):
+        """Return the most refined level and component that contains each of
+        the ``points``, assuming valid input points.
+
+        This is the vectorized version of
+        :py:meth:`~._finest_level_component_at_point_core`: instead of testing
+        one point at the time against all the components, we test all the
+        points at the same time against one component, from the finest to the
+        coarsest. Points that are found are not tested again.
+
+        :param points: Points, with shape (number of points, number of
+                       dimensions).
+        :type points: 2D NumPy array
+
+        :returns: Refinement level and component index of each box, and index
+                  of the box that contains each point (as in the first return
+                  value).
+        :rtype: tuple of list of tuples of ints and 1D NumPy array of ints
+        """
+        level_comps, lowest, highest = self._component_boxes()
+
+        owners = np.full(len(points), -1, dtype=np.intp)
+        # Indices of the points that we still have to find
+        remaining = np.arange(len(points))
+
+        for box_index, (box_lowest, box_highest) in enumerate(
+            zip(lowest, highest)
+        ):
+            if len(remaining) == 0:
+                break
+            remaining_points = points[remaining]
+            # Same condition as in UniformGrid.__contains__
+            inside = np.all(
+                (box_lowest <= remaining_points)
+                & (remaining_points < box_highest),
+                axis=1,
+            )
+            owners[remaining[inside]] = box_index
+            remaining = remaining[~inside]
+
+        if len(remaining) > 0:
+            raise ValueError(f"{points[remaining[0]]} outside the grid")
+
+        return level_comps, owners
+
+    def _with_halo(self, grid_data):
+        """Return a copy of the component ``grid_data`` extended with
+        ``_cubic_halo`` cells in each direction.
+
+        The cells in the halo take the values of the hierarchy (evaluated with
+        multilinear interpolation), or the value at the boundary of the
+        component if they are outside the hierarchy. This plays the role of
+        the ghost zones, which are removed when the components are merged.
+
+        :param grid_data: Component to extend.
+        :type grid_data: :py:class:`~.UniformGridData`
+
+        :returns: Extended component.
+        :rtype: :py:class:`~.UniformGridData`
+        """
+        grid = grid_data.grid
+
+        # With flat dimensions we use the nearest neighbors, so we do not need
+        # the halo
+        if grid.num_extended_dimensions != grid.num_dimensions:
+            return grid_data
+
+        halo = self._cubic_halo
+
+        extended_grid = UniformGrid(
+            grid.shape + 2 * halo,
+            x0=grid.x0 - halo * grid.dx,
+            dx=grid.dx,
+            ref_level=grid.ref_level,
+            component=grid.component,
+            time=grid.time,
+            iteration=grid.iteration,
+        )
+
+        data = np.pad(grid_data.data, halo, mode="edge")
+        is_halo = np.ones(data.shape, dtype=bool)
+        is_halo[tuple(slice(halo, halo + size) for size in grid.shape)] = False
+
+        halo_points = (
+            extended_grid.x0 + np.argwhere(is_halo) * extended_grid.dx
+        )
+
+        # Same condition as in _finest_level_component_at_points
+        _, lowest, highest = self._component_boxes()
+        inside = np.zeros(len(halo_points), dtype=bool)
+        for box_lowest, box_highest in zip(lowest, highest):
+            inside |= np.all(
+                (box_lowest <= halo_points) & (halo_points < box_highest),
+                axis=1,
+            )
+
+        if np.any(inside):
+            halo_values = data[is_halo]
+            halo_values[inside] = self.evaluate_with_spline(
+                halo_points[inside]
+            )
+            data[is_halo] = halo_values
+
+        return type(grid_data)(extended_grid, data)
+
+    def _cubic_component(self, ref_level, component):
+        """Return the component extended with the halo needed to evaluate the
+        cubic splines near its boundaries (see :py:meth:`~._with_halo`).
+
+        The extended components are computed once and they are computed again
+        only if the data changes. The coefficients of the splines are cached
+        by the extended components.
+
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component index.
+        :type component: int
+
+        :returns: Extended component.
+        :rtype: :py:class:`~.UniformGridData`
+        """
+        components = [grid_data for _, _, grid_data in self.iter_from_finest()]
+
+        # We compare the components and their data by identity: methods that
+        # modify the object replace them
+        if self._cubic_components is not None:
+            cached_components, cached_data, _ = self._cubic_components
+            if not (
+                len(cached_components) == len(components)
+                and all(
+                    cached is comp and cached_datum is comp.data
+                    for cached, cached_datum, comp in zip(
+                        cached_components, cached_data, components
+                    )
+                )
+            ):
+                self._cubic_components = None
+
+        if self._cubic_components is None:
+            self._cubic_components = (
+                components,
+                [comp.data for comp in components],
+                {},
+            )
+
+        extended = self._cubic_components[2]
+        if (ref_level, component) not in extended:
+            extended[(ref_level, component)] = self._with_halo(
+                self[ref_level][component]
+            )
+        return extended[(ref_level, component)]
+
     def finest_level_component_at_point(self, coordinate):
         """Return the number and the component index of the most
         refined level that contains the given coordinate.
@@ -2486,12 +3136,18 @@ class HierarchicalGridData(BaseNumerical):
 
         return self._finest_level_component_at_point_core(coordinate)
 
-    def evaluate_with_spline(self, x, ext=2, piecewise_constant=False):
+    def evaluate_with_spline(self, x, ext=2, piecewise_constant=False, k=1):
         """Evaluate the spline on the points ``x``.
 
         Values outside the interval are set to 0 if ext=1, or a ``ValueError``
         is raised if ``ext=2``.
 
+        Each point is evaluated on the finest component that contains it.
+        With ``k=3``, the component is evaluated with a cubic B-spline. The
+        spline is computed on the component extended with a few cells from
+        the rest of the hierarchy, so that it is accurate up to the boundary
+        of the component.
+
         This method is meant to be used only if you want to use a different
         ``ext`` for a specific call, otherwise, just use __call__.
 
@@ -2503,10 +3159,18 @@ class HierarchicalGridData(BaseNumerical):
                     or an error is raised if ``ext=2``.
         :type ext:  int
 
+        :param piecewise_constant: Use the nearest neighbors.
+        :type piecewise_constant: bool
+
+        :param k: Order of the interpolation (1 for multilinear, 3 for cubic).
+        :type k: int
+
         :returns: Values of the data evaluated on the input ``x``.
         :rtype:   1D NumPy array or float
 
         """
+        if k not in (1, 3):
+            raise ValueError("Only k=1 or k=3 are available")
 
         if isinstance(x, UniformGrid):
             # The way we want the coordinates is like as an array with the same
@@ -2521,30 +3185,35 @@ class HierarchicalGridData(BaseNumerical):
         original_shape = points_arr.shape
         points_arr = points_arr.reshape(-1, points_arr.shape[-1])
 
-        # NOTE: The following algorithm is not the fastest but it doesn't matter
-        #       too much because UniformGridData.evaluate_with_spline dominates
-        #       the execution time.
-
         # Next, we organize points depending on the component/refinement level
         # they belong.
         #
-        # level_comps is a dictionary with keys the refinement levels and
-        # components for which we have to compute points and for values a list
-        # with the index of the points in points_arr. We need the indices because
-        # we need to put back the values where they were, since we are going to
-        # take bit and pieces of the array.
-        level_comps = {}
-        for index, point in enumerate(points_arr):
-            ref_level, comp = self._finest_level_component_at_point_core(point)
-            level_comps.setdefault((ref_level, comp), []).append(index)
+        # owners contains, for each point, the index in level_comps of the
+        # component that contains the point. We need the indices of the points
+        # because we need to put back the values where they were, since we are
+        # going to take bit and pieces of the array.
+        level_comps, owners = self._finest_level_component_at_points(
+            points_arr
+        )
 
         # Now, we can evaluate the points using the methods of UniformGridData.
         # We collect all results in a new array that is initially full of zeros
         ret = np.zeros(len(points_arr), dtype=self.dtype)
-        for (ref_level, comp), points_indices in level_comps.items():
-            points = points_arr[level_comps[ref_level, comp]]
-            evaluated_points = self[ref_level][comp].evaluate_with_spline(
-                points, ext=ext, piecewise_constant=piecewise_constant
+        # We sort the points by component, so that the points of each
+        # component are contiguous in order
+        order = np.argsort(owners, kind="stable")
+        box_indices, starts = np.unique(owners[order], return_index=True)
+        for box_index, points_indices in zip(
+            box_indices, np.split(order, starts[1:])
+        ):
+            ref_level, comp = level_comps[box_index]
+            points = points_arr[points_indices]
+            if k == 3 and not piecewise_constant:
+                component = self._cubic_component(ref_level, comp)
+            else:
+                component = self[ref_level][comp]
+            evaluated_points = component.evaluate_with_spline(
+                points, ext=ext, piecewise_constant=piecewise_constant, k=k
             )
             ret[points_indices] = evaluated_points
 
@@ -2562,6 +3231,15 @@ class HierarchicalGridData(BaseNumerical):
         If ``resample`` is True, the data is resampled with multilinear
         interpolation.
 
+        The result is the same as evaluating the data on all the points of
+        the grid with :py:meth:`~.evaluate_with_spline`, but the components
+        are painted on the grid one at the time, from the coarsest to the
+        finest, so that each point takes the value of the finest component
+        that contains it. The indices and the weights needed to do this are
+        computed once for each grid structure and reused (see
+        :py:class:`~.GridResampler`), so resampling many iterations onto the
+        same grid is fast.
+
         :param grid: Grid onto which to resample the data.
         :type grid: :py:class:`~.UniformGrid`.
         :param resample: If True, resample the data with multilinear interpolation,
@@ -2569,9 +3247,23 @@ class HierarchicalGridData(BaseNumerical):
         :type resample: bool
 
         """
+        if grid.num_dimensions != self.num_dimensions:
+            raise ValueError("Incompatible dimensions between input and self")
+
+        # Within a refinement level, the component with the lowest index has
+        # the precedence (as in iter_from_finest), so we paint the components
+        # in the opposite order of iter_from_finest
+        components = [
+            comp for _, _, comp in reversed(list(self.iter_from_finest()))
+        ]
+
+        resampler = GridResampler.cached(
+            [comp.grid for comp in components], grid, resample=resample
+        )
+
         return UniformGridData(
             grid,
-            self.evaluate_with_spline(grid, piecewise_constant=(not resample)),
+            resampler([comp.data for comp in components], dtype=self.dtype),
         )
 
     def to_UniformGridData(
@@ -2659,6 +3351,7 @@ class HierarchicalGridData(BaseNumerical):
         """
         ret = f(*args, **kwargs)
         self.grid_data_dict = ret.grid_data_dict
+        self._cubic_components = None
 
     def _apply_binary(self, other, function):
         """Apply a binary function to the data of ``self`` and ``other``.
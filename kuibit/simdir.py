@@ -37,20 +37,19 @@ such attribute.
 
 """
 
+import concurrent.futures
 import os
 
-# TODO (FUTURE): cached_property is the decorator we are looking for.
-#
-# We ideally would like to use cached_property, but it is in Python 3.8,
-# and currently we only support 3.6.
-from functools import lru_cache
-
 from kuibit import (
     cactus_grid_functions,
     cactus_horizons,
     cactus_multipoles,
     cactus_scalars,
     cactus_waves,
+    column_cache,
+    data_cache,
+    file_index,
+    file_pool,
 )
 
 
@@ -65,6 +64,16 @@ class SimDir:
     :ivar dirs:           All directories in which data is searched.
     :ivar logfiles:       The locations of all log files (.out).
     :ivar errfiles:       The location of all error log files (.err).
+    :ivar index:          Persistent index of the content of the files, see
+                          :py:class:`~.FileIndex` (None if not used).
+    :ivar file_pool:      HDF5 files kept open to be read, see
+                          :py:class:`~.H5FilePool` (None if not used).
+    :ivar executor:       Executor used to read data in parallel (None if
+                          data is read serially).
+    :ivar data_cache:     Grid data (and scalar timeseries) kept in memory,
+                          see :py:class:`~.DataCache`.
+    :ivar column_cache:   Content of the scalar files in binary format, see
+                          :py:class:`~.ColumnCache` (None if not used).
     :ivar ts:             Scalar data of various type, see
                           :py:class:`~.ScalarsDir`
     :ivar gf:              Access to grid function data, see
@@ -102,20 +111,109 @@ class SimDir:
         self.errfiles = []
         self.allfiles = []
 
-        def listdir_process_symlinks(path):
-            """Return a list of files in path. If self.ignore_symlinks, exclude the
-            symlinks, otherwise keep them around.
+        def dir_content(path):
+            """Return the content of the directory path as a list of tuples
+            (name, is_symlink, is_file, is_dir).
 
             """
-            dir_content = [os.path.join(path, p) for p in os.listdir(path)]
-            if not self.ignore_symlinks:
-                return dir_content
-            return [p for p in dir_content if not os.path.islink(p)]
+
+            def read_dir_content():
+                # os.scandir returns the type of the entries together with
+                # their names, so (on most filesystems) we do not need
+                # additional system calls to know if the entries are files,
+                # directories, or symlinks. is_file and is_dir follow
+                # symlinks, like os.path.isfile and os.path.isdir.
+                with os.scandir(path) as entries:
+                    return [
+                        (
+                            entry.name,
+                            entry.is_symlink(),
+                            entry.is_file(),
+                            entry.is_dir(),
+                        )
+                        for entry in entries
+                    ]
+
+            # With the index, we list the directory only if it changed
+            return file_index.cached(
+                self.index, path, "dir_content", read_dir_content
+            )
+
+        def process_symlinks(path, content, select=None):
+            """Return a list of files in path with the given content. If
+            self.ignore_symlinks, exclude the symlinks, otherwise keep them
+            around.
+
+            If select is "files" or "dirs", return only the files or the
+            directories.
+
+            """
+            return [
+                os.path.join(path, name)
+                for name, is_link, is_file, is_dir in content
+                if not (self.ignore_symlinks and is_link)
+                and (select != "files" or is_file)
+                and (select != "dirs" or is_dir)
+            ]
 
         def filter_ext(files, ext):
             """Return a list from the input list of file that
             has file extension ext."""
-            return [f for f in files if os.path.splitext(f)[1] == ext]
+            # endswith is much faster than splitext, so we use it to discard
+            # most of the files (this matters with hundreds of thousands of
+            # files). splitext is still needed for files like ".out".
+            return [
+                f
+                for f in files
+                if f.endswith(ext) and os.path.splitext(f)[1] == ext
+            ]
+
+        def directories_to_scan(path):
+            """Return the subdirectories of path that have to be scanned (all
+            the ones that do not have name in self.ignore).
+
+            """
+            return [
+                p
+                for p in process_symlinks(path, contents[path], select="dirs")
+                if (os.path.basename(p) not in self.ignore)
+            ]
+
+        # Listing the directories is the expensive part (especially on
+        # parallel filesystems), and each directory can be listed
+        # independently. So, first we list all the directories up to
+        # max_depth one level at the time (possibly in parallel with
+        # num_threads, so that the various output-NNNN folders are read
+        # concurrently), then we walk the tree recursively using the saved
+        # contents. This ensures that the order of the files is the same
+        # as if we were walking the tree serially.
+        contents = {}
+
+        executor = (
+            concurrent.futures.ThreadPoolExecutor(self.num_threads)
+            if self.num_threads > 1
+            else None
+        )
+        map_function = map if executor is None else executor.map
+
+        try:
+            level, paths_in_level = 0, [self.path]
+            while paths_in_level and level < max_depth:
+                contents.update(
+                    zip(
+                        paths_in_level,
+                        map_function(dir_content, paths_in_level),
+                    )
+                )
+                paths_in_level = [
+                    p
+                    for path in paths_in_level
+                    for p in directories_to_scan(path)
+                ]
+                level += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         def walk_rec(path, level=0):
             """Walk_rec is a recursive function that steps down all the
@@ -129,24 +227,12 @@ class SimDir:
 
             self.dirs.append(path)
 
-            all_files_in_path = listdir_process_symlinks(path)
-
-            files_in_path = list(filter(os.path.isfile, all_files_in_path))
-            self.allfiles += files_in_path
-
-            directories_in_path = list(
-                filter(os.path.isdir, all_files_in_path)
+            self.allfiles += process_symlinks(
+                path, contents[path], select="files"
             )
 
-            # We ignore the ones in self.ignore
-            directories_to_scan = [
-                p
-                for p in directories_in_path
-                if (os.path.basename(p) not in self.ignore)
-            ]
-
             # Apply walk_rec to all the subdirectory, but with level increased
-            for p in directories_to_scan:
+            for p in directories_to_scan(path):
                 walk_rec(p, level + 1)
 
         walk_rec(self.path)
@@ -165,12 +251,26 @@ class SimDir:
         # Simfactory has a folder SIMFACTORY with a subdirectory for par files
         # Even if SIMFACTORY is excluded, we should include that par file
         if os.path.isdir(simfac):
-            mainpar = filter_ext(listdir_process_symlinks(simfac), ".par")
+            mainpar = filter_ext(
+                process_symlinks(simfac, dir_content(simfac)), ".par"
+            )
             self.parfiles = mainpar + self.parfiles
 
         self.has_parfile = bool(self.parfiles)
 
-    def __init__(self, path, max_depth=8, ignore=None, ignore_symlinks=True):
+    def __init__(
+        self,
+        path,
+        max_depth=8,
+        ignore=None,
+        ignore_symlinks=True,
+        index_file=None,
+        num_threads=1,
+        max_open_files=None,
+        executor=None,
+        max_cache_bytes=2 * 1024 ** 3,
+        column_cache_dir=None,
+    ):
         """Constructor.
 
         :param path:      Path to output of the simulation.
@@ -181,6 +281,47 @@ class SimDir:
         :type ignore:  set
         :param ignore_symlink: If True, do not consider symlinks.
         :type ignore_symlink: bool
+        :param index_file: Path of the file where to save the information
+                           extracted from the simulation files (content of
+                           the directories, headers, HDF5 groups, ...), so
+                           that the next time the simulation is opened, files
+                           that have not changed are not inspected again. If
+                           None, no index is used.
+        :type index_file: str or None
+        :param num_threads: Number of threads used to list the directories
+                            of the simulation. Using more threads is useful
+                            on filesystems with high latency (e.g., parallel
+                            or network filesystems), where most of the time
+                            is spent waiting for the filesystem.
+        :type num_threads: int
+        :param max_open_files: Maximum number of HDF5 files to keep open at
+                               the same time. Keeping files open makes reading
+                               data faster, but each open file uses some
+                               memory (and operating systems limit the number
+                               of files that can be open). Files stay open
+                               until :py:meth:`~.close` (or
+                               :py:meth:`~.refresh`) is called, or until more
+                               than ``max_open_files`` files are open. If
+                               None, no file is kept open: each file is
+                               opened and closed every time it is read.
+        :type max_open_files: int or None
+        :param executor: Executor used to read data in parallel (e.g., a
+                         :py:class:`concurrent.futures.ThreadPoolExecutor`).
+                         If None, data is read serially. The executor is not
+                         shut down by :py:class:`~.SimDir`.
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :param max_cache_bytes: Maximum size (in bytes) of the grid data (and
+                                of the scalar timeseries) kept in memory
+                                after it is read. When the limit is reached,
+                                the data used least recently is removed (and
+                                it is read again from the files if needed).
+        :type max_cache_bytes: int
+        :param column_cache_dir: Path of the directory where to save the
+                                 content of the scalar ASCII files in binary
+                                 format, so that the next time they are read
+                                 they do not have to be parsed again. If None,
+                                 the files are always parsed.
+        :type column_cache_dir: str or None
 
         Parfiles (``*.par``) will be searched in all data directories and the
         top-level SIMFACTORY/par folder, if it exists. The parfile in the
@@ -188,83 +329,193 @@ class SimDir:
         the data directories, will be used to extract the simulation
         parameters. Logfiles (``*.out``) and errorfiles (``*.err``) will be
         searched for in all data directories.
+
+        The index file can be placed in the simulation directory, or in
+        any other location (e.g., if the simulation directory is not
+        writable). Entries in the index are invalidated when the modification
+        time or the size of the corresponding file change.
+
+        By default, HDF5 files are opened and closed every time they are
+        read. With ``max_open_files``, up to that many HDF5 files are kept
+        open after they are read, and they stay open until
+        :py:meth:`~.close` or :py:meth:`~.refresh` are called (or until the
+        end of the ``with`` block, if the :py:class:`~.SimDir` is used as a
+        context manager).
+
+        Like the index file, the column cache directory can be anywhere.
+        Tables in the cache are invalidated when the modification time or the
+        size of the corresponding file change. To fill the cache ahead of time,
+        use :py:meth:`~.ScalarsDir.build_cache` (``sim.ts.build_cache()``).
         """
         if ignore is None:
             ignore = {"SIMFACTORY", "report", "movies", "tmp", "temp"}
 
         self.ignore = ignore
         self.ignore_symlinks = ignore_symlinks
+        self.num_threads = int(num_threads)
+        self.index = (
+            file_index.FileIndex(index_file)
+            if index_file is not None
+            else None
+        )
+        self.file_pool = (
+            file_pool.H5FilePool(max_open_files)
+            if max_open_files is not None
+            else None
+        )
+        self.executor = executor
+        # Interfaces to the data (ScalarsDir, MultipolesDir, ...), created the
+        # first time they are accessed, name -> object (see _reader)
+        self._readers = {}
+        self.data_cache = data_cache.DataCache(max_cache_bytes)
+        self.column_cache = (
+            column_cache.ColumnCache(column_cache_dir)
+            if column_cache_dir is not None
+            else None
+        )
+        self.max_depth = int(max_depth)
         self._sanitize_path(str(path))
-        self._scan_folders(int(max_depth))
+        self._scan_folders(self.max_depth)
+
+    def refresh(self):
+        """Update the :py:class:`~.SimDir` with the output produced since it
+        was created (or since the last refresh).
+
+        This is useful to monitor simulations that are still running. The
+        folders are scanned again, so that new files (e.g., new restarts) are
+        found. For the scalar data that was already read, only the lines
+        added to the files are parsed. The other types of data (multipoles,
+        horizons, grid functions, ...) are inspected again when they are
+        accessed, which is cheap when :py:class:`~.SimDir` has an index file,
+        because files that have not changed are not inspected again.
+
+        Objects returned before the refresh (e.g., :py:class:`~.TimeSeries`)
+        are not modified, you have to access the data again to get the new
+        output.
+        """
+        # Scalar data that was already read is updated, so we keep the
+        # ScalarsDir (if it was never accessed, this creates it)
+        scalars = self.ts
+
+        self._scan_folders(self.max_depth)
+
+        # HDF5 files that are open would not see the datasets that were
+        # added after they were opened
+        if self.file_pool is not None:
+            self.file_pool.close()
+
+        scalars.refresh(self)
+
+        # The other interfaces are created again when they are accessed
+        self._readers = {"ts": scalars}
+
+    def close(self):
+        """Close all the files that are open (HDF5 files and index).
+
+        The :py:class:`~.SimDir` should not be used after it is closed.
+        """
+        if self.file_pool is not None:
+            self.file_pool.close()
+        if self.index is not None:
+            self.index.close()
+
+    def clear_cache(self):
+        """Remove from memory all the grid data (and the scalar timeseries)
+        that was read.
+
+        The data will be read again from the files if needed.
+        """
+        self.data_cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _reader(self, name, reader_class):
+        """Return the interface ``name`` to the data, creating it with
+        ``reader_class(self)`` the first time it is requested.
+
+        :param name: Name of the interface.
+        :type name: str
+        :param reader_class: Class of the interface.
+        :type reader_class: type
+
+        :returns: Interface to the data.
+        :rtype: ``reader_class``
+        """
+        if name not in self._readers:
+            self._readers[name] = reader_class(self)
+        return self._readers[name]
 
     @property
-    # We only need to keep it 1 in memory: it is the only possible!
-    @lru_cache(1)
     def ts(self):
         """Return all the available timeseries in the data.
 
         :returns: Interface to all the timeseries in the directory.
         :rtype: :py:class:`~.ScalarsDir`
         """
-        return cactus_scalars.ScalarsDir(self)
+        return self._reader("ts", cactus_scalars.ScalarsDir)
 
     timeseries = ts
 
     @property
-    @lru_cache(1)
     def multipoles(self):
         """Return all the available multipole data.
 
         :returns: Interface to all the multipole data in the directory.
         :rtype: :py:class:`~.MultipolesDir`
         """
-        return cactus_multipoles.MultipolesDir(self)
+        return self._reader("multipoles", cactus_multipoles.MultipolesDir)
 
     @property
-    @lru_cache(1)
     def gravitationalwaves(self):
         """Return all the available ``Psi4`` data.
 
         :returns: Interface to all the ``Psi4`` data in the directory.
         :rtype: :py:class:`~.GravitationalWavesDir`
         """
-        return cactus_waves.GravitationalWavesDir(self)
+        return self._reader(
+            "gravitationalwaves", cactus_waves.GravitationalWavesDir
+        )
 
     gws = gravitationalwaves
 
     @property
-    @lru_cache(1)
     def electromagneticwaves(self):
         """Return all the available ``Phi2`` data.
 
         :returns: Interface to all the ``Phi2`` data in the directory.
         :rtype: :py:class:`~.ElectromagneticWavesDir`
         """
-        return cactus_waves.ElectromagneticWavesDir(self)
+        return self._reader(
+            "electromagneticwaves", cactus_waves.ElectromagneticWavesDir
+        )
 
     emws = electromagneticwaves
 
     @property
-    @lru_cache(1)
     def gridfunctions(self):
         """Return all the available grid data.
 
         :returns: Interface to all the grid data in the directory.
         :rtype: :py:class:`~.GridFunctionsDir`
         """
-        return cactus_grid_functions.GridFunctionsDir(self)
+        return self._reader(
+            "gridfunctions", cactus_grid_functions.GridFunctionsDir
+        )
 
     gf = gridfunctions
 
     @property
-    @lru_cache(1)
     def horizons(self):
         """Return all the available horizon data.
 
         :returns: Interface to all the horizon data in the directory.
         :rtype: :py:class:`~.HorizonsDir`
         """
-        return cactus_horizons.HorizonsDir(self)
+        return self._reader("horizons", cactus_horizons.HorizonsDir)
 
     def __str__(self):
         header = f"Indexed {len(self.allfiles)} files"
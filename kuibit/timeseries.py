@@ -105,13 +105,31 @@ def remove_duplicated_iters(t, y):
     t = np.array(t)
     y = np.array(y)
 
-    t2 = np.minimum.accumulate(t[::-1])[::-1]
-    # Here we append [True] because the last point is always included
-    msk = np.hstack((t[:-1] < t2[1:], [True]))
+    msk = _mask_duplicated_iters(t)
 
     return TimeSeries(t[msk], y[msk])
 
 
+def _mask_duplicated_iters(t):
+    """Return the boolean mask that selects the points that are kept by
+    :py:func:`~.remove_duplicated_iters`.
+
+    The mask depends only on the times, so it can be computed once and applied
+    to multiple variables that share the same times.
+
+    :param t:  Times.
+    :type t:   1D NumPy array
+
+    :returns:  Mask with True for the points to keep.
+    :rtype:    1D NumPy array of bool
+
+    """
+    t = np.asarray(t)
+    t2 = np.minimum.accumulate(t[::-1])[::-1]
+    # Here we append [True] because the last point is always included
+    return np.hstack((t[:-1] < t2[1:], [True]))
+
+
 def unfold_phase(phase):
     """Remove phase jumps to get a continuous (unfolded) phase.
 
@@ -163,20 +181,22 @@ def combine_ts(series, prefer_late=True):
 
     """
 
-    # Late and early can be implemented in one shot by implementing one and
-    # sending t -> -t for the other. For the "straight" way we implement
-    # combine_ts_early.
+    # Let's consider first the case prefer_late=False. We sort the series
+    # by tmin (and tmax), then we walk through them: from each series we only
+    # take the times that are after the last time that we have already taken.
+    # The last time that we have taken is the maximum tmax of the series that
+    # we have already seen (because each series contributes at least its tmax,
+    # unless it is completely covered by the previous ones).
+    #
+    # For prefer_late=True, we do the same but walking backwards in time:
+    # we sort the series by -tmin (and -tmax) and from each series we only
+    # take the times that are before the first time that we have already
+    # taken, which is the minimum tmin of the previous series.
     #
-    # Let's consider a simple example for the reversed case
-    # t1 = [1, 2, 3], t2 = [2, 3, 4], we want to have t = [1, 2, 3, 4]
-    # sign = -1
-    # timeseries = [t2, t1]
-    # times = t2[::-1] = [4, 3, 2]
-    # Next we walk through the remaining elements of the list
-    # We want only to keep those with t < times[-1] = 2 (hence the switch)
-    # In this case msk = [3, 2, 1] < 2 = [False, False, True], so
-    # s_t[msk] = [1] and times = [4, 3, 2, 1].
-    # At the end, we need to reverse the order again
+    # Since the times of each series are sorted, the times to take are a
+    # slice of the series, and we find where to cut with searchsorted. At the
+    # end, we concatenate all the slices at once (growing the arrays series by
+    # series would be quadratic in the number of series).
 
     # sign is responsible of inverting the sorting key
     sign = -1 if prefer_late else 1
@@ -185,19 +205,28 @@ def combine_ts(series, prefer_late=True):
     # they are the same then the second items are compared, and so on.
     # So here we sort by tmin and tmax
     timeseries = sorted(series, key=lambda x: (sign * x.tmin, sign * x.tmax))
-    # Now we are going to build up the t and y array, starting with the first
-    times = timeseries[0].t[::sign]
-    values = timeseries[0].y[::sign]
-    for s in timeseries[1:]:
-        # We need to walk backwards for "prefer_late"
-        s_t = s.t[::sign]
-        s_y = s.y[::sign]
-        # We only keep those times that we don't have yet in the array times
-        msk = s_t < times[-1] if prefer_late else s_t > times[-1]
-        times = np.append(times, s_t[msk])
-        values = np.append(values, s_y[msk])
-
-    return TimeSeries(times[::sign], values[::sign])
+
+    times, values = [], []
+    # boundary is the time up to which (or from which, with prefer_late) we
+    # already have data
+    boundary = np.inf if prefer_late else -np.inf
+    for s in timeseries:
+        if prefer_late:
+            cut = slice(None, np.searchsorted(s.t, boundary, side="left"))
+            boundary = min(boundary, s.tmin)
+        else:
+            cut = slice(np.searchsorted(s.t, boundary, side="right"), None)
+            boundary = max(boundary, s.tmax)
+        times.append(s.t[cut])
+        values.append(s.y[cut])
+
+    # With prefer_late, the series are ordered from the latest to the
+    # earliest
+    if prefer_late:
+        times.reverse()
+        values.reverse()
+
+    return TimeSeries(np.concatenate(times), np.concatenate(values))
 
 
 class TimeSeries(BaseSeries):
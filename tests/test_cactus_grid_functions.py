@@ -15,8 +15,11 @@
 # You should have received a copy of the GNU General Public License along with
 # this program; if not, see <https://www.gnu.org/licenses/>.
 
+import gzip
 import os
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unittest import mock
 
 import h5py
@@ -145,6 +148,44 @@ class TestAllGridFunctions(unittest.TestCase):
 
         # Here we are not testing that files are correctly organized...
 
+    def test_h5_catalogs(self):
+
+        path = next(iter(self.gf["P"].allfiles))
+        catalog = cg.H5FileCatalog(path)
+
+        self.assertCountEqual(
+            catalog.variables.keys(), ["rho_b", "P", "vx", "vy", "vz"]
+        )
+        self.assertCountEqual(
+            catalog.variables["P"],
+            [
+                (0, 0, 0, 0),
+                (0, 0, 0, 1),
+                (0, 0, 1, 0),
+                (0, 0, 1, 1),
+                (1, 0, 1, 0),
+                (1, 0, 1, 1),
+                (2, 0, 0, 0),
+                (2, 0, 0, 1),
+                (2, 0, 1, 0),
+                (2, 0, 1, 1),
+            ],
+        )
+        self.assertEqual(catalog.thorn_names["P"], "ILLINOISGRMHD")
+        self.assertIs(catalog.maps["P"], None)
+        self.assertTrue(catalog.are_ghostzones_in_file)
+
+        # The files with one group per file are read only once when the
+        # AllGridFunctions is created, and never again for the single
+        # variables
+        with mock.patch("h5py.File", side_effect=h5py.File) as mocked:
+            self.assertEqual(self.gf["P"].available_iterations, [0, 1, 2])
+            self.assertEqual(self.gf["vx"].available_iterations, [0, 1, 2])
+            opened = [call.args[0] for call in mocked.call_args_list]
+            self.assertLessEqual(opened.count(path), 1)
+
+        self.assertIs(self.gf._h5_catalogs[path], self.gf["P"]._catalog(path))
+
     def test_keys(self):
 
         self.assertCountEqual(
@@ -459,6 +500,103 @@ class TestOneGridFunction(unittest.TestCase):
 
         # Here we test the details of the ASCII reader
 
+    def test_executor(self):
+
+        gf = sd.SimDir("tests/grid_functions").gf
+        gf.xy.num_ghost = (3, 3)
+        expected_P = gf.xy["P"][2]
+        expected_rho_star = gf.xy["rho_star"][0]
+
+        # We also test compressed files
+        x_file = "tests/grid_functions/rho_star.x.asc"
+        expected_rho_star_x = cg.OneGridFunctionASCII(
+            [x_file], "rho_star", num_ghost=(3,)
+        )[0]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gz_file = os.path.join(tmpdir, "rho_star.x.asc.gz")
+            with open(x_file, "rb") as fil, gzip.open(gz_file, "wb") as gzf:
+                gzf.write(fil.read())
+
+            for executor_class in (ThreadPoolExecutor, ProcessPoolExecutor):
+                with executor_class(2) as executor:
+                    # With the index, the objects sent to the other processes
+                    # must not carry it
+                    with sd.SimDir(
+                        "tests/grid_functions",
+                        executor=executor,
+                        index_file=os.path.join(tmpdir, "index.sqlite"),
+                    ) as sim:
+                        sim.gf.xy.num_ghost = (3, 3)
+                        P = sim.gf.xy["P"]
+                        self.assertIs(P.executor, executor)
+                        self.assertEqual(P[2], expected_P)
+                        # The data read by the executor is saved
+                        P[2]
+                        self.assertEqual(sim.data_cache.cache_info().hits, 1)
+                        self.assertEqual(
+                            sim.gf.xy["rho_star"][0], expected_rho_star
+                        )
+
+                    rho_star_x = cg.OneGridFunctionASCII(
+                        [gz_file],
+                        "rho_star",
+                        num_ghost=(3,),
+                        executor=executor,
+                    )
+                    self.assertEqual(rho_star_x[0], expected_rho_star_x)
+
+    def test_iter_iterations(self):
+
+        gf = sd.SimDir("tests/grid_functions").gf
+        gf.xy.num_ghost = (3, 3)
+        P = gf.xy["P"]
+        rho_star = gf.xy["rho_star"]
+
+        with self.assertRaises(ValueError):
+            P.iter_iterations(prefetch=-1)
+
+        with self.assertRaises(KeyError):
+            P.iter_iterations(iterations=[0, 9])
+
+        for var in (P, rho_star):
+            for prefetch in (0, 1, 2):
+                iterator = var.iter_iterations(prefetch=prefetch)
+                self.assertEqual(
+                    list(iterator),
+                    [
+                        var._read_iteration_from_files(it)
+                        for it in var.available_iterations
+                    ],
+                )
+                self.assertGreaterEqual(iterator.overlap_efficiency, 0)
+                self.assertLessEqual(iterator.overlap_efficiency, 1)
+                self.assertGreater(iterator.read_time, 0)
+                # The data is not saved in the cache
+                self.assertEqual(len(var._data_cache), 0)
+
+        self.assertEqual(
+            list(P.iter_iterations(iterations=[2, 0])), [P[2], P[0]]
+        )
+        # Now the data is in the cache, so it is not read again
+        iterator = P.iter_iterations(iterations=[2, 0])
+        self.assertEqual(list(iterator), [P[2], P[0]])
+        self.assertEqual(iterator.read_time, 0)
+
+        with ThreadPoolExecutor(2) as executor:
+            with P.iter_iterations(
+                iterations=[2, 1, 0], executor=executor
+            ) as iterator:
+                self.assertEqual(next(iterator), P[2])
+            # We stopped before the end
+            self.assertEqual(len(iterator._pending), 0)
+
+            # The executor to read the files cannot be used to read the
+            # iterations
+            P.executor = executor
+            with self.assertRaises(ValueError):
+                P.iter_iterations(executor=executor)
+
     def test_init(self):
 
         self.assertCountEqual(
@@ -507,3 +645,36 @@ class TestOneGridFunction(unittest.TestCase):
         # Test file with wrong name
         with self.assertRaises(RuntimeError):
             self.rho_star._parse_file("/tmp/wrongname")
+
+    def test_parse_file_chunks(self):
+
+        # Data is read only when requested
+        self.assertIs(self.rho_star.alldata[self.rho_star_file][2][0][1], None)
+
+        # Read the file again, but in chunks much smaller than the file
+        with mock.patch.object(cg.OneGridFunctionASCII, "_chunk_size", 1000):
+            rho_star_chunks = cg.OneGridFunctionASCII(
+                [self.rho_star_file], "rho_star", num_ghost=[3, 3]
+            )
+
+        for iteration in self.rho_star.available_iterations:
+            self.assertEqual(
+                rho_star_chunks[iteration], self.rho_star[iteration]
+            )
+
+        # Compressed file
+        rho_star_xyz = sd.SimDir("tests/grid_functions").gf.xyz["rho_star"]
+        with mock.patch.object(cg.OneGridFunctionASCII, "_chunk_size", 100000):
+            rho_star_xyz_chunks = cg.OneGridFunctionASCII(
+                rho_star_xyz.allfiles, "rho_star"
+            )
+        self.assertEqual(rho_star_xyz_chunks[2], rho_star_xyz[2])
+
+        # The time has to be the one of the iteration, also for the last
+        # component of each iteration
+        self.assertEqual(
+            self.rho_star._read_component_as_uniform_grid_data(
+                self.rho_star_file, 0, 1, 1
+            ).time,
+            0,
+        )
@@ -18,11 +18,14 @@
 
 import os
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
 
 import numpy as np
 
 from kuibit import cactus_horizons as ch
 from kuibit import simdir as sd
+from kuibit import timeseries as ts
 
 
 class TestHorizonsDir(unittest.TestCase):
@@ -142,6 +145,57 @@ class TestHorizonsDir(unittest.TestCase):
         self.assertCountEqual(self.ahs._shape_files, {1: {}, 2: {}})
         self.assertCountEqual(self.qlm_shape._shape_files, dict_shape)
 
+    def test_lazy_ah_vars(self):
+
+        path = "tests/horizons/diagnostics/BH_diagnostics.ah1.gp"
+        t, iteration, area = np.loadtxt(
+            path, unpack=True, ndmin=2, usecols=(1, 0, 25)
+        )
+
+        with mock.patch(
+            "kuibit.cactus_horizons.load_table",
+            side_effect=ch.load_table,
+        ) as mocked_load_table:
+            ahs = ch.HorizonsDir(self.sim_ah)
+            ah_vars = ahs._ah_vars[1]
+            self.assertIsInstance(ah_vars, ch.AHVars)
+            # Nothing is read until it is needed
+            mocked_load_table.assert_not_called()
+            self.assertEqual(ah_vars["area"], ts.TimeSeries(t, area))
+            self.assertIs(ah_vars["area"], ah_vars["area"])
+            self.assertEqual(
+                ah_vars["cctk_iteration"], ts.TimeSeries(t, iteration)
+            )
+            # Each file is read only once
+            self.assertEqual(mocked_load_table.call_count, 1)
+
+        with ThreadPoolExecutor(2) as executor:
+            ah_vars_parallel = ch.AHVars(
+                [path], ah_vars._columns, 1, executor=executor
+            )
+            self.assertEqual(ah_vars_parallel["area"], ah_vars["area"])
+
+        # Getting an horizon does not read the AH files
+        with mock.patch(
+            "kuibit.cactus_horizons.load_table",
+            side_effect=ch.load_table,
+        ) as mocked_load_table:
+            hor = sd.SimDir(self.files_dir).horizons[0, 1]
+            mocked_load_table.assert_not_called()
+            self.assertEqual(hor.formation_time, 0)
+            self.assertEqual(hor.shape_time_max, 6.4)
+            mocked_load_table.assert_called()
+
+        # The files can be read by a process pool
+        with ProcessPoolExecutor(2) as executor:
+            with sd.SimDir(self.files_dir, executor=executor) as sim:
+                hor_parallel = sim.horizons[0, 1]
+                self.assertEqual(hor_parallel.ah.area, ah_vars["area"])
+                hor_parallel.load_shapes()
+                self.assertCountEqual(
+                    hor_parallel._shapes.iterations, hor.shape_iterations
+                )
+
     def test_properties(self):
 
         self.assertCountEqual(self.hor.available_qlm_horizons, [0, 1, 2])
@@ -337,6 +391,82 @@ class TestOneHorizon(unittest.TestCase):
             np.allclose(expected_x, self.ho.shape_at_iteration(0)[0])
         )
 
+    def test_load_shapes(self):
+
+        with self.assertRaises(ValueError):
+            self.ah.load_shapes()
+
+        with self.assertRaises(ValueError):
+            self.ho.load_shapes([10465])
+
+        expected = {
+            it: ch.OneHorizon._load_patches(self.ho._shape_files[it])
+            for it in self.ho.shape_iterations
+        }
+
+        with ThreadPoolExecutor(2) as executor:
+            self.ho.load_shapes([0, 128], executor=executor)
+        self.assertCountEqual(self.ho._shapes.iterations, [0, 128])
+
+        # All the other ones (0 and 128 are not read again)
+        with mock.patch.object(
+            ch.OneHorizon,
+            "_load_patches",
+            side_effect=ch.OneHorizon._load_patches,
+        ) as mocked_load_patches:
+            self.ho.load_shapes()
+            self.assertEqual(
+                mocked_load_patches.call_count,
+                len(self.ho.shape_iterations) - 2,
+            )
+            # Now everything comes from memory
+            self.ho.shape_outline_at_time(6.4, [None, None, 0], 1e-2)
+            self.assertEqual(
+                mocked_load_patches.call_count,
+                len(self.ho.shape_iterations) - 2,
+            )
+
+        for it, (patches, origin) in expected.items():
+            with self.subTest(iteration=it):
+                stored_patches, stored_origin = self.ho._shapes.get(it)
+                np.testing.assert_array_equal(stored_origin, origin)
+                self.assertCountEqual(stored_patches, patches)
+                for name in patches:
+                    np.testing.assert_array_equal(
+                        stored_patches[name], patches[name]
+                    )
+
+        # All the shapes have the same structure, so they are in one array
+        self.assertEqual(len(self.ho._shapes._blocks), 1)
+        (block,) = self.ho._shapes._blocks.values()
+        self.assertEqual(
+            block["coordinates"].shape,
+            (len(self.ho.shape_iterations), 6, 3, 19, 19),
+        )
+
+    def test_ShapeStore(self):
+
+        store = ch.ShapeStore()
+        patches = {"+z": np.zeros((3, 2, 2)), "-z": np.ones((3, 2, 2))}
+        store.add([0], [(patches, np.zeros(3))])
+        self.assertIn(0, store)
+
+        # Different structure
+        patches2 = {"+z": np.zeros((3, 3, 2)), "-z": np.ones((3, 2, 2))}
+        store.add([2, 0], [(patches2, np.ones(3)), (patches2, np.ones(3))])
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.iterations, [0, 2])
+
+        patches_0, origin_0 = store.get(0)
+        np.testing.assert_array_equal(origin_0, np.zeros(3))
+        np.testing.assert_array_equal(patches_0["-z"], patches["-z"])
+        patches_2, origin_2 = store.get(2)
+        np.testing.assert_array_equal(origin_2, np.ones(3))
+        np.testing.assert_array_equal(patches_2["+z"], patches2["+z"])
+
+        with self.assertRaises(KeyError):
+            store.get(1)
+
     def test_shape_time_at_iteration(self):
 
         # Test iteration not available
@@ -15,7 +15,11 @@
 # You should have received a copy of the GNU General Public License along with
 # this program; if not, see <https://www.gnu.org/licenses/>.
 
+import os
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 import h5py
 import numpy as np
@@ -211,6 +215,98 @@ class TestCactusMultipoles(unittest.TestCase):
         self.assertFalse(alldets.has_detector(2, 3, 100))
         self.assertTrue(alldets.has_detector(2, 2, 100))
 
+    def test_MultipoleStack(self):
+
+        ts3 = ts.TimeSeries(self.t1, self.y2)
+        ts4 = ts.TimeSeries(self.t1, 2 * self.y1)
+        data = [
+            (2, 2, 100, self.ts1),
+            (3, 3, 100, ts3),
+            (2, 2, 150, ts4),
+        ]
+        alldets = mp.MultipoleAllDets(data)
+
+        stack = alldets.to_MultipoleStack()
+
+        np.testing.assert_array_equal(stack.t, self.t1)
+        self.assertEqual(stack.modes, [(2, 2), (3, 3)])
+        np.testing.assert_array_equal(stack.l, [2, 3])
+        np.testing.assert_array_equal(stack.m, [2, 3])
+        np.testing.assert_array_equal(stack.radii, [100, 150])
+        self.assertEqual(stack.data.shape, (100, 2, 2))
+
+        # test __call__
+        self.assertEqual(stack(2, 2, 100), self.ts1)
+        self.assertEqual(stack(3, 3, 100), ts3)
+        self.assertEqual(stack(2, 2, 150), ts4)
+
+        # Missing multipoles are NaN
+        self.assertTrue(np.isnan(stack(3, 3, 150).y).all())
+
+        with self.assertRaises(KeyError):
+            stack(4, 4, 100)
+        with self.assertRaises(KeyError):
+            stack(2, 2, 200)
+
+        # test __eq__
+        self.assertEqual(stack, alldets.to_MultipoleStack())
+        self.assertNotEqual(stack, 1)
+
+        # test select and the modes and radii arguments
+        selected = stack.select(modes=[(2, 2)], radii=[150])
+        self.assertEqual(selected.data.shape, (100, 1, 1))
+        self.assertEqual(selected(2, 2, 150), ts4)
+        self.assertEqual(
+            selected, alldets.to_MultipoleStack(modes=[(2, 2)], radii=[150])
+        )
+
+        # test sum_over_modes, this has to be the same as
+        # total_function_on_available_lm
+        np.testing.assert_allclose(
+            stack.sum_over_modes()[:, 0],
+            alldets[100].total_function_on_available_lm(lambda x, *args: x).y,
+        )
+        np.testing.assert_allclose(
+            stack.sum_over_modes(l_max=2)[:, 0], self.y1
+        )
+
+        # (3, 3) is missing at r = 150, so it is skipped
+        np.testing.assert_allclose(
+            stack.sum_over_modes()[:, 1],
+            alldets[150].total_function_on_available_lm(lambda x, *args: x).y,
+        )
+        np.testing.assert_allclose(stack.sum_over_modes()[:, 1], 2 * self.y1)
+
+        # test sum_over_radii
+        np.testing.assert_allclose(stack.sum_over_radii()[:, 0], 3 * self.y1)
+        np.testing.assert_allclose(stack.sum_over_radii()[:, 1], self.y2)
+
+        # test to_MultipoleAllDets, missing multipoles are dropped
+        self.assertEqual(stack.to_MultipoleAllDets(), alldets)
+        self.assertEqual(
+            stack.to_MultipoleAllDets(l_min=3).available_lm, {(3, 3)}
+        )
+
+        # test MultipoleOneDet.to_MultipoleStack
+        self.assertEqual(
+            alldets[100].to_MultipoleStack(), stack.select(radii=[100])
+        )
+
+        # Series with different times are restricted to the common ones
+        ts5 = ts.TimeSeries(self.t1[10:], self.y1[10:])
+        stack_common = mp.MultipoleOneDet(
+            100, [(2, 2, self.ts1), (2, 1, ts5)]
+        ).to_MultipoleStack()
+        np.testing.assert_array_equal(stack_common.t, self.t1[10:])
+
+        # Wrong shape
+        with self.assertRaises(ValueError):
+            mp.MultipoleStack(self.t1, [(2, 2)], [100], np.zeros((100, 2, 1)))
+
+        # No multipoles
+        with self.assertRaises(ValueError):
+            alldets.to_MultipoleStack(modes=[(4, 4)])
+
     def test_MultipolesDir(self):
 
         sim = sd.SimDir("tests/tov")
@@ -266,3 +362,98 @@ class TestCactusMultipoles(unittest.TestCase):
 
         # test __str__()
         self.assertIn("harmonic", cacdir.__str__())
+
+    def test_lazy_h5(self):
+
+        path_h5 = "tests/tov/output-0000/static_tov/mp_harmonic.h5"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Two restarts, the second one is the first one shifted in time
+            for restart, shift in ((0, 0), (1, 100)):
+                output = os.path.join(tmpdir, f"output-000{restart}")
+                os.mkdir(output)
+                with h5py.File(path_h5, "r") as src, h5py.File(
+                    os.path.join(output, "mp_harmonic.h5"), "w"
+                ) as dst:
+                    for name, dataset in src.items():
+                        data = dataset[()]
+                        data[:, 0] += shift
+                        dst.create_dataset(name, data=data)
+
+            sim = sd.SimDir(tmpdir)
+            with mock.patch.object(
+                mp.MultipolesDir,
+                "_multipole_from_h5dataset",
+                side_effect=mp.MultipolesDir._multipole_from_h5dataset,
+            ) as mocked:
+                harmonic = sim.multipoles["harmonic"]
+                self.assertEqual(harmonic.radii, [4.00, 8.00])
+                self.assertIn((2, 2), harmonic[8.00])
+                # Nothing has been read yet
+                mocked.assert_not_called()
+
+                # One dataset for each restart
+                mult_22 = harmonic[8.00](2, 2)
+                self.assertEqual(mocked.call_count, 2)
+                self.assertEqual(harmonic[8.00](2, 2), mult_22)
+                self.assertEqual(mocked.call_count, 2)
+
+                # The data is not read when we copy the object
+                harmonic_copy = harmonic.copy()
+                self.assertEqual(mocked.call_count, 2)
+
+            ts_h5 = mp.MultipolesDir._multipole_from_h5dataset(
+                path_h5, "l2_m2_r8.00"
+            )
+            self.assertEqual(
+                mult_22,
+                ts.combine_ts([ts_h5, ts_h5.time_shifted(100)]),
+            )
+            self.assertEqual(harmonic_copy, harmonic)
+            sim.close()
+
+        # Functions that return the timeseries
+        mult = mp.MultipoleOneDet(
+            100, [(2, 2, lambda: self.ts1), (2, 2, self.ts2)]
+        )
+        self.assertEqual(mult(2, 2), ts.combine_ts([self.ts1, self.ts2]))
+
+    def test_load(self):
+
+        sim = sd.SimDir("tests/tov")
+        expected = mp.MultipolesDir(sim)["phi2"]
+
+        cacdir = mp.MultipolesDir(sim)
+        with self.assertRaises(KeyError):
+            cacdir.load("phi2", radii=[1])
+
+        with ThreadPoolExecutor(2) as executor:
+            loaded = cacdir.load(
+                "phi2",
+                radii=[110.69, 140.16],
+                modes=[(2, -1), (2, 2), (10, 10)],
+                executor=executor,
+            )
+        self.assertEqual(loaded.radii, [110.69, 140.16])
+        self.assertCountEqual(loaded.available_lm, [(2, -1), (2, 2)])
+        self.assertEqual(loaded[110.69](2, -1), expected[110.69](2, -1))
+        self.assertEqual(loaded[140.16](2, 2), expected[140.16](2, 2))
+
+        # The data is kept in memory
+        with mock.patch(
+            "kuibit.cactus_multipoles.load_table",
+            side_effect=mp.load_table,
+        ) as mocked:
+            self.assertEqual(
+                cacdir["phi2"][110.69](2, -1), expected[110.69](2, -1)
+            )
+            mocked.assert_not_called()
+            # Only the missing ones are read
+            cacdir.load("phi2", radii=[110.69])
+            self.assertEqual(
+                mocked.call_count,
+                len(expected[110.69]) - 2,
+            )
+
+        # Everything
+        self.assertEqual(cacdir.load("harmonic"), cacdir["harmonic"])
@@ -17,12 +17,16 @@
 
 import os
 import re
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
 
 import numpy as np
 
 from kuibit import cactus_ascii_utils as cau
 from kuibit import cactus_scalars as cs
+from kuibit import data_cache as dc
 from kuibit import simdir as sd
 from kuibit import timeseries as ts
 
@@ -159,6 +163,36 @@ class TestCactusScalar(unittest.TestCase):
         asc = cs.OneScalar(path)
         vel = asc.load("vel[0]")
 
+        # The file is parsed only once for all the variables
+        path = "tests/tov/output-0000/static_tov/carpet-timing..asc"
+        asc_carp = cs.OneScalar(path)
+        with mock.patch(
+            "kuibit.cactus_scalars.parse_data", side_effect=cau.parse_data
+        ) as mocked_parse_data:
+            loaded = {var: asc_carp[var] for var in asc_carp.keys()}
+            self.assertEqual(mocked_parse_data.call_count, 1)
+        for var, column in asc_carp._vars.items():
+            t, y = np.loadtxt(path, ndmin=2, unpack=True, usecols=(8, column))
+            self.assertEqual(loaded[var], ts.remove_duplicated_iters(t, y))
+
+    def test_build_cache(self):
+
+        with self.assertRaises(RuntimeError):
+            sd.SimDir("tests/tov").ts.build_cache()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sim = sd.SimDir("tests/tov", column_cache_dir=tmpdir)
+            num_files = sim.ts.build_cache()
+            self.assertGreater(num_files, 0)
+            self.assertEqual(len(sim.column_cache), num_files)
+
+            # Now the files are not parsed anymore
+            sim2 = sd.SimDir("tests/tov", column_cache_dir=tmpdir)
+            with mock.patch("kuibit.cactus_scalars.parse_data") as mocked:
+                rho_max = sim2.ts.maximum["rho"]
+                mocked.assert_not_called()
+            self.assertEqual(rho_max, sd.SimDir("tests/tov").ts.maximum["rho"])
+
     def test_AllScalars(self):
 
         sim = sd.SimDir("tests/tov")
@@ -217,6 +251,41 @@ class TestCactusScalar(unittest.TestCase):
 
         self.assertEqual(1, reader.get("bubu", default=1))
 
+        # Reading the restarts in parallel gives the same result
+        with ThreadPoolExecutor(2) as executor:
+            reader_parallel = cs.AllScalars(
+                sd.SimDir("tests/tov").allfiles, "average", executor=executor
+            )
+            self.assertEqual(rho, reader_parallel["rho"])
+
+        # The combined timeseries are kept in the data cache
+        self.assertIs(reader["rho"], reader["rho"])
+        self.assertIn(reader._cache_key("rho"), reader._data_cache)
+        reader.refresh([])
+        self.assertNotIn(reader._cache_key("rho"), reader._data_cache)
+
+        # The cache is bounded (and here nothing is kept)
+        reader_no_cache = cs.AllScalars(
+            sd.SimDir("tests/tov").allfiles,
+            "average",
+            data_cache=dc.DataCache(max_bytes=0),
+        )
+        self.assertEqual(rho, reader_no_cache["rho"])
+        self.assertEqual(len(reader_no_cache._data_cache), 0)
+
+        # With a process pool, the OneScalar are sent to other processes
+        # without the index (but with the column cache)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with ProcessPoolExecutor(2) as executor:
+                with sd.SimDir(
+                    "tests/tov",
+                    index_file=os.path.join(tmpdir, "index.sqlite"),
+                    column_cache_dir=os.path.join(tmpdir, "columns"),
+                    executor=executor,
+                ) as sim:
+                    self.assertEqual(rho, sim.ts.average["rho"])
+                    self.assertGreater(len(sim.column_cache), 0)
+
     def test_ScalarsDir(self):
 
         # Not a SimDir
@@ -16,9 +16,10 @@
 # this program; if not, see <https://www.gnu.org/licenses/>.
 
 import unittest
+from unittest import mock
 
 import numpy as np
-from scipy import signal
+from scipy import fft, signal
 
 from kuibit import cactus_waves as cw
 from kuibit import gw_utils as gwu
@@ -101,6 +102,99 @@ class TestCactusWaves(unittest.TestCase):
             tts.t[1] *= 1.01
             gwdum._fixed_frequency_integrated(tts, 1e-4)
 
+    def test__fixed_frequency_integrated_many(self):
+
+        t1 = np.linspace(0, 2 * np.pi, 1000)
+        t2 = np.linspace(0, 4 * np.pi, 500)
+        series = [
+            ts.TimeSeries(t1, np.sin(t1)),
+            ts.TimeSeries(t2, np.cos(t2)),
+            ts.TimeSeries(t1, np.exp(1j * t1)),
+        ]
+
+        # Series with different times are integrated separately, but the
+        # result has to be the same as integrating them one by one
+        gwdum = cw.GravitationalWavesOneDet(0, [(2, 2, series[0])])
+        integrated = gwdum._fixed_frequency_integrated_many(series, 1, order=2)
+        self.assertEqual(len(integrated), 3)
+        for tts, integral in zip(series, integrated):
+            self.assertEqual(
+                integral, gwdum._fixed_frequency_integrated(tts, 1, order=2)
+            )
+
+    def test__ffi_modes(self):
+
+        modes = list(self.psi4.keys())
+        gw_one_det = cw.GravitationalWavesOneDet
+
+        with mock.patch.object(
+            gw_one_det,
+            "_fixed_frequency_integrated_many",
+            side_effect=gw_one_det._fixed_frequency_integrated_many,
+        ) as mocked:
+            power = self.psi4.get_total_power(0.1)
+            # All the modes are integrated together
+            mocked.assert_called_once()
+            self.assertEqual(len(mocked.call_args.args[0]), len(modes))
+
+            # The integrals are reused
+            self.assertEqual(
+                self.psi4.get_total_energy(0.1), power.integrated()
+            )
+            self.psi4.get_power_lm(2, 2, 0.1)
+            self.psi4.get_torque_z_lm(2, 2, 0.1)
+            self.assertEqual(mocked.call_count, 2)
+
+            # Different parameters are integrated again
+            self.psi4.get_power_lm(2, 2, 0.2)
+            self.assertEqual(mocked.call_count, 3)
+            for alpha in (0.1, 0.2):
+                self.psi4.get_strain_lm(
+                    2, 2, 0.1, window_function="tukey", alpha=alpha
+                )
+            self.assertEqual(mocked.call_count, 5)
+
+        # At most max_ffi_cached sets of parameters are kept
+        self.psi4.max_ffi_cached = 2
+        for pcut in (0.1, 0.2, 0.3):
+            self.psi4._ffi_modes([(2, 2)], pcut)
+        self.assertEqual(len(self.psi4._ffi_cache), 2)
+        self.assertNotIn((0.1, 1, None, (), ()), self.psi4._ffi_cache)
+        self.psi4.clear_ffi_cache()
+        self.assertEqual(len(self.psi4._ffi_cache), 0)
+        del self.psi4.max_ffi_cached
+
+        # The number of threads is passed to the FFTs
+        with mock.patch("scipy.fft.fft", side_effect=fft.fft) as mocked_fft:
+            self.psi4._ffi_modes([(2, 2)], 0.1, workers=2)
+            self.assertEqual(mocked_fft.call_args.kwargs["workers"], 2)
+
+        # The result is not modified by trimming the ends
+        integrated = self.psi4._ffi_modes([(2, 2)], 0.1, order=2)[(2, 2)]
+        tmin = integrated.tmin
+        self.psi4.get_strain_lm(2, 2, 0.1)
+        self.assertEqual(integrated.tmin, tmin)
+        self.assertEqual(
+            integrated,
+            self.psi4._fixed_frequency_integrated(self.psi4[(2, 2)], 0.1, 2),
+        )
+
+        # The public methods return new timeseries, so modifying them does
+        # not change the results saved for the following calls
+        for method, args in (
+            (self.psi4.get_strain_lm, (2, 2, 0.1)),
+            (self.psi4.get_strain, (0, 0, 0.1)),
+            (self.psi4.get_power_lm, (2, 2, 0.1)),
+            (self.psi4.get_total_power, (0.1,)),
+            (self.psi4.get_torque_z_lm, (2, 2, 0.1)),
+        ):
+            with self.subTest(method=method.__name__):
+                result = method(*args)
+                expected = result.copy()
+                result.y[:] = 0
+                result.time_shift(1)
+                self.assertEqual(method(*args), expected)
+
     def test_get_strain_lm(self):
 
         with self.assertRaises(ValueError):
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from kuibit import column_cache as cc
+
+
+class TestColumnCache(unittest.TestCase):
+    def test_get(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "source.asc")
+            with open(source, "w") as fil:
+                fil.write("1 2\n")
+
+            cache = cc.ColumnCache(os.path.join(tmpdir, "cache"))
+            self.assertEqual(len(cache), 0)
+            self.assertNotIn(source, cache)
+
+            table = np.array([[1.0, 2.0]])
+            compute = mock.Mock(return_value=table)
+
+            np.testing.assert_array_equal(cache.get(source, compute), table)
+            self.assertIn(source, cache)
+            self.assertEqual(len(cache), 1)
+
+            # The second time, the table is read from the cache (memory-mapped)
+            cached = cache.get(source, compute)
+            np.testing.assert_array_equal(cached, table)
+            self.assertIsInstance(cached, np.memmap)
+            self.assertEqual(compute.call_count, 1)
+
+            # If another process writes the table while we are computing it,
+            # the table is not removed
+            cache_file = cache._cache_file(source)
+            os.remove(cache_file)
+
+            def compute_concurrently():
+                cache2 = cc.ColumnCache(os.path.join(tmpdir, "cache"))
+                cache2.get(source, mock.Mock(return_value=table))
+                return table
+
+            with mock.patch("os.remove", side_effect=os.remove) as removed:
+                cache.get(source, compute_concurrently)
+                self.assertNotIn(mock.call(cache_file), removed.call_args_list)
+
+            # A new cache in the same directory sees the same tables
+            cache2 = cc.ColumnCache(os.path.join(tmpdir, "cache"))
+            cache2.get(source, compute)
+            self.assertEqual(compute.call_count, 1)
+
+            # Modifying the file invalidates the table (and removes it)
+            with open(source, "w") as fil:
+                fil.write("1 2\n3 4\n")
+            table2 = np.array([[1.0, 2.0], [3.0, 4.0]])
+            compute2 = mock.Mock(return_value=table2)
+            np.testing.assert_array_equal(cache.get(source, compute2), table2)
+            self.assertEqual(compute2.call_count, 1)
+            self.assertEqual(len(cache), 1)
+
+            # If compute fails, nothing is saved
+            source3 = os.path.join(tmpdir, "source3.asc")
+            with open(source3, "w") as fil:
+                fil.write("bubu\n")
+            with self.assertRaises(RuntimeError):
+                cache.get(source3, mock.Mock(side_effect=RuntimeError))
+            self.assertEqual(len(os.listdir(os.path.join(tmpdir, "cache"))), 1)
+
+            cache.clear()
+            self.assertEqual(len(cache), 0)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from kuibit import data_cache as dc
+from kuibit import grid_data as gd
+from kuibit import timeseries as ts
+
+
+class TestDataCache(unittest.TestCase):
+    def test_nbytes(self):
+
+        arr = np.zeros(10)
+        self.assertEqual(dc.nbytes(arr), 80)
+        self.assertEqual(dc.nbytes(None), 0)
+
+        grid = gd.UniformGrid([10], x0=[0], x1=[1])
+        ugd = gd.UniformGridData(grid, arr)
+        self.assertEqual(dc.nbytes(ugd), 80)
+
+        grid2 = gd.UniformGrid([10], x0=[0], x1=[1], ref_level=1)
+        hgd = gd.HierarchicalGridData(
+            [ugd, gd.UniformGridData(grid2, np.zeros(10))]
+        )
+        self.assertEqual(dc.nbytes(hgd), 160)
+
+        self.assertEqual(dc.nbytes(ts.TimeSeries(np.arange(10), arr)), 160)
+
+    def test_get(self):
+
+        with self.assertRaises(ValueError):
+            dc.DataCache(max_bytes=-1)
+
+        cache = dc.DataCache(max_bytes=200)
+
+        compute = mock.Mock(side_effect=lambda: np.zeros(10))
+
+        first = cache.get("a", compute)
+        self.assertIs(cache.get("a", compute), first)
+        compute.assert_called_once()
+        self.assertIn("a", cache)
+        self.assertEqual(cache.cache_info(), dc.CacheInfo(1, 1, 0, 1, 80, 200))
+
+        cache.get("b", compute)
+        # Use a, so that b is the least recently used
+        cache.get("a", compute)
+        # Now we have to evict b
+        cache.get("c", compute)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(
+            cache.cache_info(), dc.CacheInfo(2, 3, 1, 2, 160, 200)
+        )
+
+        # Items that are too large are not saved
+        large = cache.get("d", lambda: np.zeros(100))
+        self.assertEqual(len(large), 100)
+        self.assertNotIn("d", cache)
+        self.assertEqual(len(cache), 2)
+
+        # Replacing an item
+        cache.put("a", np.zeros(5))
+        self.assertEqual(cache.cache_info().nbytes, 120)
+
+        # Removing an item
+        cache.discard("a")
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.cache_info().nbytes, 80)
+        cache.discard("a")
+        self.assertEqual(len(cache), 1)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.cache_info().nbytes, 0)
+        # Statistics are not reset
+        self.assertEqual(cache.cache_info().hits, 2)
+
+        # Nothing is saved
+        cache_zero = dc.DataCache(max_bytes=0)
+        cache_zero.get("a", compute)
+        self.assertEqual(len(cache_zero), 0)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from kuibit import file_index as fi
+
+
+class TestFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmpdir.name, "index.sqlite")
+        self.data_path = os.path.join(self.tmpdir.name, "data.txt")
+        with open(self.data_path, "w") as file_:
+            file_.write("hello")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get(self):
+
+        index = fi.FileIndex(self.index_path)
+        compute = mock.Mock(return_value={"a": [1, 2]})
+
+        self.assertEqual(
+            index.get(self.data_path, "key", compute), {"a": [1, 2]}
+        )
+        self.assertEqual(
+            index.get(self.data_path, "key", compute), {"a": [1, 2]}
+        )
+        compute.assert_called_once()
+        self.assertEqual(len(index), 1)
+
+        # Different key
+        index.get(self.data_path, "key2", compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(len(index), 2)
+
+        # The index is persistent
+        index.close()
+        index = fi.FileIndex(self.index_path)
+        self.assertEqual(
+            index.get(self.data_path, "key", compute), {"a": [1, 2]}
+        )
+        self.assertEqual(compute.call_count, 2)
+
+        # Modifying the file invalidates the entry
+        with open(self.data_path, "a") as file_:
+            file_.write(" world")
+        index.get(self.data_path, "key", compute)
+        self.assertEqual(compute.call_count, 3)
+        index.get(self.data_path, "key", compute)
+        self.assertEqual(compute.call_count, 3)
+
+        # Same size, different modification time
+        stat = os.stat(self.data_path)
+        os.utime(
+            self.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9)
+        )
+        index.get(self.data_path, "key", compute)
+        self.assertEqual(compute.call_count, 4)
+
+        # Values that cannot be computed are not saved
+        def fail():
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            index.get(self.data_path, "key3", fail)
+        self.assertEqual(len(index), 2)
+
+        # Clear
+        index.clear()
+        self.assertEqual(len(index), 0)
+        index.get(self.data_path, "key", compute)
+        self.assertEqual(compute.call_count, 5)
+
+        # File does not exist
+        with self.assertRaises(FileNotFoundError):
+            index.get("/this/file/does/not/exist", "key", compute)
+
+        index.close()
+
+    def test_version(self):
+
+        index = fi.FileIndex(self.index_path)
+        index.get(self.data_path, "key", lambda: 1)
+        index.close()
+
+        # Simulate an index written by a different version
+        connection = sqlite3.connect(self.index_path)
+        connection.execute("PRAGMA user_version = 0")
+        connection.commit()
+        connection.close()
+
+        index = fi.FileIndex(self.index_path)
+        self.assertEqual(len(index), 0)
+        index.close()
+
+    def test_cached(self):
+
+        compute = mock.Mock(return_value=2)
+
+        # No index
+        self.assertEqual(fi.cached(None, self.data_path, "key", compute), 2)
+        self.assertEqual(fi.cached(None, self.data_path, "key", compute), 2)
+        self.assertEqual(compute.call_count, 2)
+
+        index = fi.FileIndex(self.index_path)
+        self.assertEqual(fi.cached(index, self.data_path, "key", compute), 2)
+        self.assertEqual(fi.cached(index, self.data_path, "key", compute), 2)
+        self.assertEqual(compute.call_count, 3)
+        index.close()
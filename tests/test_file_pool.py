@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+import os
+import pickle
+import unittest
+from unittest import mock
+
+from kuibit import file_pool as fp
+
+
+class TestH5FilePool(unittest.TestCase):
+    def setUp(self):
+        self.file1 = "tests/grid_functions/rho.xy.h5"
+        self.file2 = "tests/grid_functions/illinoisgrmhd-grmhd_primitives_allbutbi.xy.h5"
+
+    def test_open(self):
+
+        with self.assertRaises(ValueError):
+            fp.H5FilePool(max_open_files=0)
+
+        pool = fp.H5FilePool(max_open_files=1)
+
+        with pool.open(self.file1) as h5f:
+            first = h5f
+            self.assertIn("Parameters and Global Attributes", h5f)
+
+        # The file is still open and it is reused
+        self.assertIn(self.file1, pool)
+        self.assertEqual(len(pool), 1)
+        with pool.open(self.file1) as h5f:
+            self.assertIs(h5f, first)
+
+        # Files that are in use are not closed, even if there are too many
+        with pool.open(self.file1) as h5f1:
+            with pool.open(self.file2) as h5f2:
+                self.assertEqual(len(pool), 2)
+                self.assertTrue(h5f1.id.valid)
+                self.assertTrue(h5f2.id.valid)
+            # Now file2 is not used anymore, so it is closed (file1 is in
+            # use)
+            self.assertEqual(len(pool), 1)
+            self.assertNotIn(self.file2, pool)
+            self.assertTrue(h5f1.id.valid)
+
+        # Least recently used file is closed
+        with pool.open(self.file2) as h5f2:
+            pass
+        self.assertNotIn(self.file1, pool)
+        self.assertFalse(first.id.valid)
+
+        pool.close()
+        self.assertEqual(len(pool), 0)
+        self.assertFalse(h5f2.id.valid)
+
+        # Context manager
+        with fp.H5FilePool() as pool2:
+            with pool2.open(self.file1) as h5f:
+                pass
+            with pool2.open(self.file2) as h5f2:
+                pass
+            self.assertEqual(len(pool2), 2)
+        self.assertFalse(h5f.id.valid)
+        self.assertFalse(h5f2.id.valid)
+
+    def test_fork(self):
+
+        pool = fp.H5FilePool()
+        with pool.open(self.file1) as h5f:
+            pass
+
+        # Here we pretend to be in a forked process, the files of the parent
+        # must not be used (nor closed)
+        with mock.patch("os.getpid", return_value=os.getpid() + 1):
+            self.assertNotIn(self.file1, pool)
+            with pool.open(self.file1) as h5f_child:
+                self.assertIsNot(h5f_child, h5f)
+            pool.close()
+            self.assertTrue(h5f.id.valid)
+
+        h5f.close()
+
+    def test_pickle(self):
+
+        pool = fp.H5FilePool(max_open_files=3)
+        with pool.open(self.file1):
+            pass
+
+        # Only the maximum number of files is pickled
+        unpickled = pickle.loads(pickle.dumps(pool))
+        self.assertEqual(unpickled.max_open_files, 3)
+        self.assertEqual(len(unpickled), 0)
+        with unpickled.open(self.file1) as h5f:
+            self.assertIn("HYDROBASE::rho it=0 tl=0 rl=0 c=0", h5f)
+        unpickled.close()
+        pool.close()
@@ -20,8 +20,10 @@
 
 import os
 import unittest
+from unittest import mock
 
 import numpy as np
+from scipy import interpolate
 
 from kuibit import grid_data as gd
 from kuibit import grid_data_utils as gdu
@@ -444,7 +446,7 @@ class TestUniformGridData(unittest.TestCase):
         )
 
         # Check invalidation of spline
-        self.assertTrue(ug_data.invalid_spline)
+        self.assertIsNone(ug_data._cubic_coefficients)
 
         # Test from 3D to 2D
         grid_data3d = gdu.sample_function_from_uniformgrid(
@@ -508,7 +510,7 @@ class TestUniformGridData(unittest.TestCase):
         self.assertEqual(ug_data, expected_ug_data)
 
         # Check invalidation of spline
-        self.assertTrue(ug_data.invalid_spline)
+        self.assertIsNone(ug_data._cubic_coefficients)
 
         self.assertCountEqual(ug_data.num_ghost, [0, 0])
 
@@ -651,10 +653,6 @@ class TestUniformGridData(unittest.TestCase):
         with self.assertRaises(ValueError):
             sin_data.evaluate_with_spline(1, ext=3)
 
-        # Test k!=0!=1
-        with self.assertRaises(ValueError):
-            sin_data._make_spline(k=3)
-
         self.assertAlmostEqual(
             sin_data_complex.evaluate_with_spline([np.pi / 3]),
             (1 + 1j) * np.sin(np.pi / 3),
@@ -770,9 +768,6 @@ class TestUniformGridData(unittest.TestCase):
             prod_data_complex.evaluate_with_spline((20, 20), ext=1), 0
         )
 
-        self.assertTrue(prod_data_complex.spline_real.bounds_error)
-        self.assertTrue(prod_data_complex.spline_imag.bounds_error)
-
         # Test on a UniformGrid
         sin_data = gdu.sample_function(np.sin, 12000, 0, 2 * np.pi)
         linspace = gd.UniformGrid(101, x0=0, x1=3)
@@ -796,6 +791,201 @@ class TestUniformGridData(unittest.TestCase):
         # Vector
         self.assertCountEqual(prod_data_flat([(1, 1), (2, 1)]), [2, 4])
 
+    def test__cubic_interpolation(self):
+        def function(x, y):
+            return np.sin(x) * np.cos(y) + 1j * np.cos(x)
+
+        grid = gd.UniformGrid([41, 41], x0=[0, 0], x1=[4, 4])
+        ugd = gdu.sample_function_from_uniformgrid(function, grid)
+
+        points = np.random.default_rng(2).uniform(0.3, 3.7, size=(500, 2))
+        expected = function(points[:, 0], points[:, 1])
+
+        # The cubic spline is more accurate than the multilinear
+        # interpolation on smooth data
+        error_linear = np.abs(ugd.evaluate_with_spline(points) - expected)
+        error_cubic = np.abs(ugd.evaluate_with_spline(points, k=3) - expected)
+        self.assertLess(np.amax(error_cubic), 1e-3)
+        self.assertLess(np.amax(error_cubic), np.amax(error_linear) / 5)
+
+        # The spline goes through the data
+        self.assertTrue(
+            np.allclose(ugd.evaluate_with_spline(grid, k=3), ugd.data)
+        )
+
+        # Real data
+        real_ugd = gdu.sample_function_from_uniformgrid(
+            lambda x, y: np.sin(x) * np.cos(y), grid
+        )
+        self.assertTrue(
+            np.allclose(
+                real_ugd.evaluate_with_spline(points, k=3),
+                ugd.evaluate_with_spline(points, k=3).real,
+            )
+        )
+
+        # Outside
+        self.assertEqual(ugd.evaluate_with_spline((10, 10), ext=1, k=3), 0)
+        with self.assertRaises(ValueError):
+            ugd.evaluate_with_spline((10, 10), k=3)
+        # The half cells at the boundaries are inside
+        ugd.evaluate_with_spline(grid.lowest_vertex, k=3)
+        ugd.evaluate_with_spline(grid.highest_vertex, k=3)
+
+        # Invalid order
+        with self.assertRaises(ValueError):
+            ugd.evaluate_with_spline((1, 1), k=2)
+        with self.assertRaises(ValueError):
+            ugd.resampled(grid, k=2)
+
+        # The coefficients are computed only once
+        cubic = ugd.evaluate_with_spline(points, k=3)
+        coefficients = ugd._cubic_spline_coefficients()
+        self.assertIs(ugd._cubic_spline_coefficients()[0], coefficients[0])
+        # and they are computed again when the data changes
+        ugd.data = ugd.data * 2
+        self.assertIsNot(ugd._cubic_spline_coefficients()[0], coefficients[0])
+        self.assertTrue(
+            np.allclose(ugd.evaluate_with_spline(points, k=3), 2 * cubic)
+        )
+
+        # Resampling
+        new_grid = gd.UniformGrid([101, 101], x0=[0.5, 0.5], x1=[3.5, 3.5])
+        resampled = ugd.resampled(new_grid, k=3)
+        self.assertEqual(resampled.grid, new_grid)
+        expected_resampled = gdu.sample_function_from_uniformgrid(
+            function, new_grid
+        )
+        self.assertTrue(
+            np.allclose(resampled.data, 2 * expected_resampled.data, atol=1e-3)
+        )
+
+    def test__multilinear_interpolation(self):
+
+        rng = np.random.default_rng(1)
+
+        for dims in (1, 2, 3):
+            grid = gd.UniformGrid(
+                [5, 4, 6][:dims], x0=[0, 1, -2][:dims], dx=[0.5, 1, 0.3][:dims]
+            )
+            data = rng.normal(size=grid.shape) + 1j * rng.normal(
+                size=grid.shape
+            )
+            ugd = gd.UniformGridData(grid, data)
+
+            # Points inside, outside, in the half cells at the boundaries, and
+            # exactly on the boundaries
+            points = rng.uniform(
+                grid.lowest_vertex - 0.2,
+                grid.highest_vertex + 0.2,
+                size=(200, dims),
+            )
+            points[0] = grid.lowest_vertex
+            points[1] = grid.highest_vertex
+            outside = np.any(
+                (points < grid.lowest_vertex) | (points > grid.highest_vertex),
+                axis=1,
+            )
+
+            # Compare with RegularGridInterpolator. The data is constant in
+            # the half cells at the boundaries, so we add a point at each
+            # boundary with the same value as the last point.
+            coords = [
+                np.concatenate(
+                    ([coord[0] - 0.5 * dx], coord, [coord[-1] + 0.5 * dx])
+                )
+                for coord, dx in zip(grid.coordinates(), grid.dx)
+            ]
+            expected = interpolate.RegularGridInterpolator(
+                coords,
+                np.pad(data, pad_width=1, mode="edge"),
+                bounds_error=False,
+                fill_value=0,
+            )(points)
+
+            self.assertTrue(
+                np.allclose(
+                    ugd._multilinear_interpolation(points, ext=1), expected
+                )
+            )
+            real_ugd = gd.UniformGridData(grid, data.real)
+            self.assertTrue(
+                np.allclose(
+                    real_ugd._multilinear_interpolation(points, ext=1),
+                    expected.real,
+                )
+            )
+
+            with self.assertRaises(ValueError):
+                ugd._multilinear_interpolation(points, ext=2)
+
+            self.assertTrue(
+                np.allclose(
+                    ugd._multilinear_interpolation(points[~outside], ext=2),
+                    expected[~outside],
+                )
+            )
+
+            # The kernel used with numba gives the same result (here we run it
+            # in pure Python)
+            out = np.zeros(np.sum(~outside), dtype=complex)
+            gd._multilinear_interpolation_core(
+                data.ravel(),
+                np.array(grid.shape),
+                grid.x0,
+                grid.dx,
+                points[~outside],
+                out,
+            )
+            self.assertTrue(np.allclose(out, expected[~outside]))
+
+        # Integer data gives floating point results
+        int_data = gd.UniformGridData(
+            gd.UniformGrid([2, 2], x0=[0, 0], dx=[1, 1]),
+            np.array([[0, 1], [2, 3]]),
+        )
+        self.assertAlmostEqual(
+            int_data._multilinear_interpolation(np.array([[0.5, 0.5]]))[0],
+            1.5,
+        )
+
+    @unittest.skipUnless(gd._HAS_NUMBA, "numba is not installed")
+    def test__multilinear_interpolation_numba(self):
+
+        rng = np.random.default_rng(2)
+
+        grid = gd.UniformGrid([50, 40, 30], x0=[0, 1, -2], dx=[0.5, 1, 0.3])
+        data = rng.normal(size=grid.shape) + 1j * rng.normal(size=grid.shape)
+        ugd = gd.UniformGridData(grid, data)
+
+        # numba is used when there are at least _NUMBA_MIN_POINTS points
+        # inside the grid
+        points = np.concatenate(
+            (
+                rng.uniform(
+                    grid.lowest_vertex,
+                    grid.highest_vertex,
+                    size=(gd._NUMBA_MIN_POINTS, 3),
+                ),
+                rng.uniform(
+                    grid.highest_vertex + 0.1,
+                    grid.highest_vertex + 0.2,
+                    size=(10, 3),
+                ),
+            )
+        )
+
+        # NumPy version
+        with mock.patch.object(gd, "_HAS_NUMBA", False):
+            expected = ugd._multilinear_interpolation(points, ext=1)
+
+        self.assertTrue(
+            np.allclose(
+                ugd._multilinear_interpolation(points, ext=1), expected
+            )
+        )
+        self.assertIsNotNone(gd._multilinear_interpolation_numba)
+
     def test_copy(self):
 
         sin_data = gdu.sample_function(np.sin, 1000, 0, 2 * np.pi)
@@ -910,9 +1100,6 @@ class TestUniformGridData(unittest.TestCase):
         self.assertEqual(resampled.grid, new_grid)
         self.assertTrue(np.allclose(resampled.data, exp_resampled.data))
 
-        # Check that the method of the spline is linear
-        self.assertEqual(prod_data_complex.spline_imag.method, "linear")
-
         # Test using nearest interpolation
         resampled_nearest = prod_data_complex.resampled(
             new_grid, piecewise_constant=True
@@ -922,9 +1109,6 @@ class TestUniformGridData(unittest.TestCase):
             np.allclose(resampled_nearest.data, exp_resampled.data, atol=1e-3)
         )
 
-        # Check that the method of the spline hasn't linear
-        self.assertEqual(prod_data_complex.spline_imag.method, "linear")
-
         # Check single number
         self.assertAlmostEqual(resampled_nearest((2, 2.5)), 9 * (1 + 1j))
 
@@ -1467,6 +1651,56 @@ class TestHierarchicalGridData(unittest.TestCase):
             hg3.finest_level_component_at_point([4, 6]), (0, 1)
         )
 
+    def test__finest_level_component_at_points(self):
+        def product(x, y):
+            return x * (y + 2)
+
+        def level2(x0):
+            grid = gd.UniformGrid([5, 5], x0=x0, x1=x0 + 4, ref_level=2)
+            return gdu.sample_function_from_uniformgrid(product, grid)
+
+        # Two components on level 1
+        grids1 = [
+            gd.UniformGrid([4, 5], x0=[0, 1], x1=[3, 5], ref_level=1),
+            gd.UniformGrid([11, 21], x0=[4, 6], x1=[14, 26], ref_level=1),
+        ]
+        data1 = [
+            gdu.sample_function_from_uniformgrid(product, g) for g in grids1
+        ]
+        hg = gd.HierarchicalGridData(
+            self.grid_data + data1 + [level2(np.array([2, 3]))]
+        )
+
+        # The result has to be the same as the one point at the time
+        points = np.random.default_rng(42).uniform([0, 1], [14, 26], (500, 2))
+        # Points on the edges of the components
+        points = np.vstack([points, [[3, 5], [4, 6], [3, 4]]])
+
+        level_comps, owners = hg._finest_level_component_at_points(points)
+        self.assertEqual(
+            [level_comps[owner] for owner in owners],
+            [hg.finest_level_component_at_point(point) for point in points],
+        )
+
+        # Point outside the grid
+        with self.assertRaises(ValueError):
+            hg._finest_level_component_at_points(np.array([[1000, 200]]))
+
+        # The boxes are not computed again
+        boxes = hg._component_boxes()
+        self.assertIs(hg._component_boxes()[1], boxes[1])
+
+        # But they are when the grids change
+        self.assertEqual(level_comps[owners[-1]], (2, 0))
+        hg[2][0] = level2(np.array([8, 12]))
+        self.assertIsNot(hg._component_boxes()[1], boxes[1])
+        level_comps, owners = hg._finest_level_component_at_points(
+            np.array([[3, 4], [9, 13]])
+        )
+        self.assertEqual(
+            [level_comps[owner] for owner in owners], [(1, 0), (2, 0)]
+        )
+
     def test_call_evalute_with_spline(self):
 
         # Teting call is the same as evalute_with_spline
@@ -1498,6 +1732,62 @@ class TestHierarchicalGridData(unittest.TestCase):
         grid_data = gdu.sample_function_from_uniformgrid(product, grid)
         self.assertTrue(np.allclose(hg3(grid), grid_data.data))
 
+    def test_evaluate_with_spline_cubic(self):
+        def function(x, y):
+            return np.sin(x) * np.cos(y)
+
+        def sample(shape, x0, x1, ref_level):
+            grid = gd.UniformGrid(shape, x0=x0, x1=x1, ref_level=ref_level)
+            return gdu.sample_function_from_uniformgrid(function, grid)
+
+        hg = gd.HierarchicalGridData(
+            [
+                sample([41, 41], [0, 0], [4, 4], 0),
+                sample([41, 41], [1, 1], [3, 3], 1),
+            ]
+        )
+
+        # Points on the finer level, including its boundaries
+        points = np.random.default_rng(3).uniform(0.9, 3.1, size=(500, 2))
+        expected = function(points[:, 0], points[:, 1])
+
+        error_linear = np.abs(hg.evaluate_with_spline(points) - expected)
+        error_cubic = np.abs(hg.evaluate_with_spline(points, k=3) - expected)
+        self.assertLess(np.amax(error_cubic), np.amax(error_linear) / 5)
+
+        # Without the halo, the error at the boundary of the finer level is
+        # much larger
+        hg_no_halo = gd.HierarchicalGridData(hg.all_components)
+        hg_no_halo._cubic_halo = 0
+        error_no_halo = np.abs(
+            hg_no_halo.evaluate_with_spline(points, k=3) - expected
+        )
+        self.assertLess(np.amax(error_cubic), np.amax(error_no_halo) / 5)
+
+        # The halo contains the data of the coarser level
+        extended = hg._cubic_component(1, 0)
+        self.assertEqual(
+            extended.grid.shape.tolist(), [41 + 2 * hg._cubic_halo] * 2
+        )
+        self.assertAlmostEqual(
+            extended((0.9, 0.9)), hg[0][0]((0.9, 0.9)), places=12
+        )
+
+        # Invalid order
+        with self.assertRaises(ValueError):
+            hg.evaluate_with_spline((1, 1), k=2)
+
+        # The extended components are computed only once
+        self.assertIs(hg._cubic_component(1, 0), extended)
+
+        # But they are computed again when the data changes
+        hg[1][0] = sample([21, 21], [1, 1], [3, 3], 1)
+        self.assertIsNot(hg._cubic_component(1, 0), extended)
+        self.assertEqual(
+            hg._cubic_component(1, 0).grid.shape.tolist(),
+            [21 + 2 * hg._cubic_halo] * 2,
+        )
+
     def test_merge_refinement_levels(self):
         # This also tests to_UniformGridData
 
@@ -1549,6 +1839,60 @@ class TestHierarchicalGridData(unittest.TestCase):
         hg_one = gd.HierarchicalGridData([big_grid_data])
         self.assertEqual(hg_one.merge_refinement_levels(), big_grid_data)
 
+    def test_to_UniformGridData_from_grid(self):
+        def product(x, y, z):
+            return x * (y + 2) + 1j * z
+
+        # Three levels, two components in the finest (overlapping)
+        grids = [
+            gd.UniformGrid([11] * 3, x0=[0] * 3, dx=[1] * 3, ref_level=0),
+            gd.UniformGrid([9, 9, 9], x0=[2, 2, 2], dx=[0.5] * 3, ref_level=1),
+            gd.UniformGrid(
+                [6, 6, 6], x0=[2.5] * 3, dx=[0.25] * 3, ref_level=2
+            ),
+            gd.UniformGrid(
+                [6, 6, 6],
+                x0=[3.5, 3, 3],
+                dx=[0.25] * 3,
+                ref_level=2,
+                component=1,
+            ),
+        ]
+        hg = gd.HierarchicalGridData(
+            [gdu.sample_function_from_uniformgrid(product, g) for g in grids]
+        )
+
+        # The grid is not aligned with any of the components
+        grid = gd.UniformGrid([23, 21, 19], x0=[0.1, -0.3, 0.2], x1=[9, 9, 9])
+
+        # Nearest neighbors have to be exactly the same as evaluating the
+        # data on each point
+        self.assertTrue(
+            np.array_equal(
+                hg.to_UniformGridData_from_grid(grid).data,
+                hg.evaluate_with_spline(grid, piecewise_constant=True),
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                hg.to_UniformGridData_from_grid(grid, resample=True).data,
+                hg.evaluate_with_spline(grid),
+                atol=1e-12,
+            )
+        )
+
+        # Points outside the grid
+        with self.assertRaises(ValueError):
+            hg.to_UniformGridData_from_grid(
+                gd.UniformGrid([3, 3, 3], x0=[8, 8, 8], x1=[12, 12, 12])
+            )
+
+        # Wrong dimensions
+        with self.assertRaises(ValueError):
+            hg.to_UniformGridData_from_grid(
+                gd.UniformGrid([3, 3], x0=[1, 1], x1=[2, 2])
+            )
+
     def test_coordinates(self):
 
         hg_coord = gd.HierarchicalGridData(self.grid_data).coordinates()
@@ -1647,3 +1991,119 @@ class TestHierarchicalGridData(unittest.TestCase):
         hg.slice(cut)
 
         self.assertEqual(hg, expected_hg)
+
+
+class TestGridResampler(unittest.TestCase):
+    def setUp(self):
+        gd.GridResampler.clear_cache()
+
+        def product(x, y):
+            return x * (y + 2)
+
+        self.product = product
+        self.grids = [
+            gd.UniformGrid([11, 11], x0=[0, 0], dx=[1, 1]),
+            gd.UniformGrid([9, 9], x0=[2, 2], dx=[0.5, 0.5], ref_level=1),
+        ]
+        self.data = [
+            gdu.sample_function_from_uniformgrid(product, grid)
+            for grid in self.grids
+        ]
+        self.target = gd.UniformGrid([23, 21], x0=[0.1, -0.3], x1=[9, 9])
+
+    def test_call(self):
+
+        hg = gd.HierarchicalGridData(self.data)
+
+        for resample in (False, True):
+            resampler = gd.GridResampler(
+                self.grids, self.target, resample=resample
+            )
+            self.assertTrue(
+                np.array_equal(
+                    resampler([d.data for d in self.data]),
+                    hg.to_UniformGridData_from_grid(
+                        self.target, resample=resample
+                    ).data,
+                )
+            )
+
+            # New data with the same structure
+            self.assertTrue(
+                np.array_equal(
+                    resampler([-d.data for d in self.data]),
+                    (-hg)
+                    .to_UniformGridData_from_grid(
+                        self.target, resample=resample
+                    )
+                    .data,
+                )
+            )
+
+        # Wrong number of arrays
+        with self.assertRaises(ValueError):
+            resampler([self.data[0].data])
+
+        # Points outside
+        outside = gd.UniformGrid([5, 5], x0=[8, 8], x1=[12, 12])
+        with self.assertRaises(ValueError):
+            gd.GridResampler(self.grids, outside)
+        with self.assertRaises(ValueError):
+            gd.GridResampler(self.grids, outside, ext=3)
+        resampled = gd.GridResampler(self.grids, outside, ext=1)(
+            [d.data for d in self.data]
+        )
+        self.assertEqual(resampled[-1, -1], 0)
+        self.assertEqual(resampled[0, 0], self.product(8, 8))
+
+        # Dimensionality mismatch
+        with self.assertRaises(ValueError):
+            gd.GridResampler(self.grids, gd.UniformGrid([3], x0=[1], x1=[2]))
+
+    def test_cached(self):
+
+        resampler = gd.GridResampler.cached(self.grids, self.target)
+        self.assertIs(
+            gd.GridResampler.cached(self.grids, self.target), resampler
+        )
+
+        # Grids with the same structure at a different time
+        grids_later = [
+            gd.UniformGrid(
+                grid.shape,
+                x0=grid.x0,
+                dx=grid.dx,
+                ref_level=grid.ref_level,
+                time=10,
+                iteration=100,
+            )
+            for grid in self.grids
+        ]
+        self.assertIs(
+            gd.GridResampler.cached(grids_later, self.target), resampler
+        )
+
+        # Different method
+        self.assertIsNot(
+            gd.GridResampler.cached(self.grids, self.target, resample=True),
+            resampler,
+        )
+
+        # HierarchicalGridData uses the cache
+        hg = gd.HierarchicalGridData(self.data)
+        with mock.patch.object(
+            gd.GridResampler, "_plan", side_effect=AssertionError
+        ):
+            hg.to_UniformGridData_from_grid(self.target)
+
+        # Old resamplers are removed
+        with mock.patch.object(gd.GridResampler, "max_cached", 1):
+            gd.GridResampler.cached(self.grids[:1], self.target)
+            self.assertIsNot(
+                gd.GridResampler.cached(self.grids, self.target), resampler
+            )
+
+        gd.GridResampler.clear_cache()
+        self.assertIsNot(
+            gd.GridResampler.cached(self.grids, self.target), resampler
+        )
@@ -15,8 +15,15 @@
 # You should have received a copy of the GNU General Public License along with
 # this program; if not, see <https://www.gnu.org/licenses/>.
 
+import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
+import h5py
+
+from kuibit import cactus_ascii_utils, cactus_scalars
 from kuibit import simdir as sd
 
 
@@ -88,3 +95,223 @@ class TestSimDir(unittest.TestCase):
         # Test symlink
         sim_with_symlink = sd.SimDir("tests/tov", ignore_symlinks=False)
         self.assertEqual(len(sim_with_symlink.allfiles), 447)
+
+        # Test with multiple threads, the result has to be the same (in the
+        # same order)
+        for kwargs in ({}, {"max_depth": 2}, {"ignore_symlinks": False}):
+            sim_serial = sd.SimDir("tests/tov", **kwargs)
+            sim_threads = sd.SimDir("tests/tov", num_threads=4, **kwargs)
+            self.assertEqual(sim_threads.dirs, sim_serial.dirs)
+            self.assertEqual(sim_threads.allfiles, sim_serial.allfiles)
+            self.assertEqual(sim_threads.parfiles, sim_serial.parfiles)
+            self.assertEqual(sim_threads.logfiles, sim_serial.logfiles)
+            self.assertEqual(sim_threads.errfiles, sim_serial.errfiles)
+
+    def test_close(self):
+
+        # By default, files are not kept open
+        sim_no_pool = sd.SimDir("tests/grid_functions")
+        self.assertIsNone(sim_no_pool.file_pool)
+        with mock.patch("h5py.File", side_effect=h5py.File) as mocked:
+            sim_no_pool.gf.xy["rho"][0]
+            mocked.assert_called()
+        sim_no_pool.close()
+
+        with sd.SimDir("tests/grid_functions", max_open_files=64) as sim:
+            rho = sim.gf.xy["rho"]
+            path = next(iter(rho.allfiles))
+            rho[0]
+            # The file is kept open to be read again
+            self.assertIn(path, sim.file_pool)
+            with mock.patch("h5py.File", side_effect=h5py.File) as mocked:
+                rho[1]
+                mocked.assert_not_called()
+        self.assertEqual(len(sim.file_pool), 0)
+
+        sim_max_open = sd.SimDir("tests/grid_functions", max_open_files=1)
+        self.assertEqual(sim_max_open.file_pool.max_open_files, 1)
+        sim_max_open.gf.xy["rho"][0]
+        sim_max_open.gf.xy["P"][0]
+        self.assertEqual(len(sim_max_open.file_pool), 1)
+        sim_max_open.close()
+        self.assertEqual(len(sim_max_open.file_pool), 0)
+
+    def test_clear_cache(self):
+
+        sim = sd.SimDir("tests/grid_functions")
+        P = sim.gf.xy["P"]
+        P0 = P[0]
+        # The same object is returned without reading the files again
+        self.assertIs(P[0], P0)
+        self.assertIs(P.get_iteration(0), P0)
+        info = sim.data_cache.cache_info()
+        self.assertEqual(info.num_items, 1)
+        self.assertEqual(info.hits, 2)
+        self.assertEqual(
+            info.nbytes, sum(c.data.nbytes for c in P0.all_components)
+        )
+
+        # The cache is shared across variables
+        sim.gf.xy["rho_b"][0]
+        self.assertEqual(sim.data_cache.cache_info().num_items, 2)
+
+        sim.clear_cache()
+        self.assertEqual(sim.data_cache.cache_info().num_items, 0)
+        self.assertIsNot(P[0], P0)
+        self.assertEqual(P[0], P0)
+
+        # Only one iteration fits
+        sim_small = sd.SimDir(
+            "tests/grid_functions", max_cache_bytes=info.nbytes
+        )
+        P_small = sim_small.gf.xy["P"]
+        P_small[0]
+        P_small[2]
+        info = sim_small.data_cache.cache_info()
+        self.assertEqual(info.num_items, 1)
+        self.assertEqual(info.evictions, 1)
+
+    def test_refresh(self):
+
+        source = "tests/tov/output-0000/static_tov/hydrobase-rho.maximum.asc"
+        with open(source) as fil:
+            lines = fil.readlines()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output0 = os.path.join(tmpdir, "output-0000")
+            os.mkdir(output0)
+            path = os.path.join(output0, "hydrobase-rho.maximum.asc")
+            with open(path, "w") as fil:
+                fil.writelines(lines[:8])
+
+            sim = sd.SimDir(tmpdir)
+            self.assertEqual(len(sim.ts.maximum["rho"]), 1)
+
+            # Incomplete line, as if the file was being written
+            with open(path, "a") as fil:
+                fil.writelines(lines[8])
+                fil.write("512 4.")
+            sim.refresh()
+            self.assertEqual(len(sim.ts.maximum["rho"]), 2)
+
+            # Only the new lines are read
+            with open(path, "a") as fil:
+                fil.write("0 0.1\n")
+            offset = os.path.getsize(path) - len("512 4.0 0.1\n")
+            with mock.patch.object(
+                cactus_scalars.OneScalar,
+                "_parse_from",
+                autospec=True,
+                side_effect=cactus_scalars.OneScalar._parse_from,
+            ) as mocked_parse_from:
+                sim.refresh()
+                self.assertEqual(mocked_parse_from.call_args.args[1], offset)
+            self.assertEqual(
+                sim.ts.maximum["rho"], sd.SimDir(tmpdir).ts.maximum["rho"]
+            )
+            self.assertEqual(sim.ts.maximum["rho"].tmax, 4)
+
+            # Only half of a new line was written
+            rho_before = sim.ts.maximum["rho"]
+            with open(path, "a") as fil:
+                fil.write("1024 8.")
+            sim.refresh()
+            self.assertEqual(sim.ts.maximum["rho"], rho_before)
+            with open(path, "a") as fil:
+                fil.write("0 0.2\n")
+            sim.refresh()
+            self.assertEqual(sim.ts.maximum["rho"].tmax, 8)
+
+            # Refreshing a SimDir does not affect the others
+            other_sim = sd.SimDir(tmpdir)
+            other_rho = other_sim.ts.maximum["rho"]
+            other_multipoles = other_sim.multipoles
+            sim.refresh()
+            self.assertIs(other_sim.ts.maximum["rho"], other_rho)
+            self.assertIs(other_sim.multipoles, other_multipoles)
+            self.assertIsNot(sim.multipoles, other_multipoles)
+
+            # New restart
+            output1 = os.path.join(tmpdir, "output-0001")
+            os.mkdir(output1)
+            shutil.copy(
+                "tests/tov/output-0001/static_tov/hydrobase-rho.maximum.asc",
+                output1,
+            )
+            sim.refresh()
+            self.assertIn(output1, sim.dirs)
+            self.assertEqual(
+                sim.ts.maximum["rho"], sd.SimDir(tmpdir).ts.maximum["rho"]
+            )
+
+    def test_index_file(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index_path = os.path.join(tmpdir, "index.sqlite")
+
+            sim_index = sd.SimDir("tests/tov", index_file=index_path)
+            self.assertEqual(
+                sorted(sim_index.allfiles), sorted(self.sim.allfiles)
+            )
+            self.assertEqual(sim_index.dirs, self.sim.dirs)
+            self.assertEqual(
+                sim_index.ts.maximum["rho"], self.sim.ts.maximum["rho"]
+            )
+            sim_index.index.close()
+
+            # Second time, the content of the directories and the headers
+            # come from the index, so we do not list the directories again
+            with mock.patch("os.listdir") as mocked_listdir:
+                sim_index2 = sd.SimDir("tests/tov", index_file=index_path)
+                mocked_listdir.assert_not_called()
+            self.assertEqual(
+                sorted(sim_index2.allfiles), sorted(self.sim.allfiles)
+            )
+            expected_rho = self.sim.ts.maximum["rho"]
+            with mock.patch(
+                "kuibit.cactus_ascii_utils._scan_header",
+                side_effect=cactus_ascii_utils._scan_header,
+            ) as mocked_scan_header:
+                self.assertEqual(sim_index2.ts.maximum["rho"], expected_rho)
+                # Files with unrecognized headers are not saved in the index,
+                # so they are scanned again, but the others are not
+                scanned = [
+                    os.path.basename(call.args[0])
+                    for call in mocked_scan_header.call_args_list
+                ]
+                self.assertNotIn("hydrobase-rho.maximum.asc", scanned)
+            sim_index2.index.close()
+
+            # Grid functions
+            gf_dir = "tests/grid_functions"
+            sim_gf = sd.SimDir(gf_dir)
+            expected_keys = sim_gf.gf.xy.keys()
+            # P is in a HDF5 file with one group per file
+            expected_iterations = sim_gf.gf.xy["P"].available_iterations
+
+            sim_gf_index = sd.SimDir(gf_dir, index_file=index_path)
+            self.assertCountEqual(sim_gf_index.gf.xy.keys(), expected_keys)
+            self.assertEqual(
+                sim_gf_index.gf.xy["P"].available_iterations,
+                expected_iterations,
+            )
+            sim_gf_index.index.close()
+
+            sim_gf_index = sd.SimDir(gf_dir, index_file=index_path)
+            with mock.patch("h5py.File", side_effect=h5py.File) as mocked:
+                self.assertCountEqual(sim_gf_index.gf.xy.keys(), expected_keys)
+                self.assertEqual(
+                    sim_gf_index.gf.xy["P"].available_iterations,
+                    expected_iterations,
+                )
+                # The structure of the HDF5 files comes from the index
+                mocked.assert_not_called()
+            self.assertEqual(
+                sim_gf_index.gf.xy["rho_star"][0],
+                sim_gf.gf.xy["rho_star"][0],
+            )
+            self.assertEqual(
+                sim_gf_index.gf.xyz["rho_star"][0],
+                sim_gf.gf.xyz["rho_star"][0],
+            )
+            sim_gf_index.index.close()
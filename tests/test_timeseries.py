@@ -891,6 +891,30 @@ class TestTimeseries(unittest.TestCase):
             np.allclose(ts.combine_ts([ts4, ts5], prefer_late=True).y, coss5)
         )
 
+        # Many segments, with some completely covered by others. The segments
+        # are ordered by tmin (and tmax) as [s1, s2, s3, s4].
+        s1 = ts.TimeSeries([0, 1, 2, 3, 4], [10, 11, 12, 13, 14])
+        s2 = ts.TimeSeries([1.5, 2.5], [21.5, 22.5])
+        s3 = ts.TimeSeries([2, 3, 4, 5, 6], [32, 33, 34, 35, 36])
+        s4 = ts.TimeSeries([5.5, 7], [45.5, 47])
+
+        late = ts.combine_ts([s3, s1, s4, s2])
+        self.assertEqual(
+            late,
+            ts.TimeSeries(
+                [0, 1, 1.5, 2, 3, 4, 5, 5.5, 7],
+                [10, 11, 21.5, 32, 33, 34, 35, 45.5, 47],
+            ),
+        )
+
+        early = ts.combine_ts([s3, s1, s4, s2], prefer_late=False)
+        self.assertEqual(
+            early,
+            ts.TimeSeries(
+                [0, 1, 2, 3, 4, 5, 6, 7], [10, 11, 12, 13, 14, 35, 36, 47]
+            ),
+        )
+
     def test_resample_common(self):
 
         # Test with resample=False